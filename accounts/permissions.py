@@ -1,11 +1,17 @@
 from rest_framework.permissions import SAFE_METHODS, BasePermission
 
+
+def is_admin_or_coach(user):
+    """Papel de staff (admin/coach); também usado fora do DRF (stream SSE)."""
+    if not user or not user.is_authenticated:
+        return False
+    profile = getattr(user, "profile", None)
+    return bool(profile and profile.role in ("ADMIN", "COACH"))
+
+
 class IsAdminOrCoach(BasePermission):
     def has_permission(self, request, view):
-        if not request.user or not request.user.is_authenticated:
-            return False
-        profile = getattr(request.user, "profile", None)
-        return bool(profile and profile.role in ("ADMIN", "COACH"))
+        return is_admin_or_coach(request.user)
 
 
 class IsAdminOrCoachOrReadOnly(BasePermission):
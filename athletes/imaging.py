@@ -0,0 +1,145 @@
+"""
+Processamento das fotos dos atletas (Pillow). Importado sob demanda pelo model,
+só quando há foto para processar, para não carregar o Pillow em todo processo.
+"""
+
+import math
+from io import BytesIO
+
+from PIL import Image, ImageOps
+
+
+def image_size(fileobj):
+    """Dimensões lidas do cabeçalho (Image.open não decodifica os pixels)."""
+    fileobj.seek(0)
+    with Image.open(fileobj) as img:
+        return img.size
+
+
+def _open_reduced(img, max_side):
+    """
+    JPEG: draft() decodifica já em 1/2, 1/4 ou 1/8 (o menor fator que ainda cobre
+    max_side), sem alocar a imagem inteira. Precisa vir antes de qualquer load().
+    """
+    if img.format == "JPEG" and max(img.size) > max_side:
+        ratio = max_side / max(img.size)
+        # draft() só reduz enquanto os dois lados continuam >= o pedido: pede o tamanho final.
+        img.draft("RGB", (math.ceil(img.width * ratio), math.ceil(img.height * ratio)))
+    return ImageOps.exif_transpose(img)
+
+
+def _encode(img, quality):
+    out = BytesIO()
+    img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+# ln(tamanho) cai ~3% por ponto de qualidade nas fotos típicas (estimativa conservadora:
+# prever um declive menor leva a uma qualidade mais baixa, que tende a caber).
+SIZE_SLOPE = 0.03
+# Sem uma tentativa que coube, a previsão mira um pouco abaixo do limite.
+PREDICTION_MARGIN = 0.95
+
+
+def search_quality(img, max_bytes, quality, quality_min, max_encodes=3):
+    """
+    Maior qualidade entre quality_min e quality que cabe em max_bytes.
+
+    Tenta o teto; se não couber, prevê a qualidade pelo tamanho obtido (tamanho ~
+    exponencial na qualidade) e segue estreitando o intervalo [cabe, não cabe] por
+    interpolação, como numa bisseção, até max_encodes codificações (no mínimo 2:
+    teto e piso). Se nenhuma tentativa coube até a última, a última é o piso (o
+    mesmo resultado do laço antigo). Retorna (bytes, qualidade, codificações).
+    """
+    max_encodes = max(2, max_encodes)
+    data = _encode(img, quality)
+    if len(data) <= max_bytes or quality <= quality_min:
+        return data, quality, 1
+
+    hi, hi_size = quality, len(data)   # não cabe
+    lo = lo_size = None                # cabe
+    best = best_quality = None
+    slope = SIZE_SLOPE
+    encodes = 1
+    while encodes < max_encodes:
+        if best is None and encodes == max_encodes - 1:
+            q = quality_min  # última codificação e nada coube: o piso
+        elif lo is None:
+            q = hi - math.ceil(math.log(hi_size / (max_bytes * PREDICTION_MARGIN)) / slope)
+            q = max(quality_min, min(hi - 1, q))
+        else:
+            if hi - lo <= 1:
+                break
+            fraction = (math.log(max_bytes) - math.log(lo_size)) / (math.log(hi_size) - math.log(lo_size))
+            q = max(lo + 1, min(hi - 1, lo + int(fraction * (hi - lo))))
+
+        data = _encode(img, q)
+        encodes += 1
+        if len(data) <= max_bytes:
+            best, best_quality = data, q
+            lo, lo_size = q, len(data)
+        else:
+            if lo is None:
+                # Declive medido entre as duas tentativas que não couberam.
+                slope = max(math.log(hi_size / len(data)) / (hi - q), 0.005)
+            hi, hi_size = q, len(data)
+            if q <= quality_min:
+                return data, q, encodes  # nem o piso cabe
+
+    return best, best_quality, encodes
+
+
+def _to_rgb(img):
+    """RGB sem alpha: áreas transparentes viram branco (e não preto)."""
+    if img.mode == "P" and "transparency" in img.info:
+        img = img.convert("RGBA")
+    if img.mode in ("RGBA", "LA"):
+        bg = Image.new("RGB", img.size, (255, 255, 255))
+        bg.paste(img, mask=img.split()[-1])
+        return bg
+    if img.mode != "RGB":
+        return img.convert("RGB")
+    return img
+
+
+def encode_jpeg(fileobj, max_side, max_bytes, quality, quality_min, max_encodes=3):
+    """Corrige a orientação EXIF, reduz para max_side e codifica em JPEG até caber em max_bytes."""
+    fileobj.seek(0)
+    with Image.open(fileobj) as img0:
+        img = _open_reduced(img0, max_side)
+
+        # Convert to RGB (JPEG) and drop alpha if present.
+        img = _to_rgb(img)
+
+        # Resize to fit max_side.
+        if max(img.size) > max_side:
+            img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        data, _quality, _encodes = search_quality(img, max_bytes, quality, quality_min, max_encodes)
+        return data
+
+
+VARIANT_FORMATS = {"jpeg": ("JPEG", "jpg"), "webp": ("WEBP", "webp")}
+
+
+def render_variants(fileobj, sizes, formats, quality):
+    """
+    Miniaturas da foto (já normalizada) para cada lado em sizes e cada formato.
+    Decodifica uma vez e reduz do maior para o menor. Retorna {lado: {formato: (ext, bytes)}}.
+    Lados maiores que a foto não ampliam: a variante fica no tamanho original.
+    """
+    fileobj.seek(0)
+    with Image.open(fileobj) as img0:
+        img = _to_rgb(_open_reduced(img0, max(sizes)))
+
+        variants = {}
+        for side in sorted(sizes, reverse=True):
+            img = img.copy()
+            img.thumbnail((side, side), Image.Resampling.LANCZOS)
+            variants[side] = {}
+            for fmt in formats:
+                pil_format, ext = VARIANT_FORMATS[fmt]
+                out = BytesIO()
+                img.save(out, format=pil_format, quality=quality)
+                variants[side][fmt] = (ext, out.getvalue())
+        return variants
@@ -0,0 +1,11 @@
+from athletes.photos import run_pending_photos
+from core.workers import WorkerCommand
+
+
+class Command(WorkerCommand):
+    help = "Worker local da fila de fotos dos atletas: redimensiona/comprime uploads fora do request."
+    worker_name = "Worker de fotos"
+
+    def run_cycle(self):
+        total = run_pending_photos()
+        return total, f"{total} foto(s) processada(s)."
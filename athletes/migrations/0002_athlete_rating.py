@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_ratings(apps, schema_editor):
+    Athlete = apps.get_model("athletes", "Athlete")
+    DrillScore = apps.get_model("trainings", "DrillScore")
+
+    numerator_expr = ExpressionWrapper(F("score") * F("training_drill__weight"), output_field=FloatField())
+    rows = (
+        DrillScore.objects
+        .values("athlete_id")
+        .annotate(
+            points=Coalesce(Sum(numerator_expr), 0.0),
+            weight=Coalesce(Sum(F("training_drill__weight"), output_field=FloatField()), 0.0),
+        )
+    )
+    athletes = []
+    for row in rows:
+        points, weight = float(row["points"]), float(row["weight"])
+        athletes.append(Athlete(
+            id=row["athlete_id"],
+            rating_points=points,
+            rating_weight=weight,
+            rating=points / weight if weight > 0 else 0.0,
+        ))
+    Athlete.objects.bulk_update(athletes, ["rating_points", "rating_weight", "rating"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0001_initial'),
+        ('trainings', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='rating_points',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='athlete',
+            name='rating_weight',
+            field=models.FloatField(default=0.0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='athlete',
+            name='rating',
+            field=models.FloatField(db_index=True, default=0.0, editable=False),
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:34
+
+from django.db import migrations, models
+
+
+def mark_existing_photos_ready(apps, schema_editor):
+    # Fotos anteriores já foram processadas no save síncrono.
+    Athlete = apps.get_model("athletes", "Athlete")
+    Athlete.objects.exclude(photo="").exclude(photo__isnull=True).update(photo_status="READY")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0002_athlete_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='photo_status',
+            field=models.CharField(blank=True, choices=[('PENDING', 'Na fila'), ('PROCESSING', 'Processando'), ('READY', 'Pronta'), ('FAILED', 'Falhou')], db_index=True, default='', editable=False, max_length=12),
+        ),
+        migrations.RunPython(mark_existing_photos_ready, migrations.RunPython.noop),
+    ]
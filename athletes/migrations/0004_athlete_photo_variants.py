@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:36
+
+from django.db import migrations, models
+
+
+def requeue_ready_photos(apps, schema_editor):
+    # O worker gera as miniaturas (a foto já normalizada não é recodificada).
+    Athlete = apps.get_model("athletes", "Athlete")
+    Athlete.objects.filter(photo_status="READY").update(photo_status="PENDING")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0003_athlete_photo_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(requeue_ready_photos, migrations.RunPython.noop),
+    ]
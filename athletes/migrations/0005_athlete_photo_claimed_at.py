@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0004_athlete_photo_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='athlete',
+            name='photo_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
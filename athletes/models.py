@@ -1,12 +1,6 @@
 from django.conf import settings
-from django.core.files.base import ContentFile
 from django.db import models
 
-from PIL import Image, ImageOps
-
-from io import BytesIO
-import os
-
 class Athlete(models.Model):
     class Position(models.TextChoices):
         QUARTERBACK = "QB", "Quarterback"
@@ -30,7 +24,19 @@ class Athlete(models.Model):
     name = models.CharField(max_length=120)
     jersey_number = models.PositiveIntegerField(null=True, blank=True)
 
+    class PhotoStatus(models.TextChoices):
+        PENDING = "PENDING", "Na fila"
+        PROCESSING = "PROCESSING", "Processando"
+        READY = "READY", "Pronta"
+        FAILED = "FAILED", "Falhou"
+
     photo = models.ImageField(upload_to="athletes/photos/", null=True, blank=True)
+    # Vazio quando não há foto.
+    photo_status = models.CharField(max_length=12, choices=PhotoStatus.choices, blank=True, default="", editable=False, db_index=True)
+    # Quando o worker pegou a foto (PROCESSING); passado o lease, outro worker retoma.
+    photo_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # {"64": {"jpeg": nome, "webp": nome}, ...}; gerado pelo worker junto com a foto.
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     birth_date = models.DateField(null=True, blank=True)
     birth_city = models.CharField(max_length=120, null=True, blank=True)
@@ -45,79 +51,66 @@ class Athlete(models.Model):
 
     is_active = models.BooleanField(default=True)
 
+    # Σ(nota × peso) e Σ(peso) de todas as notas; mantidos por delta em trainings.ratings.
+    rating_points = models.FloatField(default=0.0, editable=False)
+    rating_weight = models.FloatField(default=0.0, editable=False)
+    rating = models.FloatField(default=0.0, editable=False, db_index=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
 
-    def _photo_limits(self):
-        max_bytes = int(getattr(settings, "ATHLETE_PHOTO_MAX_BYTES", 10 * 1024 * 1024))
-        max_side = int(getattr(settings, "ATHLETE_PHOTO_MAX_SIDE", 1600))
-        jpeg_quality = int(getattr(settings, "ATHLETE_PHOTO_JPEG_QUALITY", 85))
-        jpeg_quality_min = int(getattr(settings, "ATHLETE_PHOTO_JPEG_QUALITY_MIN", 45))
-        return max_bytes, max_side, jpeg_quality, jpeg_quality_min
+    RATING_FIELDS = ("rating_points", "rating_weight", "rating")
 
-    def _needs_photo_processing(self, max_bytes: int, max_side: int) -> bool:
-        if not self.photo:
-            return False
-        try:
-            if getattr(self.photo, "size", 0) and int(self.photo.size) > max_bytes:
-                return True
-        except Exception:
-            pass
-
-        # If file is already small enough, still check dimensions.
-        try:
-            self.photo.file.seek(0)
-            with Image.open(self.photo.file) as img:
-                w, h = img.size
-                return max(w, h) > max_side
-        except Exception:
-            return False
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "photo" in field_names:
+            photo = values[field_names.index("photo")]
+            if photo is not models.DEFERRED:
+                instance._loaded_photo_name = photo or ""
+        return instance
 
-    def _process_photo(self):
-        max_bytes, max_side, q0, qmin = self._photo_limits()
-        if not self.photo or not getattr(self.photo, "file", None):
-            return
-        if not self._needs_photo_processing(max_bytes=max_bytes, max_side=max_side):
-            return
-
-        try:
-            self.photo.file.seek(0)
-            with Image.open(self.photo.file) as img0:
-                img = ImageOps.exif_transpose(img0)
-
-                # Convert to RGB (JPEG) and drop alpha if present.
-                if img.mode in ("RGBA", "LA"):
-                    bg = Image.new("RGB", img.size, (255, 255, 255))
-                    bg.paste(img, mask=img.split()[-1])
-                    img = bg
-                elif img.mode != "RGB":
-                    img = img.convert("RGB")
-
-                # Resize to fit max_side.
-                if max(img.size) > max_side:
-                    img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
-
-                # Encode as JPEG, reducing quality until under max_bytes.
-                quality = q0
-                out = BytesIO()
-                while True:
-                    out.seek(0)
-                    out.truncate(0)
-                    img.save(out, format="JPEG", quality=quality, optimize=True, progressive=True)
-                    size = out.tell()
-                    if size <= max_bytes or quality <= qmin:
-                        break
-                    quality = max(qmin, quality - 7)
-
-                base, _ext = os.path.splitext(os.path.basename(self.photo.name or "photo"))
-                new_name = f"{base}.jpg"
-                self.photo.save(new_name, ContentFile(out.getvalue()), save=False)
-        except Exception:
-            # Fail-safe: never block saving athlete due to image processing.
-            return
+    def _photo_changed(self):
+        if "photo" in self.get_deferred_fields():
+            return False
+        if self.photo and not self.photo._committed:
+            return True  # upload novo, ainda não gravado no storage
+        if self._state.adding:
+            return bool(self.photo)
+        return (self.photo.name or "") != getattr(self, "_loaded_photo_name", self.photo.name or "")
+
+    @staticmethod
+    def variant_names(variants):
+        return [name for formats in (variants or {}).values() for name in formats.values()]
+
+    def _discard_photo_variants(self):
+        # Miniaturas da foto anterior deixam de valer; as novas saem do worker. Lidas do
+        # banco: a instância pode ser anterior ao processamento.
+        if not self._state.adding:
+            stored = type(self).objects.filter(pk=self.pk).values_list("photo_variants", flat=True).first()
+            for name in self.variant_names(stored):
+                self.photo.storage.delete(name)
+        self.photo_variants = {}
 
     def save(self, *args, **kwargs):
-        self._process_photo()
-        return super().save(*args, **kwargs)
+        photo_changed = self._photo_changed()
+        if photo_changed:
+            # Gravada como veio; o worker (athletes.photos) processa fora do request.
+            self.photo_status = self.PhotoStatus.PENDING if self.photo else ""
+            self.photo_claimed_at = None
+            self._discard_photo_variants()
+        if not self._state.adding and kwargs.get("update_fields") is None and not args:
+            # rating e foto processada são gravados por UPDATE em outro lugar; um save()
+            # da ficha não pode sobrescrevê-los com o valor lido antes.
+            skip = set(self.RATING_FIELDS)
+            if not photo_changed:
+                skip.update(("photo", "photo_status", "photo_claimed_at", "photo_variants"))
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in skip
+            ]
+        result = super().save(*args, **kwargs)
+        self._loaded_photo_name = self.photo.name or ""
+        return result
 
     def __str__(self):
         return self.name
\ No newline at end of file
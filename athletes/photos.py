@@ -0,0 +1,191 @@
+"""
+Fila de processamento das fotos dos atletas.
+
+O upload é gravado como veio e o atleta fica com photo_status=PENDING (Athlete.save).
+O worker (run_photo_worker) normaliza a foto fora do request: orientação EXIF, lado
+máximo ATHLETE_PHOTO_MAX_SIDE e JPEG até ATHLETE_PHOTO_MAX_BYTES. Se a foto mudar
+enquanto é processada, o resultado é descartado e a nova foto segue na fila. Uma foto
+PROCESSING há mais de ATHLETE_PHOTO_LEASE_SECONDS é de um worker que caiu e volta a
+ser pega (photo_claimed_at).
+
+No mesmo passo saem as miniaturas (ATHLETE_PHOTO_VARIANT_SIZES × JPEG/WebP), expostas
+em photo_variants; só são refeitas quando a foto muda.
+"""
+
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Athlete
+
+
+logger = logging.getLogger(__name__)
+
+
+def photo_limits():
+    max_bytes = int(getattr(settings, "ATHLETE_PHOTO_MAX_BYTES", 10 * 1024 * 1024))
+    max_side = int(getattr(settings, "ATHLETE_PHOTO_MAX_SIDE", 1600))
+    jpeg_quality = int(getattr(settings, "ATHLETE_PHOTO_JPEG_QUALITY", 85))
+    jpeg_quality_min = int(getattr(settings, "ATHLETE_PHOTO_JPEG_QUALITY_MIN", 45))
+    return max_bytes, max_side, jpeg_quality, jpeg_quality_min
+
+
+def variant_settings():
+    sizes = tuple(getattr(settings, "ATHLETE_PHOTO_VARIANT_SIZES", (64, 256, 1024)))
+    formats = tuple(getattr(settings, "ATHLETE_PHOTO_VARIANT_FORMATS", ("jpeg", "webp")))
+    quality = int(getattr(settings, "ATHLETE_PHOTO_VARIANT_QUALITY", 80))
+    return sizes, formats, quality
+
+
+def lease_cutoff():
+    """Fotos PROCESSING pegas antes disso são de um worker que morreu."""
+    seconds = int(getattr(settings, "ATHLETE_PHOTO_LEASE_SECONDS", 600))
+    return timezone.now() - timedelta(seconds=seconds)
+
+
+def claim_next_photo():
+    """
+    Pega o atleta PENDING mais antigo (ou PROCESSING com lease vencido, de um worker
+    que caiu) e marca como PROCESSING. O UPDATE condicional, sobre a mesma foto,
+    status e photo_claimed_at lidos, garante que dois workers nunca peguem a mesma
+    foto. Retorna None se a fila estiver vazia.
+    """
+    while True:
+        athlete = (
+            Athlete.objects
+            .filter(
+                Q(photo_status=Athlete.PhotoStatus.PENDING)
+                | Q(photo_status=Athlete.PhotoStatus.PROCESSING, photo_claimed_at__lt=lease_cutoff())
+                # PROCESSING gravado antes da coluna photo_claimed_at
+                | Q(photo_status=Athlete.PhotoStatus.PROCESSING, photo_claimed_at__isnull=True)
+            )
+            .order_by("id")
+            .first()
+        )
+        if athlete is None:
+            return None
+        if athlete.photo_status == Athlete.PhotoStatus.PROCESSING:
+            logger.warning("Retomando a foto do atleta #%s (lease vencido)", athlete.pk)
+        now = timezone.now()
+        claimed = (
+            Athlete.objects
+            .filter(
+                pk=athlete.pk,
+                photo=athlete.photo.name,
+                photo_status=athlete.photo_status,
+                photo_claimed_at=athlete.photo_claimed_at,
+            )
+            .update(photo_status=Athlete.PhotoStatus.PROCESSING, photo_claimed_at=now)
+        )
+        if claimed:
+            athlete.photo_status = Athlete.PhotoStatus.PROCESSING
+            athlete.photo_claimed_at = now
+            return athlete
+
+
+def _normalize(photo):
+    """Grava a versão normalizada e retorna o nome novo; None se a original já serve."""
+    from .imaging import encode_jpeg, image_size
+
+    max_bytes, max_side, quality, quality_min = photo_limits()
+    max_encodes = int(getattr(settings, "ATHLETE_PHOTO_MAX_ENCODES", 3))
+    with photo.open("rb") as fh:
+        w, h = image_size(fh)
+        if photo.size <= max_bytes and max(w, h) <= max_side:
+            return None
+        content = encode_jpeg(fh, max_side, max_bytes, quality, quality_min, max_encodes)
+
+    base, _ext = os.path.splitext(os.path.basename(photo.name))
+    name = photo.field.generate_filename(photo.instance, f"{base}.jpg")
+    return photo.storage.save(name, ContentFile(content))
+
+
+def _save_variants(photo, name):
+    """Gera e grava as miniaturas de `name`. Retorna o mapa {lado: {formato: nome}}."""
+    from .imaging import render_variants
+
+    sizes, formats, quality = variant_settings()
+    with photo.storage.open(name, "rb") as fh:
+        rendered = render_variants(fh, sizes, formats, quality)
+
+    base, _ext = os.path.splitext(os.path.basename(name))
+    variants = {}
+    try:
+        for side, by_format in rendered.items():
+            for fmt, (ext, content) in by_format.items():
+                target = photo.field.generate_filename(photo.instance, f"variants/{base}_{side}.{ext}")
+                variants.setdefault(str(side), {})[fmt] = photo.storage.save(target, ContentFile(content))
+    except Exception:
+        _delete_files(photo.storage, Athlete.variant_names(variants))
+        raise
+    return variants
+
+
+def _delete_files(storage, names):
+    for name in names:
+        storage.delete(name)
+
+
+def _delete_unreferenced(storage, name):
+    # O seed --photos shared aponta vários atletas para o mesmo arquivo.
+    if name and not Athlete.objects.filter(photo=name).exists():
+        storage.delete(name)
+
+
+def process_photo(athlete):
+    """
+    Processa a foto de um atleta já PROCESSING. Erros marcam FAILED (a original fica).
+    O resultado só é gravado se o lease ainda for deste worker.
+    """
+    source = athlete.photo.name
+    storage = athlete.photo.storage
+    previous_variants = Athlete.variant_names(athlete.photo_variants)
+    new_name = None
+    variants = {}
+    status = Athlete.PhotoStatus.READY
+    try:
+        new_name = _normalize(athlete.photo)
+        variants = _save_variants(athlete.photo, new_name or source)
+    except Exception:  # o worker segue com as próximas fotos
+        logger.exception("Falha ao processar a foto do atleta #%s", athlete.pk)
+        status = Athlete.PhotoStatus.FAILED
+
+    applied = (
+        Athlete.objects
+        .filter(
+            pk=athlete.pk,
+            photo=source,
+            photo_status=Athlete.PhotoStatus.PROCESSING,
+            photo_claimed_at=athlete.photo_claimed_at,
+        )
+        .update(photo=new_name or source, photo_status=status, photo_variants=variants)
+    )
+    if not applied:
+        # Foto trocada, atleta removido ou lease retomado por outro worker.
+        _delete_files(storage, [new_name] if new_name else [])
+        _delete_files(storage, Athlete.variant_names(variants))
+        return None
+    if new_name:
+        _delete_unreferenced(storage, source)
+    _delete_files(storage, previous_variants)
+    athlete.photo.name = new_name or source
+    athlete.photo_status = status
+    athlete.photo_variants = variants
+    return athlete
+
+
+def run_pending_photos(limit=None):
+    """Processa a fila até esvaziar (ou até limit fotos). Retorna quantas foram processadas."""
+    total = 0
+    while limit is None or total < limit:
+        athlete = claim_next_photo()
+        if athlete is None:
+            break
+        process_photo(athlete)
+        total += 1
+    return total
@@ -3,6 +3,19 @@ from .models import Athlete
 
 class AthleteSerializer(serializers.ModelSerializer):
     rating = serializers.FloatField(read_only=True)
+    photo_variants = serializers.SerializerMethodField()
+
+    def get_photo_variants(self, obj):
+        """{"64": {"jpeg": url, "webp": url}, ...}; vazio enquanto a foto não foi processada."""
+        storage = obj.photo.storage
+        request = self.context.get("request")
+        variants = {}
+        for side, formats in (obj.photo_variants or {}).items():
+            variants[side] = {}
+            for fmt, name in formats.items():
+                url = storage.url(name)
+                variants[side][fmt] = request.build_absolute_uri(url) if request is not None else url
+        return variants
 
     def validate_user(self, value):
         if not value:
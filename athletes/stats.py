@@ -0,0 +1,61 @@
+"""
+Estatísticas do elenco (GET /api/athletes/stats/).
+
+Uma única query (id, nome, posição, rating) ordenada por -rating usa o índice do
+rating armazenado; total, média, top N e quebra por posição saem de uma passada
+em Python sobre essas linhas.
+"""
+
+from .models import Athlete
+
+
+DEFAULT_TOP = 3
+MAX_TOP = 20
+
+
+def _athlete(row):
+    athlete_id, name, _position, rating = row
+    return {"id": athlete_id, "name": name, "rating": round(float(rating or 0.0), 2)}
+
+
+def roster_stats(queryset, top=DEFAULT_TOP):
+    rows = queryset.order_by("-rating", "name").values_list("id", "name", "current_position", "rating")
+    labels = dict(Athlete.Position.choices)
+
+    total = 0
+    rating_sum = 0.0
+    top_performers = []
+    positions = {}
+    for row in rows:
+        position, rating = row[2], float(row[3] or 0.0)
+        total += 1
+        rating_sum += rating
+        if len(top_performers) < top:
+            top_performers.append(_athlete(row))
+
+        group = positions.get(position)
+        if group is None:
+            # Linhas vêm por rating decrescente: o primeiro da posição é o melhor.
+            group = positions[position] = {
+                "position": position,
+                "label": labels.get(position, "Sem posição"),
+                "count": 0,
+                "rating_sum": 0.0,
+                "best": _athlete(row),
+            }
+        group["count"] += 1
+        group["rating_sum"] += rating
+
+    by_position = []
+    for group in sorted(positions.values(), key=lambda g: (g["position"] is None, g["position"] or "")):
+        rating_sum_position = group.pop("rating_sum")
+        group["avg_rating"] = round(rating_sum_position / group["count"], 2)
+        by_position.append(group)
+
+    return {
+        "total": total,
+        "avg_rating": round(rating_sum / total, 2) if total else 0.0,
+        "top_performer": top_performers[0] if top_performers else None,
+        "top_performers": top_performers,
+        "by_position": by_position,
+    }
@@ -1,13 +1,22 @@
 import shutil
 import tempfile
-from io import BytesIO
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
+from django.contrib.auth.models import User
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
 
 from PIL import Image
 
+from .imaging import _encode, _open_reduced, encode_jpeg, render_variants, search_quality
 from .models import Athlete
+from .photos import claim_next_photo, process_photo, run_pending_photos
+from .serializers import AthleteSerializer
 
 
 class AthletePhotoProcessingTests(TestCase):
@@ -38,8 +47,17 @@ class AthletePhotoProcessingTests(TestCase):
 
 			a = Athlete.objects.create(name="Teste", photo=uploaded)
 
+			# O request só grava o arquivo; o processamento fica para o worker.
 			a.refresh_from_db()
+			raw_name = a.photo.name
+			self.assertTrue(raw_name.endswith(".png"))
+			self.assertEqual(a.photo_status, Athlete.PhotoStatus.PENDING)
+
+			self.assertEqual(run_pending_photos(), 1)
+			a.refresh_from_db()
+			self.assertEqual(a.photo_status, Athlete.PhotoStatus.READY)
 			self.assertTrue(a.photo.name.lower().endswith(".jpg"))
+			self.assertFalse(a.photo.storage.exists(raw_name))
 
 			a.photo.open("rb")
 			try:
@@ -49,3 +67,187 @@ class AthletePhotoProcessingTests(TestCase):
 					self.assertLessEqual(max(w, h), 256)
 			finally:
 				a.photo.close()
+
+	def _png(self, name="athlete.png", size=(300, 200)):
+		buf = BytesIO()
+		Image.new("RGB", size, (10, 120, 10)).save(buf, format="PNG")
+		return SimpleUploadedFile(name, buf.getvalue(), content_type="image/png")
+
+	def test_profile_save_does_not_requeue_or_revert_photo(self):
+		with override_settings(MEDIA_ROOT=self._tmp_media, ATHLETE_PHOTO_MAX_SIDE=100):
+			a = Athlete.objects.create(name="Teste", photo=self._png())
+			stale = Athlete.objects.get(pk=a.pk)
+			run_pending_photos()
+
+			stale.birth_city = "Santos"
+			stale.save()
+			a.refresh_from_db()
+			self.assertEqual(a.birth_city, "Santos")
+			self.assertEqual(a.photo_status, Athlete.PhotoStatus.READY)
+			self.assertTrue(a.photo.name.endswith(".jpg"))
+
+			a.photo = self._png("new.png")
+			a.save()
+			a.refresh_from_db()
+			self.assertEqual(a.photo_status, Athlete.PhotoStatus.PENDING)
+
+			a.photo = None
+			a.save()
+			a.refresh_from_db()
+			self.assertEqual(a.photo_status, "")
+			self.assertEqual(run_pending_photos(), 0)
+
+	def test_variants_are_generated_once_and_replaced_with_the_photo(self):
+		with override_settings(MEDIA_ROOT=self._tmp_media, ATHLETE_PHOTO_VARIANT_SIZES=(32, 128)):
+			a = Athlete.objects.create(name="Teste", photo=self._png(size=(400, 300)))
+			run_pending_photos()
+			a.refresh_from_db()
+			self.assertEqual(sorted(a.photo_variants), ["128", "32"])
+			storage = a.photo.storage
+			with storage.open(a.photo_variants["32"]["webp"], "rb") as fh, Image.open(fh) as small:
+				self.assertEqual((small.format, max(small.size)), ("WEBP", 32))
+			old_variants = Athlete.variant_names(a.photo_variants)
+
+			data = AthleteSerializer(a).data
+			self.assertEqual(data["photo_variants"]["128"]["jpeg"], storage.url(a.photo_variants["128"]["jpeg"]))
+
+			a.birth_city = "Santos"
+			a.save()
+			self.assertEqual(run_pending_photos(), 0)
+
+			a.photo = self._png("new.png")
+			a.save()
+			self.assertEqual(a.photo_variants, {})
+			self.assertFalse(any(storage.exists(name) for name in old_variants))
+			run_pending_photos()
+			a.refresh_from_db()
+			self.assertEqual(len(Athlete.variant_names(a.photo_variants)), 4)
+
+	def test_result_is_discarded_when_photo_changes_during_processing(self):
+		with override_settings(MEDIA_ROOT=self._tmp_media, ATHLETE_PHOTO_MAX_SIDE=100):
+			a = Athlete.objects.create(name="Teste", photo=self._png())
+			claimed = claim_next_photo()
+			a.photo = self._png("new.png")
+			a.save()
+
+			self.assertIsNone(process_photo(claimed))
+			a.refresh_from_db()
+			self.assertTrue(a.photo.name.endswith(".png"))
+			self.assertEqual(a.photo_status, Athlete.PhotoStatus.PENDING)
+
+	def test_photo_of_dead_worker_is_reclaimed_after_lease(self):
+		with override_settings(MEDIA_ROOT=self._tmp_media, ATHLETE_PHOTO_MAX_SIDE=100):
+			a = Athlete.objects.create(name="Teste", photo=self._png())
+			claimed = claim_next_photo()
+			self.assertIsNone(claim_next_photo())
+
+			Athlete.objects.filter(pk=a.pk).update(photo_claimed_at=timezone.now() - timedelta(seconds=601))
+			with self.assertLogs("athletes.photos", "WARNING"):
+				reclaimed = claim_next_photo()
+			self.assertEqual(reclaimed.pk, a.pk)
+
+			# o worker antigo termina depois: o resultado dele é descartado
+			self.assertIsNone(process_photo(claimed))
+			self.assertEqual(process_photo(reclaimed).photo_status, Athlete.PhotoStatus.READY)
+
+			Athlete.objects.create(name="Outro", photo=self._png("b.png"))
+			out = StringIO()
+			call_command("run_photo_worker", "--once", stdout=out)
+			self.assertIn("1 foto(s) processada(s).", out.getvalue())
+
+
+class PhotoEncoderTests(SimpleTestCase):
+	def _jpeg(self, size, orientation=None):
+		img = Image.merge("RGB", [Image.effect_noise(size, sigma) for sigma in (30, 40, 50)])
+		buf = BytesIO()
+		exif = Image.Exif()
+		if orientation:
+			exif[0x0112] = orientation
+		img.save(buf, format="JPEG", quality=95, exif=exif)
+		buf.seek(0)
+		return buf
+
+	def test_jpeg_is_downscaled_during_decode(self):
+		with Image.open(self._jpeg((2400, 1200))) as img:
+			reduced = _open_reduced(img, 500)
+			self.assertEqual(reduced.size, (600, 300))
+
+	def test_encode_respects_orientation_side_and_size(self):
+		out = encode_jpeg(self._jpeg((1600, 800), orientation=6), 400, 40_000, 85, 45)
+		self.assertLessEqual(len(out), 40_000)
+		with Image.open(BytesIO(out)) as img:
+			self.assertEqual(img.size, (200, 400))
+
+	def test_quality_search_uses_at_most_three_encodes(self):
+		with Image.open(self._jpeg((600, 400))) as img:
+			img = img.convert("RGB")
+			full = len(_encode(img, 85))
+			floor = len(_encode(img, 45))
+			for max_bytes in (int(floor * 1.05), (full + floor) // 2, int(full * 0.95)):
+				data, quality, encodes = search_quality(img, max_bytes, 85, 45)
+				self.assertLessEqual(len(data), max_bytes)
+				self.assertLessEqual(encodes, 3)
+				self.assertTrue(45 <= quality < 85)
+
+	def test_floor_fallback_counts_against_the_encode_budget(self):
+		with Image.open(self._jpeg((600, 400))) as img:
+			img = img.convert("RGB")
+			floor = len(_encode(img, 45))
+			# logo acima do piso, exatamente o piso e abaixo dele (nada cabe)
+			for max_bytes in (floor + 1, floor, floor // 2):
+				for max_encodes in (2, 3):
+					with self.subTest(max_bytes=max_bytes, max_encodes=max_encodes):
+						with patch("athletes.imaging._encode", wraps=_encode) as encode:
+							data, quality, encodes = search_quality(img, max_bytes, 85, 45, max_encodes)
+						self.assertEqual(encode.call_count, encodes)
+						self.assertLessEqual(encodes, max_encodes)
+						if max_bytes >= floor:
+							self.assertLessEqual(len(data), max_bytes)
+						else:
+							self.assertEqual(quality, 45)
+
+	def test_transparent_png_variants_have_a_white_background(self):
+		buf = BytesIO()
+		Image.new("RGBA", (200, 100), (0, 0, 0, 0)).save(buf, format="PNG")
+		rendered = render_variants(buf, (64,), ("jpeg", "webp"), 80)
+		for _ext, content in rendered[64].values():
+			with Image.open(BytesIO(content)) as variant:
+				self.assertEqual(variant.mode, "RGB")
+				self.assertGreater(min(variant.convert("L").getextrema()), 245)
+
+
+class AthleteStatsTests(APITestCase):
+	def setUp(self):
+		coach = User.objects.create_user(username="coach", password="pw")
+		coach.profile.role = "COACH"
+		coach.profile.save()
+		self.client.force_authenticate(user=coach)
+		for name, position, rating in [
+			("Ana", "QB", 9.0), ("Bia", "QB", 6.0), ("Caio", "WR", 8.0),
+			("Duda", "WR", 8.0), ("Eli", None, 0.0),
+		]:
+			Athlete.objects.create(name=name, current_position=position)
+			Athlete.objects.filter(name=name).update(rating=rating)
+
+	def test_stats_in_one_query(self):
+		with self.assertNumQueries(1):
+			res = self.client.get("/api/athletes/stats/?top=3")
+		data = res.json()
+		self.assertEqual(data["total"], 5)
+		self.assertEqual(data["avg_rating"], 6.2)
+		self.assertEqual(data["top_performer"]["name"], "Ana")
+		self.assertEqual([a["name"] for a in data["top_performers"]], ["Ana", "Caio", "Duda"])
+		self.assertEqual(
+			[(p["position"], p["count"], p["avg_rating"], p["best"]["name"]) for p in data["by_position"]],
+			[("QB", 2, 7.5, "Ana"), ("WR", 2, 8.0, "Caio"), (None, 1, 0.0, "Eli")],
+		)
+
+	def test_stats_honor_list_filters(self):
+		data = self.client.get("/api/athletes/stats/?current_position=WR").json()
+		self.assertEqual(data["total"], 2)
+		self.assertEqual([p["position"] for p in data["by_position"]], ["WR"])
+
+		data = self.client.get("/api/athletes/stats/?search=zzz").json()
+		self.assertEqual(data["total"], 0)
+		self.assertIsNone(data["top_performer"])
+		self.assertEqual(data["by_position"], [])
@@ -3,20 +3,23 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
-from django.db.models import Avg, Case, ExpressionWrapper, F, FloatField, Sum, Value, When
-from django.db.models.functions import Coalesce
-
 from accounts.permissions import IsAdminOrCoach
 from .models import Athlete
 from .serializers import AthleteSerializer, AthleteMeUpdateSerializer
+from .stats import DEFAULT_TOP, MAX_TOP, roster_stats
 
 
 class AthleteViewSet(ModelViewSet):
     queryset = Athlete.objects.all().order_by("name")
     serializer_class = AthleteSerializer
-    filterset_fields = ("is_active", "current_position", "desired_position")
+    filterset_fields = {
+        "is_active": ["exact"],
+        "current_position": ["exact"],
+        "desired_position": ["exact"],
+        "rating": ["gte", "lte"],
+    }
     search_fields = ("name", "birth_city")
-    ordering_fields = ("name", "jersey_number", "created_at")
+    ordering_fields = ("name", "jersey_number", "created_at", "rating")
 
     def get_permissions(self):
         # CRUD geral é só Admin/Coach
@@ -24,58 +27,22 @@ class AthleteViewSet(ModelViewSet):
             return [IsAuthenticated(), IsAdminOrCoach()]
         return [IsAuthenticated()]
 
-    def _with_rating(self, qs):
-        numerator_expr = ExpressionWrapper(
-            F("drill_scores__score") * F("drill_scores__training_drill__weight"),
-            output_field=FloatField(),
-        )
-        weight_expr = ExpressionWrapper(
-            F("drill_scores__training_drill__weight"),
-            output_field=FloatField(),
-        )
-
-        qs = qs.annotate(
-            rating_points=Coalesce(Sum(numerator_expr), Value(0.0)),
-            rating_weight=Coalesce(Sum(weight_expr), Value(0.0)),
-        ).annotate(
-            rating=Case(
-                When(
-                    rating_weight__gt=0,
-                    then=ExpressionWrapper(
-                        F("rating_points") / F("rating_weight"),
-                        output_field=FloatField(),
-                    ),
-                ),
-                default=Value(0.0),
-                output_field=FloatField(),
-            )
-        )
-        return qs
-
     def get_queryset(self):
-        qs = Athlete.objects.all()
-        qs = self._with_rating(qs)
-        return qs.order_by("name")
+        # rating é mantido incrementalmente (trainings.ratings): ordenar/filtrar usa o índice.
+        return Athlete.objects.all().order_by("name")
 
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
     def stats(self, request):
-        qs = self.filter_queryset(self.get_queryset())
-        total = qs.count()
-        avg_rating = qs.aggregate(v=Avg("rating"))["v"] or 0.0
-        top = qs.order_by("-rating", "name").first()
-        return Response({
-            "total": total,
-            "avg_rating": round(float(avg_rating), 2),
-            "top_performer": (
-                {
-                    "id": top.id,
-                    "name": top.name,
-                    "rating": round(float(getattr(top, "rating", 0.0) or 0.0), 2),
-                }
-                if top
-                else None
-            ),
-        })
+        """
+        Cards do topo da tela de atletas: total, média, top N (?top=, padrão 3) e
+        quebra por posição (quantidade, média, melhor). Aceita os mesmos filtros da listagem.
+        """
+        try:
+            top = int(request.query_params.get("top", DEFAULT_TOP))
+        except ValueError:
+            top = DEFAULT_TOP
+        top = max(1, min(top, MAX_TOP))
+        return Response(roster_stats(self.filter_queryset(self.get_queryset()), top=top))
 
     @action(detail=False, methods=["get", "patch"], permission_classes=[IsAuthenticated])
     def me(self, request):
@@ -100,6 +67,4 @@ class AthleteViewSet(ModelViewSet):
             serializer.is_valid(raise_exception=True)
             serializer.save()
 
-        athlete_qs = self._with_rating(Athlete.objects.filter(id=athlete.id))
-        athlete_with_rating = athlete_qs.first() or athlete
-        return Response(AthleteSerializer(athlete_with_rating).data)
\ No newline at end of file
+        return Response(AthleteSerializer(athlete).data)
\ No newline at end of file
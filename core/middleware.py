@@ -0,0 +1,133 @@
+"""
+Instrumentação de SQL por requisição.
+
+QueryInstrumentationMiddleware conta as queries executadas durante a view (em todas
+as conexões), soma o tempo de SQL, guarda a query mais lenta e calcula o tempo de
+Python (total - SQL). Os números saem no header Server-Timing (visível no DevTools)
+e numa linha de log estruturada no logger "core.requests". Funciona sem DEBUG: usa
+connection.execute_wrapper em vez de connection.queries.
+
+Respostas em streaming (CSV da temporada, SSE) só contam a parte executada dentro
+da view; as queries feitas enquanto o corpo é consumido ficam de fora.
+
+Suporta sync e async: sob ASGI a cadeia fica async (o stream SSE não é adaptado
+para sync). Lá as queries rodam na thread de sync_to_async da requisição, então o
+coletor é instalado nessa thread.
+"""
+
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+
+logger = logging.getLogger("core.requests")
+
+SLOWEST_SQL_CHARS = 300
+
+
+class QueryStats:
+    """Coletor usado como execute_wrapper (um por requisição)."""
+
+    def __init__(self):
+        self.count = 0
+        self.sql_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.sql_seconds += elapsed
+            if elapsed >= self.slowest_seconds:
+                self.slowest_seconds = elapsed
+                self.slowest_sql = sql
+
+    def capture(self):
+        """Context manager que instala o coletor em todas as conexões configuradas."""
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(self))
+        return stack
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def server_timing(stats, total_seconds):
+    python_seconds = max(total_seconds - stats.sql_seconds, 0.0)
+    return ", ".join([
+        f'db;dur={_ms(stats.sql_seconds)};desc="{stats.count} queries"',
+        f"db-slowest;dur={_ms(stats.slowest_seconds)}",
+        f"app;dur={_ms(python_seconds)}",
+        f"total;dur={_ms(total_seconds)}",
+    ])
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = QueryStats()
+        started = time.perf_counter()
+        with stats.capture():
+            response = self.get_response(request)
+        return self._report(request, response, stats, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        stats = QueryStats()
+        started = time.perf_counter()
+        # capture() já instala os wrappers: precisa rodar na thread das queries
+        capture = await sync_to_async(stats.capture)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(capture.__exit__)(None, None, None)
+        return self._report(request, response, stats, time.perf_counter() - started)
+
+    def _report(self, request, response, stats, total):
+        request.query_stats = stats
+        response["Server-Timing"] = server_timing(stats, total)
+
+        budget = getattr(settings, "QUERY_BUDGET_WARN", None)
+        over_budget = budget is not None and stats.count > budget
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            "%s %s status=%s queries=%s sql_ms=%s slowest_ms=%s python_ms=%s",
+            request.method,
+            request.path,
+            response.status_code,
+            stats.count,
+            _ms(stats.sql_seconds),
+            _ms(stats.slowest_seconds),
+            _ms(max(total - stats.sql_seconds, 0.0)),
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "status_code": response.status_code,
+                "queries": stats.count,
+                "sql_ms": _ms(stats.sql_seconds),
+                "slowest_ms": _ms(stats.slowest_seconds),
+                "slowest_sql": (stats.slowest_sql or "")[:SLOWEST_SQL_CHARS],
+                "python_ms": _ms(max(total - stats.sql_seconds, 0.0)),
+                "over_budget": over_budget,
+            },
+        )
+        return response
@@ -66,6 +66,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista: o tempo total inclui os demais middlewares.
+    "core.middleware.QueryInstrumentationMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -143,6 +145,65 @@ SIMPLE_JWT = {
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
 
+# Cache
+# "analytics" guarda respostas de ranking/dashboard/analytics e bytes de export por
+# revisão do treino. Em produção com vários workers, aponte para um backend
+# compartilhado (ex.: FileBasedCache ou Redis) via env.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "analytics": {
+        "BACKEND": os.getenv("ANALYTICS_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("ANALYTICS_CACHE_LOCATION", "mamutes-analytics"),
+        "TIMEOUT": int(os.getenv("ANALYTICS_CACHE_TIMEOUT", str(60 * 60 * 24))),
+        "OPTIONS": {
+            "MAX_ENTRIES": int(os.getenv("ANALYTICS_CACHE_MAX_ENTRIES", "500")),
+        },
+    },
+}
+TRAININGS_ANALYTICS_CACHE_ALIAS = "analytics"
+
+# Dashboard ao vivo (SSE, trainings/sse.py): intervalo de polling dos eventos e
+# duração máxima de cada conexão (o EventSource reconecta com Last-Event-ID).
+TRAININGS_SSE_POLL_SECONDS = float(os.getenv("TRAININGS_SSE_POLL_SECONDS", "1"))
+TRAININGS_SSE_MAX_SECONDS = int(os.getenv("TRAININGS_SSE_MAX_SECONDS", "300"))
+# ?token= do stream aceita só o token de stream (POST .../events/token/), válido por
+# esse tempo para abrir a conexão; o JWT de acesso vai só no header Authorization.
+TRAININGS_SSE_TOKEN_SECONDS = int(os.getenv("TRAININGS_SSE_TOKEN_SECONDS", "60"))
+# TrainingEvent é removido depois de TRAININGS_SSE_MAX_SECONDS + essa margem
+# (prune_training_events / run_report_worker).
+TRAININGS_EVENTS_RETENTION_MARGIN_SECONDS = int(os.getenv("TRAININGS_EVENTS_RETENTION_MARGIN_SECONDS", "3600"))
+
+# Horizonte da sincronização offline (trainings/sync.py): tombstones e recibos de
+# push mais antigos são removidos; um cursor mais velho recebe o snapshot completo
+# (reset=true) e operações offline devem ser enviadas dentro desse prazo.
+TRAININGS_SYNC_HORIZON_DAYS = int(os.getenv("TRAININGS_SYNC_HORIZON_DAYS", "30"))
+
+# Jobs de relatório RUNNING há mais que isso são retomados por outro worker.
+REPORT_JOB_LEASE_SECONDS = int(os.getenv("REPORT_JOB_LEASE_SECONDS", "600"))
+# Idem para fotos de atleta PROCESSING (athletes/photos.py).
+ATHLETE_PHOTO_LEASE_SECONDS = int(os.getenv("ATHLETE_PHOTO_LEASE_SECONDS", "600"))
+
+# Instrumentação por requisição (core/middleware.py): header Server-Timing sempre;
+# linha de log em "core.requests" (INFO, ou WARNING acima de QUERY_BUDGET_WARN queries).
+QUERY_BUDGET_WARN = int(os.getenv("QUERY_BUDGET_WARN", "50"))
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
+}
+
 BRAND_LOGO_PATH = BASE_DIR / "media" / "brand" / "logo.png"
 BRAND_NAME = "Mamutes F.A."
 
@@ -0,0 +1,21 @@
+"""Helpers de teste compartilhados entre os apps."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    assertQueryBudget(url, max_queries): faz a requisição com self.client e falha se
+    a view passar do orçamento de queries, listando as queries executadas.
+    """
+
+    def assertQueryBudget(self, url, max_queries, method="get", status_code=200, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            response = getattr(self.client, method)(url, **kwargs)
+        self.assertEqual(response.status_code, status_code, f"{method.upper()} {url}")
+        executed = len(ctx.captured_queries)
+        if executed > max_queries:
+            queries = "\n".join(f"{i}. {q['sql']}" for i, q in enumerate(ctx.captured_queries, start=1))
+            self.fail(f"{method.upper()} {url}: {executed} queries (orçamento {max_queries})\n{queries}")
+        return response
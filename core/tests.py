@@ -0,0 +1,179 @@
+import logging
+from datetime import date
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APITestCase
+
+from athletes.models import Athlete
+from cashbox.models import SavingsGoal, Transaction
+from core.middleware import QueryInstrumentationMiddleware
+from core.testing import QueryBudgetMixin
+from core.workers import WorkerCommand
+from notices.models import Notice, NoticeComment, NoticeLike
+from playbook.models import Play
+from trainings.models import Attendance, DrillScore, TrainingDrill, TrainingSession
+
+
+class QueryInstrumentationMiddlewareTests(TestCase):
+	def setUp(self):
+		self.coach = User.objects.create_user(username="coach", password="pw")
+
+	def test_server_timing_header_and_log_line(self):
+		self.client.force_login(self.coach)
+		with self.assertLogs("core.requests", level=logging.INFO) as logs:
+			res = self.client.get("/admin/")
+		timing = res["Server-Timing"]
+		self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", db-slowest;dur=[\d.]+, app;dur=[\d.]+, total;dur=[\d.]+$')
+		record = logs.records[-1]
+		self.assertEqual(record.path, "/admin/")
+		self.assertGreater(record.queries, 0)
+		self.assertIn("SELECT", record.slowest_sql)
+
+	def test_async_requests_are_instrumented_without_sync_adaptation(self):
+		async def view(request):
+			return HttpResponse()
+
+		# sem adaptação sync↔async: com uma cadeia async o middleware também é async
+		self.assertTrue(QueryInstrumentationMiddleware.async_capable)
+		self.assertTrue(iscoroutinefunction(QueryInstrumentationMiddleware(view)))
+
+		async def get():
+			await self.async_client.aforce_login(self.coach)
+			return await self.async_client.get("/admin/")
+
+		with self.assertLogs("core.requests", level=logging.INFO) as logs:
+			res = async_to_sync(get)()
+		self.assertIn("db;dur=", res["Server-Timing"])
+		self.assertGreater(logs.records[-1].queries, 0)
+
+
+class WorkerCommandTests(SimpleTestCase):
+	def test_subclass_without_run_cycle_fails_on_creation(self):
+		class Forgetful(WorkerCommand):
+			worker_name = "Esquecido"
+
+		class Idle(WorkerCommand):
+			def run_cycle(self):
+				return 0, "nada"
+
+		with self.assertRaises(TypeError):
+			Forgetful()
+		self.assertEqual(Idle().run_cycle(), (0, "nada"))
+
+
+class EndpointQueryBudgetTests(QueryBudgetMixin, APITestCase):
+	"""
+	Orçamento de queries por endpoint. Os dados têm vários treinos, atletas, avisos etc.
+	para que um N+1 estoure o orçamento; ao otimizar um endpoint, baixe o número aqui.
+	"""
+
+	def setUp(self):
+		caches["analytics"].clear()
+		self.coach = User.objects.create_user(username="coach", password="pw")
+		self.coach.profile.role = "COACH"
+		self.coach.profile.save()
+		self.player = User.objects.create_user(username="player", password="pw")
+		self.client.force_authenticate(user=self.coach)
+
+		self.athletes = [
+			Athlete.objects.create(name=f"A{i}", current_position=("QB", "WR", "RB")[i % 3], user=self.player if i == 0 else None)
+			for i in range(6)
+		]
+		self.trainings = []
+		for day in range(1, 5):
+			training = TrainingSession.objects.create(date=date(2026, 3, day), created_by=self.coach)
+			self.trainings.append(training)
+			drills = [TrainingDrill.objects.create(training=training, name_override=f"D{k}", order=k) for k in range(3)]
+			for i, athlete in enumerate(self.athletes):
+				Attendance.objects.create(training=training, athlete=athlete, status="PRESENT" if i % 4 else "LATE")
+				for k, drill in enumerate(drills):
+					DrillScore.objects.create(training_drill=drill, athlete=athlete, score=(i + k + day) % 11)
+		self.training = self.trainings[-1]
+
+		for n in range(3):
+			notice = Notice.objects.create(title=f"Aviso {n}", body="...", created_by=self.coach)
+			NoticeLike.objects.create(notice=notice, user=self.player)
+			for c in range(2):
+				NoticeComment.objects.create(notice=notice, user=self.player, text=f"c{c}")
+		self.notice = notice
+
+		for n in range(3):
+			goal = SavingsGoal.objects.create(name=f"Meta {n}", target_amount=100, category="OUTROS", created_by=self.coach)
+			for t in range(2):
+				Transaction.objects.create(goal=goal, amount=10, type="deposito", created_by=self.coach)
+		self.goal = goal
+
+		self.play = Play.objects.create(name="Play", description="Desc", category="Ataque")
+
+	def test_trainings(self):
+		t = self.training.id
+		budgets = [
+			("/api/trainings/", 2),
+			(f"/api/trainings/{t}/", 1),
+			(f"/api/trainings/{t}/?expand=drills,scores,attendances", 4),
+			(f"/api/trainings/{t}/ranking/", 2),
+			(f"/api/trainings/{t}/coach_dashboard/", 6),
+			(f"/api/trainings/{t}/analytics/", 6),
+			("/api/trainings/coach_overview/", 4),
+			("/api/trainings/evolution/", 2),
+			("/api/trainings/attendance_trends/", 2),
+			("/api/trainings/boxplots/", 4),
+			("/api/trainings/sync/", 4),
+			(f"/api/trainings/{t}/export/csv/", 5),
+			("/api/trainings/catalog/", 1),
+			("/api/trainings/drills/", 2),
+			("/api/trainings/scores/", 1),
+			("/api/trainings/templates/", 1),
+		]
+		for url, budget in budgets:
+			with self.subTest(url=url):
+				self.assertQueryBudget(url, budget)
+
+	def test_dashboard(self):
+		self.client.force_authenticate(user=self.player)
+		for url, budget in [
+			("/api/dashboard/my/latest-training/", 3),
+			("/api/dashboard/my/drill-trends/?name=D1", 1),
+			("/api/dashboard/my/improvements/", 9),
+		]:
+			with self.subTest(url=url):
+				self.assertQueryBudget(url, budget)
+
+	def test_athletes(self):
+		for url, budget in [
+			("/api/athletes/", 1),
+			(f"/api/athletes/{self.athletes[0].id}/", 1),
+			("/api/athletes/stats/", 1),
+		]:
+			with self.subTest(url=url):
+				self.assertQueryBudget(url, budget)
+
+	def test_notices(self):
+		for url, budget in [
+			("/api/notices/", 2),
+			(f"/api/notices/{self.notice.id}/", 2),
+			(f"/api/notices/{self.notice.id}/comments/", 3),
+		]:
+			with self.subTest(url=url):
+				self.assertQueryBudget(url, budget)
+
+	def test_cashbox(self):
+		for url, budget in [
+			("/api/cashbox/goals/", 1),
+			(f"/api/cashbox/goals/{self.goal.id}/", 1),
+			(f"/api/cashbox/goals/{self.goal.id}/transactions/", 2),
+		]:
+			with self.subTest(url=url):
+				self.assertQueryBudget(url, budget)
+
+	def test_playbook(self):
+		for url, budget in [
+			("/api/playbook/plays/", 1),
+			(f"/api/playbook/plays/{self.play.id}/", 1),
+		]:
+			with self.subTest(url=url):
+				self.assertQueryBudget(url, budget)
@@ -0,0 +1,46 @@
+"""Laço compartilhado dos workers locais (run_report_worker, run_photo_worker)."""
+
+import time
+from abc import ABCMeta, abstractmethod
+
+from django.core.management.base import BaseCommand
+
+
+class WorkerCommand(BaseCommand, metaclass=ABCMeta):
+    """
+    Com --once roda um ciclo e sai; sem ele repete os ciclos, dormindo --sleep
+    segundos quando um ciclo não encontra trabalho, até Ctrl+C.
+
+    Subclasses definem worker_name e run_cycle(), que retorna (quantidade de
+    trabalho feito, mensagem do --once).
+    """
+
+    worker_name = "Worker"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Processa a fila atual e sai.")
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=2.0,
+            help="Intervalo (s) entre consultas à fila quando vazia (padrão: 2).",
+        )
+
+    @abstractmethod
+    def run_cycle(self):
+        """Processa um lote da fila. Retorna (quantidade de trabalho feito, mensagem)."""
+
+    def handle(self, *args, **opts):
+        if opts["once"]:
+            _done, message = self.run_cycle()
+            self.stdout.write(self.style.SUCCESS(message))
+            return
+
+        self.stdout.write(f"{self.worker_name} iniciado (Ctrl+C para sair).")
+        try:
+            while True:
+                done, _message = self.run_cycle()
+                if not done:
+                    time.sleep(opts["sleep"])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker encerrado.")
@@ -8,7 +8,6 @@ from django.http import HttpResponse
 from accounts.permissions import IsAdminOrCoachOrReadOnly
 from .models import Play
 from .serializers import PlaySerializer
-from .pdf import render_playbook_pdf
 
 
 class PlayViewSet(ModelViewSet):
@@ -22,6 +21,8 @@ class PlayViewSet(ModelViewSet):
 
     @action(detail=False, methods=["get"], url_path="export/pdf")
     def export_pdf(self, request, *args, **kwargs):
+        from .pdf import render_playbook_pdf  # ReportLab só é carregado quando alguém exporta
+
         qs = self.filter_queryset(self.get_queryset())
         pdf_bytes = render_playbook_pdf(qs, opts=None)
         resp = HttpResponse(pdf_bytes, content_type="application/pdf")
@@ -30,6 +31,8 @@ class PlayViewSet(ModelViewSet):
 
     @action(detail=True, methods=["get"], url_path="export/pdf")
     def export_play_pdf(self, request, *args, **kwargs):
+        from .pdf import render_playbook_pdf
+
         play = self.get_object()
         pdf_bytes = render_playbook_pdf([play], opts=None)
         safe_name = (play.name or "jogada").strip().replace('"', "") or "jogada"
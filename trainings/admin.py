@@ -1,8 +1,33 @@
 from django.contrib import admin
-from .models import TrainingSession, Attendance, DrillCatalog, TrainingDrill, DrillScore
+from .models import TrainingSession, Attendance, DrillCatalog, TrainingDrill, DrillScore, TrainingAthleteSummary, TrainingTemplate, TrainingTemplateDrill, ReportJob
 
 admin.site.register(TrainingSession)
 admin.site.register(Attendance)
 admin.site.register(DrillCatalog)
 admin.site.register(TrainingDrill)
-admin.site.register(DrillScore)
\ No newline at end of file
+admin.site.register(DrillScore)
+
+
+@admin.register(TrainingAthleteSummary)
+class TrainingAthleteSummaryAdmin(admin.ModelAdmin):
+    list_display = ("training", "athlete", "attendance_status", "weighted_points", "weight_sum", "scored_drills_count")
+    list_filter = ("attendance_status",)
+    readonly_fields = ("training", "athlete", "attendance_status", "weighted_points", "weight_sum", "scored_drills_count", "updated_at")
+
+
+class TrainingTemplateDrillInline(admin.TabularInline):
+    model = TrainingTemplateDrill
+    extra = 0
+
+
+@admin.register(TrainingTemplate)
+class TrainingTemplateAdmin(admin.ModelAdmin):
+    list_display = ("name", "created_by", "created_at")
+    search_fields = ("name",)
+    inlines = (TrainingTemplateDrillInline,)
+
+
+@admin.register(ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "training", "kind", "revision", "status", "created_at", "finished_at")
+    list_filter = ("kind", "status")
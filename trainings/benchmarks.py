@@ -0,0 +1,205 @@
+"""
+Benchmark dos endpoints (comando benchmark_endpoints).
+
+Cada perfil é um conjunto de parâmetros do seed_random_data com semente fixa, para
+que execuções em commits diferentes meçam o mesmo dataset. run_benchmark() semeia o
+banco atual e mede cada endpoint pelo APIClient: latência p50/p95 (ms), número de
+queries e pico de memória alocada (tracemalloc, numa execução separada para não
+distorcer a latência).
+"""
+
+import platform
+import subprocess
+import time
+import tracemalloc
+from io import StringIO
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from athletes.models import Athlete
+from . import stats
+from .models import Attendance, DrillCatalog, DrillScore, TrainingDrill, TrainingSession
+from .rollups import refresh_stale_rollups
+
+
+PROFILES = {
+    "smoke": {"athletes": 12, "trainings": 6, "catalog": 8, "drills_min": 3, "drills_max": 5},
+    "club": {"athletes": 60, "trainings": 100, "catalog": 18, "drills_min": 6, "drills_max": 10},
+    "federation": {"athletes": 2000, "trainings": 5000, "catalog": 40, "drills_min": 6, "drills_max": 10},
+}
+DEFAULT_SEED = 1234
+
+# (nome, usuário, url); {training} = treino mais recente, {athlete} = atleta do player.
+ENDPOINTS = [
+    ("trainings.list", "coach", "/api/trainings/"),
+    ("trainings.detail", "coach", "/api/trainings/{training}/"),
+    ("trainings.detail_expanded", "coach", "/api/trainings/{training}/?expand=drills,scores,attendances"),
+    ("trainings.ranking", "coach", "/api/trainings/{training}/ranking/"),
+    ("trainings.coach_dashboard", "coach", "/api/trainings/{training}/coach_dashboard/"),
+    ("trainings.analytics", "coach", "/api/trainings/{training}/analytics/"),
+    ("trainings.coach_overview", "coach", "/api/trainings/coach_overview/"),
+    ("trainings.evolution", "coach", "/api/trainings/evolution/"),
+    ("trainings.evolution_monthly", "coach", "/api/trainings/evolution/?grain=month"),
+    ("trainings.attendance_trends", "coach", "/api/trainings/attendance_trends/"),
+    ("trainings.boxplots", "coach", "/api/trainings/boxplots/"),
+    ("trainings.export_pdf", "coach", "/api/trainings/{training}/export/pdf/"),
+    ("trainings.export_csv", "coach", "/api/trainings/{training}/export/csv/"),
+    ("trainings.export_season_csv", "coach", "/api/trainings/export/season_csv/"),
+    ("trainings.sync_snapshot", "coach", "/api/trainings/sync/?training={training}"),
+    ("trainings.catalog", "coach", "/api/trainings/catalog/"),
+    ("trainings.drills", "coach", "/api/trainings/drills/?training={training}"),
+    ("trainings.scores", "coach", "/api/trainings/scores/?athlete={athlete}"),
+    ("athletes.list", "coach", "/api/athletes/"),
+    ("athletes.detail", "coach", "/api/athletes/{athlete}/"),
+    ("athletes.stats", "coach", "/api/athletes/stats/"),
+    ("dashboard.latest_training", "player", "/api/dashboard/my/latest-training/"),
+    ("dashboard.drill_trends", "player", "/api/dashboard/my/drill-trends/?drill_catalog_id={drill}"),
+    ("dashboard.improvements", "player", "/api/dashboard/my/improvements/"),
+    ("notices.list", "coach", "/api/notices/"),
+    ("cashbox.goals", "coach", "/api/cashbox/goals/"),
+    ("playbook.plays", "coach", "/api/playbook/plays/"),
+]
+
+
+def git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def seed_profile(profile, seed=DEFAULT_SEED):
+    # Caminho --bulk (sem signals, resumos numa agregação) e sem fotos: o dataset
+    # medido é o mesmo, e os perfis grandes semeiam em tempo útil.
+    call_command("seed_random_data", seed=seed, bulk=True, photos="none", stdout=StringIO(), **profile)
+    refresh_stale_rollups()
+
+
+def _users():
+    coach, _ = User.objects.get_or_create(username="benchmark-coach")
+    coach.profile.role = "COACH"
+    coach.profile.save()
+    player, _ = User.objects.get_or_create(username="benchmark-player")
+    athlete = (
+        Athlete.objects
+        .filter(user__isnull=True, is_active=True, attendances__status=Attendance.Status.PRESENT)
+        .order_by("id")
+        .first()
+    )
+    if athlete is not None:
+        athlete.user = player
+        athlete.save(update_fields=["user"])
+    else:
+        athlete = Athlete.objects.filter(user=player).first()
+    return {"coach": coach, "player": player}, athlete
+
+
+def _consume(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def _request(client, url, clear_cache):
+    if clear_cache:
+        caches[settings.TRAININGS_ANALYTICS_CACHE_ALIAS].clear()
+    response = client.get(url)
+    size = _consume(response)
+    return response, size
+
+
+def measure(client, url, repeat, clear_cache=True):
+    _request(client, url, clear_cache)  # aquecimento (imports, caches de módulo)
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response, size = _request(client, url, clear_cache)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    reset_queries()  # o log de queries é limitado; o seed pode tê-lo enchido
+    with CaptureQueriesContext(connection) as ctx:
+        _request(client, url, clear_cache)
+    queries = len(ctx.captured_queries)  # lido já: a próxima requisição limpa o log
+
+    tracemalloc.start()
+    try:
+        _request(client, url, clear_cache)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95 = stats.percentiles(timings, (50, 95))
+    return {
+        "status": response.status_code,
+        "bytes": size,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "mean_ms": round(stats.mean(timings), 2),
+        "queries": queries,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def dataset_counts():
+    return {
+        "athletes": Athlete.objects.count(),
+        "trainings": TrainingSession.objects.count(),
+        "drills": TrainingDrill.objects.count(),
+        "attendances": Attendance.objects.count(),
+        "scores": DrillScore.objects.count(),
+    }
+
+
+def run_benchmark(profile_name, profile, repeat=10, seed=DEFAULT_SEED, clear_cache=True, only=None):
+    """Semeia o banco atual com o perfil e mede os endpoints. Retorna o relatório (dict)."""
+    seed_started = time.perf_counter()
+    seed_profile(profile, seed=seed)
+    seed_seconds = time.perf_counter() - seed_started
+
+    users, athlete = _users()
+    training = TrainingSession.objects.order_by("-date", "-id").first()
+    drill = DrillCatalog.objects.order_by("id").first()
+    params = {
+        "training": training.id if training else 0,
+        "athlete": athlete.id if athlete else 0,
+        "drill": drill.id if drill else 0,
+    }
+
+    clients = {}
+    for role, user in users.items():
+        clients[role] = APIClient()
+        clients[role].force_authenticate(user=user)
+
+    results = []
+    for name, role, url in ENDPOINTS:
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        url = url.format(**params)
+        results.append({"name": name, "url": url, **measure(clients[role], url, repeat, clear_cache)})
+
+    return {
+        "profile": profile_name,
+        "params": profile,
+        "seed": seed,
+        "repeat": repeat,
+        "cache": "cold" if clear_cache else "warm",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": connection.vendor,
+        "dataset": dataset_counts(),
+        "seed_seconds": round(seed_seconds, 2),
+        "endpoints": results,
+    }
@@ -0,0 +1,217 @@
+from django.db import transaction
+
+from athletes.models import Athlete
+from .changes import collect_training_changes, touch_training, training_changed
+from .live import publish_attendances, publish_scores
+from .models import Attendance, DrillCatalog, DrillScore, TrainingDrill, TrainingTemplate, TrainingTemplateDrill
+from .serializers import AttendanceBulkItemSerializer, DrillScoreBulkItemSerializer, TrainingDrillBulkItemSerializer
+
+
+def _item_error(index, item, errors):
+    athlete = item.get("athlete") if isinstance(item, dict) else None
+    return {"index": index, "athlete": athlete, "errors": errors}
+
+
+def upsert_attendances(training, items):
+    """
+    Upsert em lote de presenças de um treino.
+
+    Valida todo o payload antes de escrever; itens inválidos são reportados em
+    `errors` (com o índice no payload) sem abortar os válidos. As linhas válidas são
+    gravadas numa transação com um único INSERT ... ON CONFLICT (training, athlete).
+    Se o mesmo atleta aparece mais de uma vez, vale o último item.
+
+    Retorna (attendances, errors); attendances vem de uma única query de leitura.
+    """
+    errors = []
+    valid = {}
+    for index, item in enumerate(items):
+        ser = AttendanceBulkItemSerializer(data=item)
+        if not ser.is_valid():
+            errors.append(_item_error(index, item, ser.errors))
+            continue
+        valid[ser.validated_data["athlete"]] = (index, ser.validated_data)
+
+    existing_athletes = set(Athlete.objects.filter(id__in=list(valid)).values_list("id", flat=True))
+    for athlete_id in [a for a in valid if a not in existing_athletes]:
+        index, data = valid.pop(athlete_id)
+        errors.append(_item_error(index, data, {"athlete": ["Atleta não encontrado."]}))
+
+    if not valid:
+        return [], sorted(errors, key=lambda e: e["index"])
+
+    rows = [
+        Attendance(
+            training=training,
+            athlete_id=athlete_id,
+            status=data["status"],
+            checkin_time=data.get("checkin_time"),
+        )
+        for athlete_id, (_index, data) in valid.items()
+    ]
+
+    with transaction.atomic():
+        Attendance.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=("training", "athlete"),
+            update_fields=("status", "checkin_time", "updated_at"),
+        )
+        publish_attendances(training.id, rows)
+        training_changed(training.id, list(valid))
+
+    attendances = list(
+        Attendance.objects
+        .filter(training=training, athlete_id__in=list(valid))
+        .select_related("athlete")
+        .order_by("athlete__name", "athlete_id")
+    )
+    return attendances, sorted(errors, key=lambda e: e["index"])
+
+
+def upsert_scores(training, items, rated_by=None):
+    """
+    Upsert em lote de notas de um treino.
+
+    Valida todas as linhas (0–10, drill pertencente ao treino, atleta existente)
+    antes de escrever; inválidas vão para `errors` sem abortar as demais. As válidas
+    são gravadas numa transação com um único INSERT ... ON CONFLICT
+    (training_drill, athlete). Linhas repetidas para o mesmo par: vale a última.
+
+    Retorna (rows, errors); rows são dicts id/training_drill/athlete/updated_at
+    lidos numa única query.
+    """
+    errors = []
+    valid = {}
+    for index, item in enumerate(items):
+        ser = DrillScoreBulkItemSerializer(data=item)
+        if not ser.is_valid():
+            errors.append(_item_error(index, item, ser.errors))
+            continue
+        data = ser.validated_data
+        valid[(data["training_drill"], data["athlete"])] = (index, data)
+
+    drill_ids = set(TrainingDrill.objects.filter(training=training).values_list("id", flat=True))
+    athlete_ids = set(
+        Athlete.objects.filter(id__in={athlete for _drill, athlete in valid}).values_list("id", flat=True)
+    )
+    for key in list(valid):
+        drill_id, athlete_id = key
+        if drill_id not in drill_ids:
+            index, data = valid.pop(key)
+            errors.append(_item_error(index, data, {"training_drill": ["Drill não pertence a este treino."]}))
+        elif athlete_id not in athlete_ids:
+            index, data = valid.pop(key)
+            errors.append(_item_error(index, data, {"athlete": ["Atleta não encontrado."]}))
+
+    errors.sort(key=lambda e: e["index"])
+    if not valid:
+        return [], errors
+
+    rows = [
+        DrillScore(
+            training_drill_id=drill_id,
+            athlete_id=athlete_id,
+            score=data["score"],
+            comment=data.get("comment"),
+            rated_by=rated_by,
+        )
+        for (drill_id, athlete_id), (_index, data) in valid.items()
+    ]
+    touched_athletes = {athlete_id for _drill, athlete_id in valid}
+
+    with transaction.atomic():
+        DrillScore.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=("training_drill", "athlete"),
+            update_fields=("score", "comment", "rated_by", "updated_at"),
+        )
+        publish_scores(training.id, rows)
+        training_changed(training.id, touched_athletes)
+
+    saved = {
+        (row["training_drill_id"], row["athlete_id"]): row
+        for row in (
+            DrillScore.objects
+            .filter(training_drill_id__in={d for d, _a in valid}, athlete_id__in=touched_athletes)
+            .values("id", "training_drill_id", "athlete_id", "updated_at")
+        )
+    }
+    return [saved[key] for key in valid if key in saved], errors
+
+
+DRILL_PLAN_FIELDS = ("drill_id", "name_override", "order", "description", "max_score", "weight")
+
+
+def create_drills(training, items):
+    """
+    Cria drills de um treino (payload de drills_bulk) com um único bulk_create.
+
+    Valida todos os itens antes (campos e drill do catálogo, este numa query); com
+    qualquer item inválido nada é criado. Retorna (drills, errors).
+    """
+    errors = []
+    valid = []
+    for index, item in enumerate(items):
+        ser = TrainingDrillBulkItemSerializer(data=item)
+        if not ser.is_valid():
+            errors.append({"index": index, "errors": ser.errors})
+            continue
+        valid.append((index, ser.validated_data))
+
+    catalog_ids = {data["drill"] for _index, data in valid if data["drill"] is not None}
+    existing = set(DrillCatalog.objects.filter(id__in=catalog_ids).values_list("id", flat=True))
+    for index, data in valid:
+        if data["drill"] is not None and data["drill"] not in existing:
+            errors.append({"index": index, "errors": {"drill": ["Drill do catálogo não encontrado."]}})
+
+    if errors:
+        return [], sorted(errors, key=lambda e: e["index"])
+
+    drills = [
+        TrainingDrill(
+            training=training,
+            drill_id=data["drill"],
+            name_override=data["name_override"],
+            order=data["order"],
+            description=data["description"],
+            max_score=data["max_score"],
+            weight=data["weight"],
+        )
+        for _index, data in valid
+    ]
+    with transaction.atomic():
+        created = TrainingDrill.objects.bulk_create(drills)
+        touch_training(training.id)
+    return created, []
+
+
+def copy_drill_plan(training, source, replace=False):
+    """
+    Instancia num treino o plano de drills de `source` (queryset de TrainingDrill ou
+    TrainingTemplateDrill) com uma leitura e um único bulk_create. Com replace=True,
+    os drills atuais do treino (e suas notas) são removidos antes.
+    """
+    plan = list(source.order_by("order", "id").values(*DRILL_PLAN_FIELDS))
+    with transaction.atomic(), collect_training_changes():
+        if replace:
+            TrainingDrill.objects.filter(training=training).delete()
+        created = TrainingDrill.objects.bulk_create(
+            [TrainingDrill(training=training, **row) for row in plan]
+        )
+        touch_training(training.id)
+    return created
+
+
+def save_drill_plan_as_template(training, name, created_by=None, notes=None):
+    """Salva os drills de um treino como TrainingTemplate (um bulk_create para os drills)."""
+    plan = list(
+        TrainingDrill.objects.filter(training=training).order_by("order", "id").values(*DRILL_PLAN_FIELDS)
+    )
+    with transaction.atomic():
+        template = TrainingTemplate.objects.create(name=name, notes=notes, created_by=created_by)
+        TrainingTemplateDrill.objects.bulk_create(
+            [TrainingTemplateDrill(template=template, **row) for row in plan]
+        )
+    return template
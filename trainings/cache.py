@@ -0,0 +1,68 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+
+def analytics_cache():
+    return caches[getattr(settings, "TRAININGS_ANALYTICS_CACHE_ALIAS", "default")]
+
+
+def cache_key(endpoint, training, params=None):
+    """
+    Chave por (endpoint, treino, revisão, query params). created_at entra na chave
+    para que um id reaproveitado (ex.: SQLite após delete) nunca herde entradas antigas.
+    """
+    items = sorted((k, v) for k, values in (params or {}).lists() for v in values) if params else []
+    digest = hashlib.sha1(repr(items).encode("utf-8")).hexdigest()[:16]
+    created = int(training.created_at.timestamp() * 1_000_000) if training.created_at else 0
+    return f"trainings:{endpoint}:{training.pk}:{created}:r{training.revision}:{digest}"
+
+
+def cached_training_response(endpoint):
+    """
+    Cacheia a resposta de uma action detail=True de TrainingSessionViewSet pela
+    revisão do treino. Respostas DRF guardam `data`; HttpResponse (exports) guardam
+    os bytes e os headers de download. Só respostas 200 são cacheadas.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(self, request, *args, **kwargs):
+            training = self.get_object()
+            cache = analytics_cache()
+            key = cache_key(endpoint, training, request.query_params)
+
+            hit = cache.get(key)
+            if hit is not None:
+                kind, payload = hit
+                if kind == "data":
+                    return Response(payload)
+                content, headers = payload
+                response = HttpResponse(content, content_type=headers.get("Content-Type"))
+                for name, value in headers.items():
+                    if name != "Content-Type":
+                        response[name] = value
+                return response
+
+            response = view_func(self, request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            if isinstance(response, Response):
+                cache.set(key, ("data", response.data))
+            elif not response.streaming:
+                headers = {
+                    name: response[name]
+                    for name in ("Content-Type", "Content-Disposition")
+                    if response.has_header(name)
+                }
+                cache.set(key, ("bytes", (response.content, headers)))
+            return response
+
+        return wrapper
+
+    return decorator
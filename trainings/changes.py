@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+
+from django.db import transaction
+from django.db.models import F
+
+from .live import publish_ranking_delta
+from .models import TrainingSession
+from .summaries import refresh_summaries
+
+
+# training_id -> set(athlete_ids) | None (None = treino inteiro; set vazio = só revisão)
+_pending = ContextVar("trainings_pending_changes", default=None)
+
+
+def _merge(pending, training_id, athlete_ids):
+    if athlete_ids is None or pending.get(training_id, set()) is None:
+        pending[training_id] = None
+    else:
+        pending.setdefault(training_id, set()).update(athlete_ids)
+
+
+def bump_revisions(training_ids, rollups_stale=False):
+    """
+    Incrementa TrainingSession.revision atomicamente (invalida caches do treino).
+    rollups_stale=True marca, no mesmo UPDATE, os rollups dos treinos para recálculo.
+    """
+    training_ids = list(training_ids)
+    if training_ids:
+        fields = {"revision": F("revision") + 1}
+        if rollups_stale:
+            fields["rollups_stale"] = True
+        TrainingSession.objects.filter(pk__in=training_ids).update(**fields)
+
+
+def _apply(training_id, athlete_ids):
+    aggregates_changed = athlete_ids is None or bool(athlete_ids)
+    refresh_summaries(training_id, athlete_ids=athlete_ids)
+    if aggregates_changed:
+        publish_ranking_delta(training_id, athlete_ids)
+    bump_revisions([training_id], rollups_stale=aggregates_changed)
+
+
+def training_changed(training_id, athlete_ids=None):
+    """
+    Ponto único de propagação de escritas em presença, drills e notas de um treino
+    para as estruturas derivadas (resumos materializados, ranking ao vivo, rollups e
+    revisão do treino).
+
+    athlete_ids=None recalcula o treino inteiro; uma coleção vazia só incrementa a
+    revisão (ex.: drill novo ou renomeado). Dentro de collect_training_changes() a
+    propagação é adiada e agrupada.
+    """
+    if training_id is None:
+        return
+    pending = _pending.get()
+    if pending is not None:
+        _merge(pending, training_id, athlete_ids)
+        return
+    _apply(training_id, athlete_ids)
+
+
+def touch_training(training_id):
+    """Só incrementa a revisão (mudanças que não afetam os agregados)."""
+    training_changed(training_id, athlete_ids=())
+
+
+@contextmanager
+def collect_training_changes():
+    """
+    Agrupa as propagações disparadas dentro do bloco (por signals ou chamadas
+    diretas) e aplica uma única vez por treino ao sair. Se o bloco levantar
+    exceção, a aplicação fica para o commit (descartada se houver rollback).
+    """
+    if _pending.get() is not None:
+        yield
+        return
+
+    pending = {}
+    token = _pending.set(pending)
+    try:
+        yield
+    except BaseException:
+        _pending.reset(token)
+        # A transação em volta provavelmente será desfeita (e pode estar quebrada):
+        # só propaga se o que foi escrito chegar a ser confirmado.
+        if pending:
+            transaction.on_commit(partial(_apply_all, pending), robust=True)
+        raise
+    _pending.reset(token)
+    _apply_all(pending)
+
+
+def _apply_all(pending):
+    for training_id, athlete_ids in pending.items():
+        _apply(training_id, athlete_ids)
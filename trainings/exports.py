@@ -0,0 +1,150 @@
+import csv
+from collections import defaultdict
+from itertools import islice
+
+from .models import Attendance, DrillScore, TrainingDrill, TrainingAthleteSummary, TrainingSession
+from .ranking import build_rankings
+
+
+SEASON_BASE_COLUMNS = (
+    "training_id",
+    "training_date",
+    "location",
+    "athlete_name",
+    "jersey_number",
+    "position",
+    "attendance_status",
+    "weighted_average",
+    "rank",
+)
+SEASON_TRAINING_CHUNK = 25
+
+
+def load_drills_and_scores(training):
+    """Drills do treino (ordenados) e todas as notas com atleta/drill carregados."""
+    drills = list(TrainingDrill.objects.filter(training=training).order_by("order", "id"))
+    drill_ids = [d.id for d in drills]
+    scores = list(
+        DrillScore.objects
+        .filter(training_drill_id__in=drill_ids)
+        .select_related("athlete", "training_drill", "training_drill__drill")
+    )
+    return drills, scores
+
+
+class Echo:
+    """Pseudo-buffer para csv.writer: devolve a linha em vez de acumulá-la."""
+
+    def write(self, value):
+        return value
+
+
+def _drill_key(drill_id, name_override):
+    """Drills do catálogo são unidos pelo id; drills avulsos, pelo nome."""
+    if drill_id:
+        return ("catalog", drill_id)
+    return ("name", (name_override or "Drill").strip().lower())
+
+
+def season_drill_columns(trainings):
+    """[(key, label)] com a união dos drills dos treinos (catálogo primeiro, por nome)."""
+    columns = {}
+    drills = (
+        TrainingDrill.objects
+        .filter(training__in=trainings)
+        .values_list("drill_id", "drill__name", "name_override")
+        .distinct()
+    )
+    for drill_id, catalog_name, name_override in drills:
+        key = _drill_key(drill_id, name_override)
+        columns.setdefault(key, catalog_name if drill_id else (name_override or "Drill").strip())
+    return sorted(columns.items(), key=lambda kv: (kv[0][0] != "catalog", kv[1].lower()))
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while chunk := list(islice(it, size)):
+        yield chunk
+
+
+def season_rows(trainings, chunk_size=SEASON_TRAINING_CHUNK):
+    """
+    Gera o header e uma linha por atleta × treino. Os treinos são lidos com
+    iterator() e processados em blocos de `chunk_size` (3 queries por bloco), então
+    a memória depende do tamanho do bloco, não da temporada.
+    """
+    columns = season_drill_columns(trainings)
+    yield (
+        list(SEASON_BASE_COLUMNS)
+        + [f"Drill: {label}" for _key, label in columns]
+        + [f"Comment: {label}" for _key, label in columns]
+    )
+
+    status_labels = dict(Attendance.Status.choices)
+    trainings = trainings.order_by("date", "id").only("id", "date", "location")
+    for chunk in _chunks(trainings.iterator(chunk_size=chunk_size), chunk_size):
+        ids = [t.id for t in chunk]
+        rankings = build_rankings(ids)
+
+        scores = defaultdict(dict)  # (training_id, athlete_id) -> {drill_key: (score, comment)}
+        rows = (
+            DrillScore.objects
+            .filter(training_drill__training_id__in=ids)
+            .order_by("training_drill__order", "training_drill_id")
+            .values_list(
+                "training_drill__training_id",
+                "athlete_id",
+                "training_drill__drill_id",
+                "training_drill__name_override",
+                "score",
+                "comment",
+            )
+        )
+        for training_id, athlete_id, drill_id, name_override, score, comment in rows.iterator():
+            scores[(training_id, athlete_id)].setdefault(
+                _drill_key(drill_id, name_override), (float(score), comment or "")
+            )
+
+        summaries = defaultdict(list)
+        for summary in (
+            TrainingAthleteSummary.objects
+            .filter(training_id__in=ids)
+            .select_related("athlete")
+            .order_by("athlete__name", "athlete_id")
+        ):
+            summaries[summary.training_id].append(summary)
+
+        for training in chunk:
+            ranked = {it["athlete_id"]: it for it in rankings[training.id].items}
+            for summary in summaries.get(training.id, []):
+                athlete = summary.athlete
+                r = ranked.get(athlete.id, {})
+                drill_scores = scores.get((training.id, athlete.id), {})
+                yield (
+                    [
+                        training.id,
+                        training.date,
+                        training.location or "",
+                        athlete.name,
+                        athlete.jersey_number or "",
+                        athlete.current_position or "",
+                        status_labels.get(summary.attendance_status, ""),
+                        r.get("weighted_average", ""),
+                        r.get("rank", ""),
+                    ]
+                    + [drill_scores.get(key, ("", ""))[0] for key, _label in columns]
+                    + [drill_scores.get(key, ("", ""))[1] for key, _label in columns]
+                )
+
+
+def stream_season_csv(date_from=None, date_to=None):
+    """Gerador de linhas CSV já codificadas (para StreamingHttpResponse)."""
+    trainings = TrainingSession.objects.all()
+    if date_from:
+        trainings = trainings.filter(date__gte=date_from)
+    if date_to:
+        trainings = trainings.filter(date__lte=date_to)
+
+    writer = csv.writer(Echo())
+    for row in season_rows(trainings):
+        yield writer.writerow(row)
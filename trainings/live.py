@@ -0,0 +1,143 @@
+"""
+Eventos do dashboard ao vivo (TrainingEvent) e manutenção incremental do ranking.
+
+Escritas de notas/presença publicam o que mudou; depois que os resumos dos atletas
+afetados são recalculados (changes._apply), publish_ranking_delta() reordena o
+ranking do treino a partir dos resumos e publica só os atletas cuja posição ou
+média mudou, comparando com o rank guardado em TrainingAthleteSummary.
+
+Os eventos só servem para conexões abertas e reconexões curtas: prune_events()
+remove os mais antigos que a duração máxima de uma conexão mais uma margem.
+"""
+
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import TrainingAthleteSummary, TrainingEvent
+from .ranking import RANKABLE_STATUSES, sort_and_rank, summary_item, team_weighted_average
+
+
+def publish(training_id, kind, payload):
+    return TrainingEvent.objects.create(
+        training_id=training_id,
+        kind=kind,
+        payload=json.loads(json.dumps(payload, cls=DjangoJSONEncoder)),
+    )
+
+
+def publish_scores(training_id, scores, deleted=False):
+    kind = TrainingEvent.Kind.SCORES_DELETED if deleted else TrainingEvent.Kind.SCORES
+    return publish(training_id, kind, {
+        "scores": [
+            {
+                "training_drill": s.training_drill_id,
+                "athlete": s.athlete_id,
+                "score": None if deleted else float(s.score),
+            }
+            for s in scores
+        ],
+    })
+
+
+def publish_attendances(training_id, attendances, deleted=False):
+    return publish(training_id, TrainingEvent.Kind.ATTENDANCE, {
+        "attendances": [
+            {
+                "athlete": a.athlete_id,
+                "status": None if deleted else a.status,
+                "checkin_time": None if deleted else a.checkin_time,
+            }
+            for a in attendances
+        ],
+    })
+
+
+def publish_ranking_delta(training_id, athlete_ids=None):
+    """
+    Reordena o ranking do treino a partir dos resumos e grava o novo rank só nas
+    linhas que mudaram. Publica um evento "ranking" com os atletas afetados
+    (athlete_ids; None = todos) e os que mudaram de posição. Sem mudanças, nada é
+    publicado.
+    """
+    summaries = list(
+        TrainingAthleteSummary.objects
+        .filter(training_id=training_id)
+        .select_related("athlete")
+    )
+    ranked = sort_and_rank([
+        summary_item(s)
+        for s in summaries
+        if s.attendance_status in RANKABLE_STATUSES and s.scored_drills_count > 0
+    ])
+    new_rank = {it["athlete_id"]: it for it in ranked}
+    affected = set(athlete_ids) if athlete_ids is not None else None
+
+    changed_rows = []
+    delta = []
+    for summary in summaries:
+        item = new_rank.get(summary.athlete_id)
+        rank = item["rank"] if item else None
+        moved = rank != summary.rank
+        if moved:
+            changed_rows.append(summary)
+        if moved or affected is None or summary.athlete_id in affected:
+            delta.append({
+                "athlete_id": summary.athlete_id,
+                "athlete_name": summary.athlete.name,
+                "position": summary.athlete.current_position,
+                "rank": rank,
+                "previous_rank": summary.rank,
+                "weighted_average": summary.weighted_average,
+                "scored_drills_count": summary.scored_drills_count,
+                "attendance_status": summary.attendance_status,
+            })
+        summary.rank = rank
+
+    if changed_rows:
+        TrainingAthleteSummary.objects.bulk_update(changed_rows, ["rank"])
+    if affected is not None:
+        # atletas afetados que deixaram de ter resumo (ex.: última nota removida)
+        present = {s.athlete_id for s in summaries}
+        delta.extend(
+            {"athlete_id": athlete_id, "rank": None, "removed": True}
+            for athlete_id in sorted(affected - present)
+        )
+    if delta:
+        publish(training_id, TrainingEvent.Kind.RANKING, {
+            "changes": delta,
+            "team_weighted_average": team_weighted_average(ranked),
+            "ranked_count": len(ranked),
+        })
+    return delta
+
+
+def events_since(training_id, last_id=0, limit=500):
+    return list(
+        TrainingEvent.objects
+        .filter(training_id=training_id, id__gt=last_id)
+        .order_by("id")[:limit]
+    )
+
+
+def events_retention():
+    return timedelta(seconds=(
+        getattr(settings, "TRAININGS_SSE_MAX_SECONDS", 300)
+        + getattr(settings, "TRAININGS_EVENTS_RETENTION_MARGIN_SECONDS", 3600)
+    ))
+
+
+def prune_events(now=None):
+    """Remove os eventos mais antigos que events_retention(). Retorna quantos."""
+    cutoff = (now or timezone.now()) - events_retention()
+    deleted, _ = TrainingEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def format_sse(event):
+    """Serializa um TrainingEvent no formato text/event-stream."""
+    data = json.dumps({"kind": event.kind, "created_at": event.created_at, **event.payload}, cls=DjangoJSONEncoder)
+    return f"id: {event.id}\nevent: {event.kind}\ndata: {data}\n\n"
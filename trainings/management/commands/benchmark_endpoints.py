@@ -0,0 +1,56 @@
+import json
+import shutil
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from trainings.benchmarks import DEFAULT_SEED, PROFILES, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Semeia um perfil (seed_random_data com semente fixa) num banco descartável e mede "
+        "latência p50/p95, queries e pico de memória dos endpoints. Saída em JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", default="club", choices=sorted(PROFILES))
+        parser.add_argument("--repeat", type=int, default=10, help="Requisições medidas por endpoint.")
+        parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        parser.add_argument("--warm-cache", action="store_true", help="Não limpa o cache de analytics entre requisições.")
+        parser.add_argument("--only", nargs="*", help="Prefixos de endpoint (ex.: trainings.analytics dashboard).")
+        parser.add_argument("--output", help="Arquivo JSON de saída (padrão: stdout).")
+
+    def handle(self, *args, **opts):
+        if opts["repeat"] < 1:
+            raise CommandError("--repeat deve ser >= 1.")
+
+        # Banco de teste descartável: o seed nunca toca os dados reais.
+        old_name = connection.settings_dict["NAME"]
+        media_root = tempfile.mkdtemp(prefix="mamutes_bench_media_")
+        setup_test_environment()
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(MEDIA_ROOT=media_root, DEBUG=False):
+                report = run_benchmark(
+                    opts["profile"],
+                    PROFILES[opts["profile"]],
+                    repeat=opts["repeat"],
+                    seed=opts["seed"],
+                    clear_cache=not opts["warm_cache"],
+                    only=opts["only"],
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        payload = json.dumps(report, indent=2, ensure_ascii=False)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Relatório salvo em {opts['output']}."))
+        else:
+            self.stdout.write(payload)
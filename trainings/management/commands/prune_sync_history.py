@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from trainings.sync import prune_sync_history, sync_horizon
+
+
+class Command(BaseCommand):
+    help = "Remove tombstones e recibos da sincronização offline além do horizonte."
+
+    def handle(self, *args, **opts):
+        tombstones, receipts = prune_sync_history()
+        self.stdout.write(self.style.SUCCESS(
+            f"{tombstones} tombstone(s) e {receipts} recibo(s) removidos "
+            f"(horizonte: {sync_horizon().days} dia(s))."
+        ))
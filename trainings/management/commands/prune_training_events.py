@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from trainings.live import events_retention, prune_events
+
+
+class Command(BaseCommand):
+    help = "Remove os eventos do dashboard ao vivo (TrainingEvent) mais antigos que a retenção."
+
+    def handle(self, *args, **opts):
+        total = prune_events()
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} evento(s) removido(s) (retenção: {int(events_retention().total_seconds())} s)."
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trainings.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Reconstrói os rollups semanais/mensais (time, atletas e drills do catálogo)."
+
+    @transaction.atomic
+    def handle(self, *args, **opts):
+        total = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rollups reconstruídos para {total} período(s)."))
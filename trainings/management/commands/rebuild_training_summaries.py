@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trainings.summaries import rebuild_summaries
+
+
+class Command(BaseCommand):
+    help = "Reconstrói TrainingAthleteSummary (agregados por treino/atleta) a partir das notas e presenças."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--training",
+            type=int,
+            action="append",
+            dest="trainings",
+            help="ID do treino a reconstruir (pode repetir). Sem ele, reconstrói todos.",
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **opts):
+        total = rebuild_summaries(training_ids=opts.get("trainings"))
+        self.stdout.write(self.style.SUCCESS(f"Resumos reconstruídos para {total} treino(s)."))
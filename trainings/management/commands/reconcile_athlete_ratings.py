@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from trainings.ratings import reconcile_ratings
+
+
+class Command(BaseCommand):
+    help = "Recalcula Athlete.rating a partir das notas e corrige os atletas com totais divergentes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Só lista as divergências, sem corrigir.")
+
+    @transaction.atomic
+    def handle(self, *args, **opts):
+        drifted = reconcile_ratings(fix=not opts["dry_run"])
+        for athlete_id, stored, actual in drifted:
+            self.stdout.write(f"Atleta #{athlete_id}: rating {stored:.4f} -> {actual:.4f}")
+        verb = "encontrados" if opts["dry_run"] else "corrigidos"
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} atleta(s) com rating divergente {verb}."))
@@ -0,0 +1,24 @@
+from core.workers import WorkerCommand
+from trainings.live import prune_events
+from trainings.reports import run_pending_jobs
+from trainings.rollups import refresh_stale_rollups
+from trainings.sync import prune_sync_history
+
+
+class Command(WorkerCommand):
+    help = (
+        "Worker local da fila de relatórios (ReportJob): renderiza PDFs fora do request, "
+        "recalcula os rollups dos treinos alterados e poda eventos ao vivo e o histórico "
+        "de sincronização antigos."
+    )
+    worker_name = "Worker de relatórios"
+
+    def run_cycle(self):
+        # poda não conta como trabalho: não impede o worker de dormir
+        prune_events()
+        prune_sync_history()
+        refreshed = refresh_stale_rollups()
+        total = run_pending_jobs()
+        return refreshed + total, (
+            f"{total} relatório(s) processado(s); rollups de {refreshed} treino(s) recalculados."
+        )
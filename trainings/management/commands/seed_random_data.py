@@ -14,6 +14,8 @@ from django.db import transaction
 
 from athletes.models import Athlete
 from trainings.models import Attendance, DrillCatalog, DrillScore, TrainingDrill, TrainingSession
+from trainings.rollups import rebuild_rollups
+from trainings.summaries import build_summaries
 
 try:
     from combine.models import AssessmentEvent, AssessmentResult, TestType
@@ -41,6 +43,10 @@ class SeedConfig:
     seed: int | None
     reset: bool
     with_combine: bool
+    days: int = 90
+    photos: str = "unique"
+    bulk: bool = False
+    batch_size: int = 5000
 
 
 FOOTBALL_DRILLS = [
@@ -154,6 +160,18 @@ def _score_decimal(rng: random.Random, max_score: int) -> Decimal:
     return Decimal(str(round(raw, 1))).quantize(Decimal("0.1"))
 
 
+def _rand_attendance_status(rng: random.Random) -> str:
+    # maioria presente
+    r = rng.random()
+    if r < 0.82:
+        return Attendance.Status.PRESENT
+    if r < 0.90:
+        return Attendance.Status.LATE
+    if r < 0.96:
+        return Attendance.Status.JUSTIFIED
+    return Attendance.Status.ABSENT
+
+
 def _maybe_comment(rng: random.Random) -> str | None:
     if rng.random() < 0.65:
         return None
@@ -228,6 +246,22 @@ class Command(BaseCommand):
             default=0.08,
             help="Probabilidade de NÃO gerar nota para um atleta em um drill (0-1).",
         )
+        parser.add_argument("--days", type=int, default=90, help="Janela (dias para trás) das datas dos treinos.")
+        parser.add_argument(
+            "--photos",
+            choices=("unique", "shared", "none"),
+            default="unique",
+            help="Foto por atleta (unique), um único arquivo reaproveitado (shared) ou sem foto (none).",
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help=(
+                "Gera as linhas em memória e grava com bulk_create em lotes (volume alto). "
+                "Resumos e rollups são reconstruídos no fim."
+            ),
+        )
+        parser.add_argument("--batch-size", type=int, default=5000, help="Linhas por bulk_create no modo --bulk.")
 
     @transaction.atomic
     def handle(self, *args, **opts):
@@ -241,6 +275,10 @@ class Command(BaseCommand):
             seed=opts.get("seed"),
             reset=bool(opts.get("reset")),
             with_combine=bool(opts.get("with_combine")),
+            days=max(1, int(opts.get("days") or 90)),
+            photos=opts.get("photos") or "unique",
+            bulk=bool(opts.get("bulk")),
+            batch_size=max(1, int(opts.get("batch_size") or 5000)),
         )
 
         if config.drills_per_training_min > config.drills_per_training_max:
@@ -251,11 +289,14 @@ class Command(BaseCommand):
         if config.reset:
             self._reset_data(config)
 
-        athletes = self._seed_athletes(rng, config)
-        catalog = self._seed_catalog(rng, config)
-        trainings = self._seed_trainings(rng, config)
+        if config.bulk:
+            athletes = self._bulk_seed(rng, config)
+        else:
+            athletes = self._seed_athletes(rng, config)
+            catalog = self._seed_catalog(rng, config)
+            trainings = self._seed_trainings(rng, config)
 
-        self._seed_training_content(rng, config, trainings, athletes, catalog)
+            self._seed_training_content(rng, config, trainings, athletes, catalog)
 
         if config.with_combine and HAS_COMBINE:
             self._seed_combine(rng, athletes)
@@ -276,32 +317,43 @@ class Command(BaseCommand):
 
         Athlete.objects.all().delete()
 
+    def _attach_photo(self, rng: random.Random, config: SeedConfig, athlete: Athlete, shared: dict):
+        if config.photos == "none" or not HAS_PIL:
+            return
+        # bulk_create não passa por Athlete.save(): a fila de fotos é marcada aqui.
+        athlete.photo_status = Athlete.PhotoStatus.PENDING
+        if config.photos == "shared" and shared.get("name"):
+            athlete.photo.name = shared["name"]
+            return
+        img, ext = _image_bytes(athlete.name, athlete.jersey_number, rng)
+        filename = f"seed_{uuid4().hex}.{ext}"
+        athlete.photo.save(filename, ContentFile(img), save=False)
+        shared["name"] = athlete.photo.name
+
+    def _build_athlete(self, rng: random.Random, used_numbers: set[int]) -> Athlete:
+        name = _rand_name(rng)
+        jersey = _rand_jersey(rng, used_numbers)
+        return Athlete(
+            name=name,
+            jersey_number=jersey,
+            birth_city=rng.choice(["São Paulo", "Campinas", "Santos", "Guarulhos", "Sorocaba", "Osasco"]),
+            birth_date=date.today() - timedelta(days=rng.randint(16 * 365, 34 * 365)),
+            height_m=_dec(rng.uniform(1.62, 1.98), places=2),
+            weight_kg=_dec(rng.uniform(65, 125), places=2),
+            current_position=_rand_position(rng),
+            desired_position=_rand_position(rng),
+            career_notes=rng.choice([None, "Rookie", "Veterano", "Foco em fundamentos", "Voltando de lesão"]) or "",
+            is_active=rng.random() > 0.08,
+        )
+
     def _seed_athletes(self, rng: random.Random, config: SeedConfig):
         used_numbers: set[int] = set()
+        shared_photo: dict = {}
         athletes: list[Athlete] = []
 
         for _ in range(config.athletes):
-            name = _rand_name(rng)
-            jersey = _rand_jersey(rng, used_numbers)
-
-            a = Athlete(
-                name=name,
-                jersey_number=jersey,
-                birth_city=rng.choice(["São Paulo", "Campinas", "Santos", "Guarulhos", "Sorocaba", "Osasco"]),
-                birth_date=date.today() - timedelta(days=rng.randint(16 * 365, 34 * 365)),
-                height_m=_dec(rng.uniform(1.62, 1.98), places=2),
-                weight_kg=_dec(rng.uniform(65, 125), places=2),
-                current_position=_rand_position(rng),
-                desired_position=_rand_position(rng),
-                career_notes=rng.choice([None, "Rookie", "Veterano", "Foco em fundamentos", "Voltando de lesão"]) or "",
-                is_active=rng.random() > 0.08,
-            )
-
-            if HAS_PIL:
-                img, ext = _image_bytes(name, jersey, rng)
-                filename = f"seed_{uuid4().hex}.{ext}"
-                a.photo.save(filename, ContentFile(img), save=False)
-
+            a = self._build_athlete(rng, used_numbers)
+            self._attach_photo(rng, config, a, shared_photo)
             a.save()
             athletes.append(a)
 
@@ -330,7 +382,7 @@ class Command(BaseCommand):
         today = date.today()
 
         for i in range(config.trainings):
-            d = today - timedelta(days=rng.randint(1, 90))
+            d = today - timedelta(days=rng.randint(1, config.days))
             # horários típicos
             st = time(hour=rng.choice([18, 19, 20]), minute=rng.choice([0, 10, 20, 30, 40, 50]))
 
@@ -378,15 +430,7 @@ class Command(BaseCommand):
 
             # presença: maioria presente
             for a in active_athletes:
-                r = rng.random()
-                if r < 0.82:
-                    status = Attendance.Status.PRESENT
-                elif r < 0.90:
-                    status = Attendance.Status.LATE
-                elif r < 0.96:
-                    status = Attendance.Status.JUSTIFIED
-                else:
-                    status = Attendance.Status.ABSENT
+                status = _rand_attendance_status(rng)
 
                 Attendance.objects.get_or_create(
                     training=t,
@@ -418,6 +462,108 @@ class Command(BaseCommand):
                         },
                     )
 
+    # ----------------------------
+    # Modo --bulk
+    # ----------------------------
+    def _bulk_seed(self, rng: random.Random, config: SeedConfig):
+        """
+        Mesmo conteúdo do modo normal, gerado em memória e gravado com bulk_create em
+        lotes de --batch-size. bulk_create não dispara signals: resumos (numa agregação
+        só, com os ratings acertados uma vez) e rollups são reconstruídos no fim.
+        """
+        used_numbers: set[int] = set()
+        shared_photo: dict = {}
+        athletes = []
+        for _ in range(config.athletes):
+            a = self._build_athlete(rng, used_numbers)
+            self._attach_photo(rng, config, a, shared_photo)
+            athletes.append(a)
+        athletes = Athlete.objects.bulk_create(athletes, batch_size=config.batch_size)
+
+        catalog = self._seed_catalog(rng, config)
+
+        today = date.today()
+        trainings = [
+            TrainingSession(
+                date=today - timedelta(days=rng.randint(1, config.days)),
+                start_time=time(hour=rng.choice([18, 19, 20]), minute=rng.choice([0, 10, 20, 30, 40, 50])),
+                location=rng.choice(LOCATIONS),
+                notes=rng.choice(NOTES),
+            )
+            for _ in range(config.trainings)
+        ]
+        trainings = TrainingSession.objects.bulk_create(trainings, batch_size=config.batch_size)
+        trainings.sort(key=lambda x: (x.date, x.id))
+
+        active_athletes = [a for a in athletes if a.is_active] or athletes
+        attendances: list[Attendance] = []
+        scores: list[DrillScore] = []
+        totals = {"attendances": 0, "scores": 0}
+
+        def flush(force=False):
+            if attendances and (force or len(attendances) >= config.batch_size):
+                Attendance.objects.bulk_create(attendances, batch_size=config.batch_size)
+                totals["attendances"] += len(attendances)
+                attendances.clear()
+            if scores and (force or len(scores) >= config.batch_size):
+                DrillScore.objects.bulk_create(scores, batch_size=config.batch_size)
+                totals["scores"] += len(scores)
+                scores.clear()
+
+        # Drills de um bloco de treinos num único bulk_create (precisamos dos ids para as notas).
+        chunk = max(1, config.batch_size // max(1, config.drills_per_training_max))
+        for start in range(0, len(trainings), chunk):
+            block = trainings[start:start + chunk]
+            drills_by_training = []
+            for t in block:
+                drills_count = rng.randint(config.drills_per_training_min, config.drills_per_training_max)
+                picked = rng.sample(catalog, k=min(drills_count, len(catalog)))
+                drills_by_training.append([
+                    TrainingDrill(
+                        training=t,
+                        drill=dc,
+                        order=order,
+                        description=dc.description,
+                        max_score=10,
+                        weight=_dec(rng.uniform(0.5, 2.0), places=2),
+                    )
+                    for order, dc in enumerate(picked, start=1)
+                ])
+            TrainingDrill.objects.bulk_create(
+                [d for drills in drills_by_training for d in drills], batch_size=config.batch_size
+            )
+
+            for t, training_drills in zip(block, drills_by_training):
+                absent_ids = set()
+                for a in active_athletes:
+                    status = _rand_attendance_status(rng)
+                    if status == Attendance.Status.ABSENT:
+                        absent_ids.add(a.id)
+                    attendances.append(Attendance(training=t, athlete=a, status=status))
+
+                for td in training_drills:
+                    for a in active_athletes:
+                        if a.id in absent_ids or rng.random() < config.score_missing_rate:
+                            continue
+                        scores.append(
+                            DrillScore(
+                                training_drill=td,
+                                athlete=a,
+                                score=_score_decimal(rng, td.max_score),
+                                comment=_maybe_comment(rng),
+                            )
+                        )
+                flush()
+        flush(force=True)
+
+        build_summaries([t.id for t in trainings], batch_size=config.batch_size)
+        rebuild_rollups()
+        self.stdout.write(
+            f"Bulk: {len(athletes)} atletas, {len(trainings)} treinos, "
+            f"{totals['attendances']} presenças, {totals['scores']} notas."
+        )
+        return athletes
+
     def _seed_combine(self, rng: random.Random, athletes: list[Athlete]):
         # Tipos comuns no futebol americano
         test_specs = [
@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Executado num processo novo (com -X importtime): sobe a aplicação WSGI e carrega o
+# URLconf, que é o que um worker faz antes de atender a primeira requisição.
+BOOT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+from django.urls import get_resolver
+get_wsgi_application()
+get_resolver().url_patterns
+seconds = time.perf_counter() - started
+try:
+    import resource
+    max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+except ImportError:
+    max_rss_kib = None
+print(json.dumps({"seconds": seconds, "max_rss_kib": max_rss_kib, "modules": sorted(sys.modules)}))
+"""
+
+HEAVY_MODULES = ("reportlab", "PIL", "numpy")
+
+
+def parse_importtime(stderr):
+    """Linhas "import time: self | cumulative | módulo" -> [(módulo, self_us, cumulative_us)]."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[0].isdigit():
+            continue  # cabeçalho
+        rows.append((parts[2], int(parts[0]), int(parts[1])))
+    return rows
+
+
+def profile_startup():
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise CommandError(f"Falha ao subir a aplicação:\n{proc.stderr[-2000:]}")
+    boot = json.loads(proc.stdout.strip().splitlines()[-1])
+    rows = parse_importtime(proc.stderr)
+
+    packages = defaultdict(int)
+    for name, self_us, _cumulative in rows:
+        packages[name.split(".")[0]] += self_us
+
+    loaded = set(boot["modules"])
+    return {
+        "seconds": round(boot["seconds"], 3),
+        "max_rss_kib": boot["max_rss_kib"],
+        "import_ms": round(sum(r[1] for r in rows) / 1000, 1),
+        "modules": [
+            {"module": name, "self_ms": round(self_us / 1000, 2), "cumulative_ms": round(cum_us / 1000, 2)}
+            for name, self_us, cum_us in sorted(rows, key=lambda r: r[1], reverse=True)
+        ],
+        "packages": [
+            {"package": name, "self_ms": round(us / 1000, 2)}
+            for name, us in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)
+        ],
+        "heavy_loaded": {name: name in loaded for name in HEAVY_MODULES},
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Sobe a aplicação num processo novo com -X importtime e mostra o tempo de import "
+        "por módulo e por pacote, o tempo total de boot e o pico de memória (RSS)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25, help="Quantos módulos listar (por tempo próprio).")
+        parser.add_argument("--json", action="store_true", help="Saída em JSON (lista completa).")
+        parser.add_argument(
+            "--forbid", nargs="*", default=[],
+            help="Pacotes que não podem ser carregados no boot (ex.: reportlab PIL); falha se forem.",
+        )
+
+    def handle(self, *args, **opts):
+        report = profile_startup()
+
+        if opts["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            rss = f"{report['max_rss_kib'] / 1024:.1f} MiB" if report["max_rss_kib"] else "n/d"
+            self.stdout.write(f"Boot: {report['seconds'] * 1000:.0f} ms (imports {report['import_ms']} ms), RSS máx.: {rss}")
+            self.stdout.write("")
+            self.stdout.write(f"{'pacote':<32} {'ms':>9}")
+            for row in report["packages"][: opts["top"]]:
+                self.stdout.write(f"{row['package']:<32} {row['self_ms']:>9.1f}")
+            self.stdout.write("")
+            self.stdout.write(f"{'módulo':<48} {'próprio':>9} {'acumulado':>10}")
+            for row in report["modules"][: opts["top"]]:
+                self.stdout.write(f"{row['module']:<48} {row['self_ms']:>9.1f} {row['cumulative_ms']:>10.1f}")
+            self.stdout.write("")
+            heavy = ", ".join(f"{name}={'sim' if on else 'não'}" for name, on in report["heavy_loaded"].items())
+            self.stdout.write(f"Carregados no boot: {heavy}")
+
+        loaded = {m["module"].split(".")[0] for m in report["modules"]}
+        offenders = [name for name in opts["forbid"] if name in loaded]
+        if offenders:
+            raise CommandError(f"Carregados no boot: {', '.join(offenders)}.")
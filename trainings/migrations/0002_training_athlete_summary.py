@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_summaries(apps, schema_editor):
+    Attendance = apps.get_model("trainings", "Attendance")
+    DrillScore = apps.get_model("trainings", "DrillScore")
+    TrainingAthleteSummary = apps.get_model("trainings", "TrainingAthleteSummary")
+
+    rows = {}
+    for training_id, athlete_id, status in Attendance.objects.values_list("training_id", "athlete_id", "status"):
+        rows[(training_id, athlete_id)] = TrainingAthleteSummary(
+            training_id=training_id,
+            athlete_id=athlete_id,
+            attendance_status=status,
+        )
+
+    numerator_expr = ExpressionWrapper(F("score") * F("training_drill__weight"), output_field=FloatField())
+    agg = (
+        DrillScore.objects
+        .values("training_drill__training_id", "athlete_id")
+        .annotate(
+            weighted_points=Coalesce(Sum(numerator_expr), 0.0),
+            weight_sum=Coalesce(Sum(F("training_drill__weight"), output_field=FloatField()), 0.0),
+            scored_drills_count=Count("training_drill_id"),
+        )
+    )
+    for row in agg:
+        key = (row["training_drill__training_id"], row["athlete_id"])
+        summary = rows.get(key)
+        if summary is None:
+            summary = rows[key] = TrainingAthleteSummary(training_id=key[0], athlete_id=key[1])
+        summary.weighted_points = float(row["weighted_points"] or 0.0)
+        summary.weight_sum = float(row["weight_sum"] or 0.0)
+        summary.scored_drills_count = int(row["scored_drills_count"] or 0)
+
+    TrainingAthleteSummary.objects.bulk_create(rows.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0001_initial'),
+        ('trainings', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingAthleteSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendance_status', models.CharField(blank=True, choices=[('PRESENT', 'Presente'), ('ABSENT', 'Ausente'), ('JUSTIFIED', 'Justificado'), ('LATE', 'Atraso')], max_length=12, null=True)),
+                ('weighted_points', models.FloatField(default=0.0)),
+                ('weight_sum', models.FloatField(default=0.0)),
+                ('scored_drills_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='training_summaries', to='athletes.athlete')),
+                ('training', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='athlete_summaries', to='trainings.trainingsession')),
+            ],
+            options={
+                'unique_together': {('training', 'athlete')},
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0003_trainingsession_revision'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='drillscore',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
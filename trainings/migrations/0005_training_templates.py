@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0004_drillscore_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrainingTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('name', 'id'),
+            },
+        ),
+        migrations.CreateModel(
+            name='TrainingTemplateDrill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name_override', models.CharField(blank=True, max_length=120, null=True)),
+                ('order', models.PositiveIntegerField(default=1)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('max_score', models.PositiveIntegerField(default=10)),
+                ('weight', models.DecimalField(decimal_places=2, default=1.0, max_digits=4)),
+                ('drill', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='trainings.drillcatalog')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='drills', to='trainings.trainingtemplate')),
+            ],
+            options={
+                'ordering': ('order', 'id'),
+            },
+        ),
+    ]
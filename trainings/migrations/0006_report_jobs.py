@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0005_training_templates'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('TRAINING_PDF', 'PDF do treino')], default='TRAINING_PDF', max_length=20)),
+                ('revision', models.PositiveIntegerField()),
+                ('status', models.CharField(choices=[('PENDING', 'Na fila'), ('RUNNING', 'Gerando'), ('DONE', 'Pronto'), ('FAILED', 'Falhou')], default='PENDING', max_length=10)),
+                ('file', models.FileField(blank=True, null=True, upload_to='reports/')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('training', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='report_jobs', to='trainings.trainingsession')),
+            ],
+            options={
+                'ordering': ('-created_at', '-id'),
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0001_initial'),
+        ('trainings', '0006_report_jobs'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingsession',
+            name='rollups_stale',
+            field=models.BooleanField(db_index=True, default=True, editable=False),
+        ),
+        migrations.CreateModel(
+            name='TeamRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('WEEK', 'Semana'), ('MONTH', 'Mês')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('trainings_count', models.PositiveIntegerField(default=0)),
+                ('scored_trainings', models.PositiveIntegerField(default=0)),
+                ('team_avg_sum', models.FloatField(default=0.0)),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('justified', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ('grain', 'period_start'),
+                'unique_together': {('grain', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='AthleteRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('WEEK', 'Semana'), ('MONTH', 'Mês')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('wavg_sum', models.FloatField(default=0.0)),
+                ('trainings_count', models.PositiveIntegerField(default=0)),
+                ('athlete', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='athletes.athlete')),
+            ],
+            options={
+                'unique_together': {('grain', 'period_start', 'athlete')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DrillRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('grain', models.CharField(choices=[('WEEK', 'Semana'), ('MONTH', 'Mês')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('score_sum', models.FloatField(default=0.0)),
+                ('scores_count', models.PositiveIntegerField(default=0)),
+                ('drill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='trainings.drillcatalog')),
+            ],
+            options={
+                'unique_together': {('grain', 'period_start', 'drill')},
+            },
+        ),
+    ]
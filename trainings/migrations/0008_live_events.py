@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0007_period_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trainingathletesummary',
+            name='rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TrainingEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('scores', 'Notas'), ('scores_deleted', 'Notas removidas'), ('attendance', 'Presença'), ('ranking', 'Ranking')], max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('training', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='trainings.trainingsession')),
+            ],
+            options={
+                'ordering': ('id',),
+            },
+        ),
+    ]
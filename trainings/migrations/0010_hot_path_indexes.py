@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:15
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('athletes', '0001_initial'),
+        ('trainings', '0009_sync_feed'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['training', 'status'], name='attendance_training_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['athlete', 'status', 'training'], name='attendance_athlete_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='drillscore',
+            index=models.Index(fields=['athlete', 'training_drill', 'score'], name='score_athlete_drill_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingathletesummary',
+            index=models.Index(fields=['training', 'attendance_status'], name='summary_training_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingdrill',
+            index=models.Index(fields=['training', 'order', 'id'], name='drill_training_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trainingsession',
+            index=models.Index(fields=['-date', '-id'], name='training_date_id_idx'),
+        ),
+    ]
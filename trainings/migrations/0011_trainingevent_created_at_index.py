@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trainings', '0010_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trainingevent',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -11,6 +11,32 @@ class TrainingSession(models.Model):
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    # Cursor do feed de sincronização (trainings/sync.py), assim como nos filhos.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Incrementada a cada escrita em presença/drills/notas (ver trainings/changes.py).
+    # Compõe a chave do cache de analytics/exports.
+    revision = models.PositiveIntegerField(default=0, editable=False)
+    # Marca o treino para recálculo dos rollups semanais/mensais (ver trainings/rollups.py).
+    rollups_stale = models.BooleanField(default=True, editable=False, db_index=True)
+
+    DERIVED_FIELDS = ("revision", "rollups_stale")
+
+    class Meta:
+        indexes = [
+            # listagem paginada e "últimos N treinos" (ORDER BY -date, -id LIMIT N)
+            models.Index(fields=["-date", "-id"], name="training_date_id_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # revision/rollups_stale só mudam via UPDATE atômico; um save comum nunca os
+        # sobrescreve com o valor (possivelmente antigo) carregado em memória.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.DERIVED_FIELDS
+            ]
+        return super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Treino {self.date}"
@@ -28,8 +54,16 @@ class Attendance(models.Model):
     status = models.CharField(max_length=12, choices=Status.choices, default=Status.PRESENT)
     checkin_time = models.TimeField(null=True, blank=True)
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     class Meta:
         unique_together = ("training", "athlete")
+        indexes = [
+            # contagens por status dos treinos (attendance_trends, rollups): cobre o GROUP BY
+            models.Index(fields=["training", "status"], name="attendance_training_status_idx"),
+            # "treinos em que o atleta esteve presente" (dashboard do atleta)
+            models.Index(fields=["athlete", "status", "training"], name="attendance_athlete_status_idx"),
+        ]
 
     def __str__(self):
         return f"{self.athlete.name} - {self.training.date} ({self.status})"
@@ -53,8 +87,14 @@ class TrainingDrill(models.Model):
     max_score = models.PositiveIntegerField(default=10)
     weight = models.DecimalField(max_digits=4, decimal_places=2, default=1.00)
 
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
     class Meta:
         ordering = ("order", "id")
+        indexes = [
+            # drills de um treino na ordem do plano, sem ordenação em memória
+            models.Index(fields=["training", "order", "id"], name="drill_training_order_idx"),
+        ]
 
     @property
     def name(self):
@@ -63,6 +103,42 @@ class TrainingDrill(models.Model):
     def __str__(self):
         return f"{self.training.date} - {self.name}"
 
+class TrainingTemplate(models.Model):
+    """Plano de drills reutilizável (instanciado num treino com um único bulk_create)."""
+    name = models.CharField(max_length=120)
+    notes = models.TextField(null=True, blank=True)
+
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("name", "id")
+
+    def __str__(self):
+        return self.name
+
+class TrainingTemplateDrill(models.Model):
+    template = models.ForeignKey(TrainingTemplate, on_delete=models.CASCADE, related_name="drills")
+    drill = models.ForeignKey(DrillCatalog, on_delete=models.SET_NULL, null=True, blank=True)
+    name_override = models.CharField(max_length=120, null=True, blank=True)
+
+    order = models.PositiveIntegerField(default=1)
+    description = models.TextField(null=True, blank=True)
+
+    max_score = models.PositiveIntegerField(default=10)
+    weight = models.DecimalField(max_digits=4, decimal_places=2, default=1.00)
+
+    class Meta:
+        ordering = ("order", "id")
+
+    @property
+    def name(self):
+        return self.name_override or (self.drill.name if self.drill else "Drill")
+
+    def __str__(self):
+        return f"{self.template.name} - {self.name}"
+
 class DrillScore(models.Model):
     training_drill = models.ForeignKey(TrainingDrill, on_delete=models.CASCADE, related_name="scores")
     athlete = models.ForeignKey(Athlete, on_delete=models.CASCADE, related_name="drill_scores")
@@ -72,6 +148,213 @@ class DrillScore(models.Model):
     rated_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        unique_together = ("training_drill", "athlete")
+        indexes = [
+            # notas de um atleta (tendências/melhorias do dashboard) com a nota no índice
+            models.Index(fields=["athlete", "training_drill", "score"], name="score_athlete_drill_idx"),
+        ]
+
+class TrainingAthleteSummary(models.Model):
+    """
+    Agregados materializados por (treino, atleta): pontos ponderados, soma de pesos,
+    drills avaliados e status de presença. Mantido a cada escrita em DrillScore,
+    TrainingDrill.weight e Attendance (ver trainings/summaries.py).
+    """
+
+    training = models.ForeignKey(TrainingSession, on_delete=models.CASCADE, related_name="athlete_summaries")
+    athlete = models.ForeignKey(Athlete, on_delete=models.CASCADE, related_name="training_summaries")
+
+    attendance_status = models.CharField(max_length=12, choices=Attendance.Status.choices, null=True, blank=True)
+    weighted_points = models.FloatField(default=0.0)
+    weight_sum = models.FloatField(default=0.0)
+    scored_drills_count = models.PositiveIntegerField(default=0)
+    # Posição no ranking geral do treino (None fora do ranking); mantida por trainings/live.py
+    # para publicar só as mudanças de posição.
+    rank = models.PositiveIntegerField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("training", "athlete")
+        indexes = [
+            # build_rankings: treinos + status rankeáveis
+            models.Index(fields=["training", "attendance_status"], name="summary_training_status_idx"),
+        ]
+
+    @property
+    def weighted_average(self):
+        if self.weight_sum > 0:
+            return round(self.weighted_points / self.weight_sum, 2)
+        return None
+
+    def __str__(self):
+        return f"{self.athlete_id} - {self.training_id} ({self.weighted_average})"
+
+
+class TrainingEvent(models.Model):
+    """
+    Evento incremental de um treino (nota, presença, delta de ranking) consumido pelo
+    stream SSE do dashboard ao vivo. O id é o cursor (Last-Event-ID).
+    """
+
+    class Kind(models.TextChoices):
+        SCORES = "scores", "Notas"
+        SCORES_DELETED = "scores_deleted", "Notas removidas"
+        ATTENDANCE = "attendance", "Presença"
+        RANKING = "ranking", "Ranking"
+
+    training = models.ForeignKey(TrainingSession, on_delete=models.CASCADE, related_name="events")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    payload = models.JSONField(default=dict)
+    # índice para a poda por idade (live.prune_events)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("id",)
+
+
+class SyncTombstone(models.Model):
+    """
+    Registro de remoção para o feed de sincronização offline. Remoções em cascata de
+    um treino (ou das notas de um drill) não geram tombstones próprios: o cliente
+    remove os filhos junto com o pai.
+    """
+
+    class Model(models.TextChoices):
+        TRAINING = "trainings", "Treino"
+        DRILL = "drills", "Drill"
+        ATTENDANCE = "attendances", "Presença"
+        SCORE = "scores", "Nota"
+
+    model = models.CharField(max_length=12, choices=Model.choices)
+    object_id = models.BigIntegerField()
+    # Sem FK: o treino pode ter sido removido junto.
+    training_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ("deleted_at", "id")
+
+
+class SyncReceipt(models.Model):
+    """Resultado de uma operação offline já aplicada, por chave de idempotência."""
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="sync_receipts")
+    key = models.CharField(max_length=64)
+    training = models.ForeignKey(TrainingSession, on_delete=models.SET_NULL, null=True, blank=True)
+    kind = models.CharField(max_length=20)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(default=dict)
+    # índice para a poda pelo horizonte (sync.prune_sync_history)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ("user", "key")
+
+
+class RollupGrain(models.TextChoices):
+    WEEK = "WEEK", "Semana"
+    MONTH = "MONTH", "Mês"
+
+
+class TeamRollup(models.Model):
+    """
+    Agregado do time por período (semana/mês) para tendências longas. Guarda somas
+    e contagens para que médias de vários períodos possam ser combinadas. Mantido
+    por trainings/rollups.py a cada mudança nos treinos do período.
+    """
+
+    grain = models.CharField(max_length=5, choices=RollupGrain.choices)
+    period_start = models.DateField()
+
+    trainings_count = models.PositiveIntegerField(default=0)
+    scored_trainings = models.PositiveIntegerField(default=0)
+    team_avg_sum = models.FloatField(default=0.0)  # soma das médias do time por treino
+
+    present = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    justified = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("grain", "period_start")
+        ordering = ("grain", "period_start")
+
+    @property
+    def team_average(self):
+        return self.team_avg_sum / self.scored_trainings if self.scored_trainings else None
+
+
+class AthleteRollup(models.Model):
+    """Média ponderada por atleta e período (soma das médias por treino + treinos avaliados)."""
+
+    grain = models.CharField(max_length=5, choices=RollupGrain.choices)
+    period_start = models.DateField()
+    athlete = models.ForeignKey(Athlete, on_delete=models.CASCADE, related_name="rollups")
+
+    wavg_sum = models.FloatField(default=0.0)
+    trainings_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("grain", "period_start", "athlete")
+
+    @property
+    def weighted_average(self):
+        return self.wavg_sum / self.trainings_count if self.trainings_count else None
+
+
+class DrillRollup(models.Model):
+    """Média das notas por drill do catálogo e período."""
+
+    grain = models.CharField(max_length=5, choices=RollupGrain.choices)
+    period_start = models.DateField()
+    drill = models.ForeignKey(DrillCatalog, on_delete=models.CASCADE, related_name="rollups")
+
+    score_sum = models.FloatField(default=0.0)
+    scores_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("grain", "period_start", "drill")
+
+    @property
+    def average(self):
+        return self.score_sum / self.scores_count if self.scores_count else None
+
+
+class ReportJob(models.Model):
+    """
+    Renderização de relatório em background (fila no banco, consumida por
+    `manage.py run_report_worker`). O arquivo gerado fica em MEDIA_ROOT/reports/ e é
+    reaproveitado enquanto a revisão do treino não mudar.
+    """
+
+    class Kind(models.TextChoices):
+        TRAINING_PDF = "TRAINING_PDF", "PDF do treino"
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "Na fila"
+        RUNNING = "RUNNING", "Gerando"
+        DONE = "DONE", "Pronto"
+        FAILED = "FAILED", "Falhou"
+
+    training = models.ForeignKey(TrainingSession, on_delete=models.CASCADE, related_name="report_jobs")
+    kind = models.CharField(max_length=20, choices=Kind.choices, default=Kind.TRAINING_PDF)
+    revision = models.PositiveIntegerField()
+
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    file = models.FileField(upload_to="reports/", null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
-        unique_together = ("training_drill", "athlete")
\ No newline at end of file
+        ordering = ("-created_at", "-id")
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.training_id} r{self.revision} ({self.status})"
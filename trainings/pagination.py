@@ -0,0 +1,12 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TrainingCursorPagination(CursorPagination):
+    """
+    Paginação por cursor da lista de treinos (mais recentes primeiro). `id` desempata
+    treinos do mesmo dia para o cursor ser estável.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-date", "-id")
@@ -0,0 +1,404 @@
+"""
+Renderização do PDF do treino (ReportLab). Importado sob demanda (export_pdf e
+worker de relatórios) para que processos que só servem JSON não carreguem o ReportLab.
+"""
+
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import (
+    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image, KeepTogether
+)
+
+from .exports import load_drills_and_scores
+from .models import Attendance
+from .ranking import build_ranking
+
+
+def render_training_pdf(training):
+    """Relatório premium de um treino (PDF, A4 paisagem). Retorna os bytes do arquivo."""
+
+    # =============================
+    # Coleta dados (reuso helpers)
+    # =============================
+    drills, scores = load_drills_and_scores(training)
+    drills_sorted = sorted(drills, key=lambda d: (d.order, d.id))
+
+    attendances = (
+        Attendance.objects
+        .filter(training=training)
+        .select_related("athlete")
+        .order_by("athlete__name")
+    )
+
+    # Ranking geral + por posição (já com tie-break + ponderada)
+    ranking = build_ranking(training)
+    ranking_items = ranking.items
+    ranking_by_position = ranking.by_position
+
+    # score_map: (athlete_id, drill_id) -> (score, comment)
+    score_map = {}
+    for s in scores:
+        score_map[(s.athlete_id, s.training_drill_id)] = (float(s.score), s.comment or "")
+
+    ranking_map = {r["athlete_id"]: r for r in ranking_items}
+
+    # Resumo
+    total_athletes = attendances.count()
+    present_count = attendances.filter(status__in=["PRESENT", "LATE"]).count()
+    absent_count = attendances.filter(status="ABSENT").count()
+    justified_count = attendances.filter(status="JUSTIFIED").count()
+    drills_total = len(drills_sorted)
+
+    training_weighted_avg = ranking.weighted_average
+
+    # =============================
+    # PDF setup
+    # =============================
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=landscape(A4),
+        leftMargin=1.2 * cm,
+        rightMargin=1.2 * cm,
+        topMargin=1.0 * cm,
+        bottomMargin=1.0 * cm,
+        title=f"Relatório de Treino {training.date}",
+    )
+
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name="TitleX", fontSize=20, leading=22, spaceAfter=10))
+    styles.add(ParagraphStyle(name="H1X", fontSize=14, leading=16, spaceBefore=10, spaceAfter=6))
+    styles.add(ParagraphStyle(name="H2X", fontSize=11, leading=13, spaceBefore=8, spaceAfter=5))
+    styles.add(ParagraphStyle(name="SmallX", fontSize=9, leading=11))
+    styles.add(ParagraphStyle(name="TinyX", fontSize=8, leading=10))
+    styles.add(ParagraphStyle(name="HdrTinyX", fontName="Helvetica-Bold", fontSize=7, leading=8, alignment=1, wordWrap="CJK"))
+    styles.add(ParagraphStyle(name="CellTinyX", fontSize=7, leading=8, wordWrap="CJK"))
+
+    brand_name = getattr(settings, "BRAND_NAME", "Mamutes F.A.")
+    logo_path = getattr(settings, "BRAND_LOGO_PATH", None)
+
+    def tstyle(header_bg="#F0F0F0"):
+        return TableStyle([
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(header_bg)),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#C9C9C9")),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("VALIGN", (0, 0), (-1, 0), "TOP"),
+            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#FAFAFA")]),
+            ("LEFTPADDING", (0, 0), (-1, -1), 4),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
+            ("TOPPADDING", (0, 0), (-1, -1), 3),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
+        ])
+
+    def page_footer(canvas, doc_):
+        canvas.saveState()
+        canvas.setFont("Helvetica", 9)
+        canvas.drawRightString(landscape(A4)[0] - doc_.rightMargin, 0.75*cm, f"Página {doc_.page}")
+        canvas.restoreState()
+
+    def safe_logo():
+        if not logo_path:
+            return None
+        try:
+            img = Image(str(logo_path))
+            img.drawHeight = 2.2 * cm
+            img.drawWidth = 2.2 * cm
+            return img
+        except Exception:
+            return None
+
+    # =============================
+    # Charts (Top N bar chart)
+    # =============================
+    def build_top_bar_chart(items, top_n=10):
+        """
+        Bar chart Top N (weighted_average). Itens já ordenados.
+        """
+        top = [x for x in items if x["weighted_average"] is not None][:top_n]
+        if not top:
+            return None
+
+        labels = [x["athlete_name"][:12] for x in top]  # curta pra caber
+        values = [x["weighted_average"] for x in top]
+
+        d = Drawing(26*cm, 7.2*cm)
+
+        title = String(0, 6.8*cm, f"Top {len(top)} - Média Ponderada (0–10)", fontName="Helvetica-Bold", fontSize=10)
+        d.add(title)
+
+        chart = VerticalBarChart()
+        chart.x = 0.5*cm
+        chart.y = 0.8*cm
+        chart.height = 5.6*cm
+        chart.width = 25*cm
+        chart.data = [values]
+        chart.valueAxis.valueMin = 0
+        chart.valueAxis.valueMax = 10
+        chart.valueAxis.valueStep = 1
+
+        chart.categoryAxis.categoryNames = labels
+        chart.categoryAxis.labels.fontName = "Helvetica"
+        chart.categoryAxis.labels.fontSize = 7
+        chart.categoryAxis.labels.angle = 30
+        chart.categoryAxis.labels.dy = -10
+
+        # estilo neutro
+        chart.bars[0].fillColor = colors.HexColor("#4F81BD")
+        chart.valueAxis.labels.fontSize = 8
+        chart.valueAxis.labels.fontName = "Helvetica"
+
+        d.add(chart)
+        return d
+
+    # =============================
+    # Drill columns chunking (smart split)
+    # =============================
+    # Larguras por drill
+    NOTE_COL_W = 1.2 * cm
+    COMMENT_COL_W = 2.8 * cm
+    # Larguras base (fixas) para a tabela de notas
+    NOTES_BASE_WIDTHS = [7.0 * cm, 1.6 * cm, 1.8 * cm, 2.4 * cm, 2.0 * cm, 1.2 * cm]  # atleta, camisa, pos, status, média, rank
+
+    def calc_max_drills_per_page():
+        page_width = landscape(A4)[0] - (doc.leftMargin + doc.rightMargin)
+
+        # Cada drill vira 2 colunas (nota + coment) → coment é maior
+        # Mas no nosso layout por página, vamos mostrar:
+        #   - colunas fixas
+        #   - N drills (nota)
+        #   - N drills (coment)
+        # Para caber, limitamos N por página
+        remaining_width = max(page_width - sum(NOTES_BASE_WIDTHS), 10 * cm)
+
+        # “custo” por drill = (nota_col + comment_col)
+        # nota pequena, comment média
+        per_drill = (NOTE_COL_W + COMMENT_COL_W)
+        max_n = int(remaining_width // per_drill)
+        return max(1, min(max_n, 10))  # no máximo 10 drills por página pra manter legível
+
+    max_drills_page = calc_max_drills_per_page()
+
+    def chunk_list(lst, size):
+        for i in range(0, len(lst), size):
+            yield lst[i:i+size]
+
+    # =============================
+    # Build PDF story
+    # =============================
+    story = []
+
+    # -------- Capa --------
+    logo = safe_logo()
+    cover_bits = []
+    if logo:
+        cover_bits.append(logo)
+        cover_bits.append(Spacer(1, 8))
+
+    cover_bits.append(Paragraph(f"{brand_name}", styles["TitleX"]))
+    cover_bits.append(Paragraph("Relatório Premium de Treino", styles["H1X"]))
+    cover_bits.append(Spacer(1, 6))
+    cover_bits.append(Paragraph(
+        f"<b>Data:</b> {training.date} &nbsp;&nbsp; "
+        f"<b>Horário:</b> {training.start_time or '-'} &nbsp;&nbsp; "
+        f"<b>Local:</b> {training.location or '-'}",
+        styles["Normal"]
+    ))
+    if training.notes:
+        cover_bits.append(Spacer(1, 6))
+        cover_bits.append(Paragraph(f"<b>Observações:</b> {training.notes}", styles["SmallX"]))
+
+    cover_bits.append(Spacer(1, 14))
+    cover_bits.append(Paragraph(
+        f"<b>Resumo rápido:</b> "
+        f"Atletas={total_athletes} | Presentes/Atraso={present_count} | "
+        f"Ausentes={absent_count} | Justificados={justified_count} | "
+        f"Drills={drills_total} | "
+        f"Média ponderada do treino={training_weighted_avg if training_weighted_avg is not None else '-'}",
+        styles["Normal"]
+    ))
+
+    story.append(KeepTogether(cover_bits))
+    story.append(PageBreak())
+
+    # -------- Sumário executivo + Top 3 --------
+    story.append(Paragraph("Sumário Executivo", styles["H1X"]))
+
+    sum_table = Table([[
+        "Atletas", "Presentes/Atraso", "Ausentes", "Justificados", "Drills", "Média Ponderada"
+    ], [
+        str(total_athletes),
+        str(present_count),
+        str(absent_count),
+        str(justified_count),
+        str(drills_total),
+        str(training_weighted_avg) if training_weighted_avg is not None else "-"
+    ]], repeatRows=1)
+    sum_table.setStyle(tstyle(header_bg="#E8F0FE"))
+    story.append(sum_table)
+    story.append(Spacer(1, 10))
+
+    # Top 3 geral
+    story.append(Paragraph("Top 3 Geral (média ponderada + desempate)", styles["H2X"]))
+    top3 = ranking_items[:3]
+    top3_data = [["Rank", "Atleta", "Camisa", "Posição", "Média", "Drills", "Pontos"]]
+    for r in top3:
+        top3_data.append([
+            r.get("rank", ""), r.get("athlete_name", ""),
+            r.get("jersey_number", "") or "",
+            r.get("position", "") or "",
+            r.get("weighted_average", "") if r.get("weighted_average") is not None else "",
+            r.get("scored_drills_count", ""),
+            r.get("weighted_points", ""),
+        ])
+    ttop = Table(top3_data, repeatRows=1)
+    ttop.setStyle(tstyle(header_bg="#E6FFE6"))
+    story.append(ttop)
+    story.append(Spacer(1, 10))
+
+    # Top 3 por posição
+    story.append(Paragraph("Top 3 por Posição", styles["H2X"]))
+    pos_rows = [["Posição", "1º", "2º", "3º"]]
+    for pos, items in sorted(ranking_by_position.items(), key=lambda x: x[0]):
+        names = [f'{x["athlete_name"]} ({x["weighted_average"]})' if x["weighted_average"] is not None else x["athlete_name"] for x in items[:3]]
+        while len(names) < 3:
+            names.append("-")
+        pos_rows.append([pos, names[0], names[1], names[2]])
+
+    tpos = Table(pos_rows, repeatRows=1)
+    tpos.setStyle(tstyle(header_bg="#FFF2CC"))
+    story.append(tpos)
+    story.append(Spacer(1, 12))
+
+    # Gráfico Top N
+    chart = build_top_bar_chart(ranking_items, top_n=10)
+    if chart:
+        story.append(Paragraph("Gráfico", styles["H2X"]))
+        story.append(chart)
+        story.append(Spacer(1, 8))
+
+    story.append(PageBreak())
+
+    # -------- Presença --------
+    story.append(Paragraph("Presença", styles["H1X"]))
+    attendance_data = [["Atleta", "Camisa", "Posição", "Status", "Check-in"]]
+    for a in attendances:
+        attendance_data.append([
+            a.athlete.name,
+            a.athlete.jersey_number or "",
+            a.athlete.current_position or "",
+            a.get_status_display(),
+            a.checkin_time or "",
+        ])
+    t_att = Table(attendance_data, repeatRows=1)
+    t_att.setStyle(tstyle())
+    story.append(t_att)
+    story.append(PageBreak())
+
+    # -------- Ranking completo --------
+    story.append(Paragraph("Ranking Completo (ponderado + desempate)", styles["H1X"]))
+    ranking_data = [["Rank", "Atleta", "Camisa", "Posição", "Média ponderada", "Drills avaliados", "Pontos ponderados"]]
+    for r in ranking_items:
+        ranking_data.append([
+            r.get("rank", ""),
+            r.get("athlete_name", ""),
+            r.get("jersey_number", "") or "",
+            r.get("position", "") or "",
+            r.get("weighted_average", "") if r.get("weighted_average") is not None else "",
+            r.get("scored_drills_count", ""),
+            r.get("weighted_points", ""),
+        ])
+    t_rank = Table(ranking_data, repeatRows=1)
+    t_rank.setStyle(tstyle())
+    story.append(t_rank)
+    story.append(PageBreak())
+
+    # -------- Notas por Drill (smart split por colunas) --------
+    story.append(Paragraph("Notas por Drill (com comentários)", styles["H1X"]))
+    story.append(Paragraph(
+        f"Quando há muitos drills, o relatório divide em {max_drills_page} drills por página (nota + comentário).",
+        styles["SmallX"]
+    ))
+    story.append(Spacer(1, 8))
+
+    # Para cada “chunk” de drills, gera uma tabela
+    drill_chunks = list(chunk_list(drills_sorted, max_drills_page))
+    total_chunks = len(drill_chunks)
+
+    for idx, chunk in enumerate(drill_chunks, start=1):
+        story.append(Paragraph(f"Bloco {idx}/{total_chunks}", styles["H2X"]))
+
+        hdr = styles["HdrTinyX"]
+        headers = [
+            Paragraph("Atleta", hdr),
+            Paragraph("Camisa", hdr),
+            Paragraph("Posição", hdr),
+            Paragraph("Status", hdr),
+            Paragraph("Média", hdr),
+            Paragraph("Rank", hdr),
+        ]
+        for d in chunk:
+            headers.append(Paragraph(f"{escape(str(d.name))}<br/>(nota)", hdr))
+        for d in chunk:
+            headers.append(Paragraph(f"{escape(str(d.name))}<br/>(coment.)", hdr))
+
+        rows = [headers]
+
+        for a in attendances:
+            athlete = a.athlete
+            r = ranking_map.get(athlete.id, {})
+            base = [
+                Paragraph(escape(str(athlete.name or "")), styles["SmallX"]),
+                str(athlete.jersey_number or ""),
+                str(athlete.current_position or ""),
+                str(a.get_status_display()),
+                str(r.get("weighted_average", "") if r.get("weighted_average") is not None else ""),
+                str(r.get("rank", "")),
+            ]
+
+            scores_row = []
+            comments_row = []
+            for d in chunk:
+                sc, comment = score_map.get((athlete.id, d.id), ("", ""))
+                scores_row.append(sc)
+
+                # comentário “legível”
+                if isinstance(comment, str):
+                    comment_txt = comment.strip()
+                    comment_txt = (comment_txt[:120] + "...") if len(comment_txt) > 123 else comment_txt
+                else:
+                    comment_txt = ""
+                comments_row.append(Paragraph(escape(comment_txt), styles["CellTinyX"]))
+
+            rows.append(base + scores_row + comments_row)
+
+        # Larguras (fixas por drill: nota menor, comentário maior)
+        col_widths = NOTES_BASE_WIDTHS + ([NOTE_COL_W] * len(chunk)) + ([COMMENT_COL_W] * len(chunk))
+        page_width = landscape(A4)[0] - (doc.leftMargin + doc.rightMargin)
+        total_w = sum(col_widths)
+        if total_w > page_width:
+            ratio = page_width / total_w
+            col_widths = [w * ratio for w in col_widths]
+
+        t_notes = Table(rows, colWidths=col_widths, repeatRows=1)
+        t_notes.setStyle(tstyle())
+        story.append(t_notes)
+
+        if idx < total_chunks:
+            story.append(PageBreak())
+
+    # Build
+    doc.build(story, onFirstPage=page_footer, onLaterPages=page_footer)
+
+    pdf = buffer.getvalue()
+    buffer.close()
+    return pdf
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from .models import Attendance, TrainingAthleteSummary
+
+
+RANKABLE_STATUSES = (Attendance.Status.PRESENT, Attendance.Status.LATE)
+
+
+def sort_and_rank(items):
+    """
+    Ordena items de ranking (in-place) com tie-break e preenche "rank":
+        1) weighted_average desc
+        2) scored_drills_count desc
+        3) weighted_points (numerator) desc
+        4) athlete_name asc
+    """
+    items.sort(
+        key=lambda x: (
+            x["weighted_average"] is None,
+            -(x["weighted_average"] or -9999),
+            -x["scored_drills_count"],
+            -x["weighted_points"],
+            x["athlete_name"].lower() if x["athlete_name"] else "",
+        )
+    )
+    for i, it in enumerate(items, start=1):
+        it["rank"] = i
+    return items
+
+
+def team_weighted_average(items):
+    """Média das médias ponderadas dos atletas rankeados (None se não houver)."""
+    valid = [x["weighted_average"] for x in items if x["weighted_average"] is not None]
+    return round(sum(valid) / len(valid), 2) if valid else None
+
+
+@dataclass
+class TrainingRanking:
+    """Ranking geral de um treino + ranking por posição, calculados uma única vez."""
+
+    items: list = field(default_factory=list)
+    by_position: dict = field(default_factory=dict)
+
+    @property
+    def weighted_average(self):
+        return team_weighted_average(self.items)
+
+    @property
+    def scored(self):
+        """Apenas atletas com média ponderada (exclui quem só tem pesos zerados)."""
+        return [x for x in self.items if x["weighted_average"] is not None]
+
+    def for_position(self, position_code=None):
+        if not position_code:
+            return self.items
+        return self.by_position.get(position_code, [])
+
+
+def summary_item(summary):
+    """Item de ranking (sem rank) a partir de um TrainingAthleteSummary com athlete carregado."""
+    return {
+        "athlete_id": summary.athlete_id,
+        "athlete_name": summary.athlete.name,
+        "jersey_number": summary.athlete.jersey_number,
+        "position": summary.athlete.current_position,
+        "attendance_status": summary.attendance_status,
+        "weighted_average": summary.weighted_average,
+        "scored_drills_count": int(summary.scored_drills_count or 0),
+        "weighted_points": round(float(summary.weighted_points or 0.0), 3),
+    }
+
+
+def _ranking_from_summaries(summaries):
+    items = []
+    positions = set()
+    for summary in summaries:
+        if summary.athlete.current_position:
+            positions.add(summary.athlete.current_position)
+        if summary.scored_drills_count > 0:
+            items.append(summary_item(summary))
+
+    sort_and_rank(items)
+
+    grouped = defaultdict(list)
+    for it in items:
+        if it["position"]:
+            grouped[it["position"]].append(dict(it))
+    by_position = {pos: sort_and_rank(grouped.get(pos, [])) for pos in sorted(positions)}
+
+    return TrainingRanking(items=items, by_position=by_position)
+
+
+def build_rankings(training_ids):
+    """
+    Rankings de vários treinos com uma única leitura de TrainingAthleteSummary.
+    Retorna {training_id: TrainingRanking}; treinos sem atletas rankeáveis recebem
+    um TrainingRanking vazio. O número de queries não depende de len(training_ids).
+    """
+    training_ids = list(dict.fromkeys(training_ids))
+    if not training_ids:
+        return {}
+
+    summaries = (
+        TrainingAthleteSummary.objects
+        .filter(training_id__in=training_ids, attendance_status__in=RANKABLE_STATUSES)
+        .select_related("athlete")
+    )
+    bucket = defaultdict(list)
+    for summary in summaries:
+        bucket[summary.training_id].append(summary)
+
+    return {tid: _ranking_from_summaries(bucket.get(tid, [])) for tid in training_ids}
+
+
+def build_ranking(training):
+    """
+    Monta o ranking geral e por posição de um treino com uma única leitura indexada
+    de TrainingAthleteSummary. Os rankings por posição são derivados em memória e
+    seguem as mesmas regras de desempate do geral (rank reinicia em cada posição).
+    """
+    training_id = getattr(training, "pk", training)
+    return build_rankings([training_id])[training_id]
@@ -0,0 +1,111 @@
+"""
+Rating acumulado do atleta (Athlete.rating_points / rating_weight / rating).
+
+rating = Σ(nota × peso) / Σ(peso) sobre todas as notas do atleta. Os totais são
+mantidos por delta: refresh_summaries() informa a diferença antes/depois de cada
+resumo por treino e o delete de um treino subtrai os resumos dele. Uma nota nova
+custa um UPDATE em vez de reagregar o histórico. reconcile_ratings() recalcula do
+zero a partir das notas (correção de drift).
+"""
+
+from django.db.models import Case, ExpressionWrapper, F, FloatField, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from athletes.models import Athlete
+from .models import DrillScore, TrainingAthleteSummary
+
+
+RATING_EPSILON = 1e-9
+RECONCILE_TOLERANCE = 1e-6
+
+
+def rating_expression():
+    return Case(
+        When(
+            rating_weight__gt=RATING_EPSILON,
+            then=ExpressionWrapper(F("rating_points") / F("rating_weight"), output_field=FloatField()),
+        ),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def _per_athlete(deltas, index):
+    return Case(
+        *[When(id=athlete_id, then=Value(float(d[index]))) for athlete_id, d in deltas.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def apply_rating_deltas(deltas):
+    """deltas: {athlete_id: (Δpontos, Δpeso)}. Dois UPDATEs, qualquer que seja o número de atletas."""
+    deltas = {athlete_id: d for athlete_id, d in deltas.items() if d[0] or d[1]}
+    if not deltas:
+        return
+    athletes = Athlete.objects.filter(id__in=list(deltas))
+    athletes.update(
+        rating_points=F("rating_points") + _per_athlete(deltas, 0),
+        rating_weight=F("rating_weight") + _per_athlete(deltas, 1),
+    )
+    # Em UPDATE, F() lê o valor antigo: o rating sai num segundo comando.
+    athletes.update(rating=rating_expression())
+
+
+def summary_deltas(previous, current):
+    """
+    previous/current: {athlete_id: (weighted_points, weight_sum)} de um treino antes e
+    depois do recálculo. Retorna os deltas por atleta.
+    """
+    deltas = {}
+    for athlete_id in set(previous) | set(current):
+        old_points, old_weight = previous.get(athlete_id, (0.0, 0.0))
+        new_points, new_weight = current.get(athlete_id, (0.0, 0.0))
+        deltas[athlete_id] = (new_points - old_points, new_weight - old_weight)
+    return deltas
+
+
+def subtract_training(training_id):
+    """Remove dos ratings a contribuição de um treino (chamado antes do delete em cascata)."""
+    rows = TrainingAthleteSummary.objects.filter(training_id=training_id).values_list(
+        "athlete_id", "weighted_points", "weight_sum",
+    )
+    apply_rating_deltas({athlete_id: (-points, -weight) for athlete_id, points, weight in rows})
+
+
+def actual_ratings():
+    """{athlete_id: (pontos, peso)} calculado direto das notas."""
+    numerator_expr = ExpressionWrapper(F("score") * F("training_drill__weight"), output_field=FloatField())
+    rows = (
+        DrillScore.objects
+        .values("athlete_id")
+        .annotate(
+            points=Coalesce(Sum(numerator_expr), 0.0),
+            weight=Coalesce(Sum(F("training_drill__weight"), output_field=FloatField()), 0.0),
+        )
+    )
+    return {row["athlete_id"]: (float(row["points"]), float(row["weight"])) for row in rows}
+
+
+def reconcile_ratings(fix=True):
+    """
+    Compara os totais guardados com os calculados das notas. Com fix=True corrige os
+    divergentes. Retorna [(athlete_id, rating_guardado, rating_real)].
+    """
+    actual = actual_ratings()
+    drifted = []
+    to_update = []
+    for athlete in Athlete.objects.only("id", *Athlete.RATING_FIELDS).iterator():
+        points, weight = actual.get(athlete.id, (0.0, 0.0))
+        rating = points / weight if weight > RATING_EPSILON else 0.0
+        if (
+            abs(athlete.rating_points - points) > RECONCILE_TOLERANCE
+            or abs(athlete.rating_weight - weight) > RECONCILE_TOLERANCE
+            or abs(athlete.rating - rating) > RECONCILE_TOLERANCE
+        ):
+            drifted.append((athlete.id, athlete.rating, rating))
+            athlete.rating_points, athlete.rating_weight, athlete.rating = points, weight, rating
+            to_update.append(athlete)
+    if fix and to_update:
+        Athlete.objects.bulk_update(to_update, Athlete.RATING_FIELDS, batch_size=1000)
+    return drifted
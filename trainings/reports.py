@@ -0,0 +1,168 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ReportJob, TrainingSession
+
+
+logger = logging.getLogger(__name__)
+
+
+def lease_cutoff():
+    """Jobs RUNNING iniciados antes disso são de um worker que morreu."""
+    return timezone.now() - timedelta(seconds=settings.REPORT_JOB_LEASE_SECONDS)
+
+
+def _live(cutoff):
+    return Q(status__in=(ReportJob.Status.PENDING, ReportJob.Status.DONE)) | Q(
+        status=ReportJob.Status.RUNNING, started_at__gte=cutoff,
+    )
+
+
+def enqueue_training_pdf(training, requested_by=None):
+    """
+    Enfileira o PDF do treino na revisão atual. Se já existe um job dessa revisão
+    pronto ou em andamento, ele é devolvido (download imediato / sem render duplicado).
+    Um job RUNNING com lease vencido não conta: o worker que o pegou morreu.
+    Retorna (job, created).
+    """
+    with transaction.atomic():
+        job = (
+            ReportJob.objects
+            .filter(
+                _live(lease_cutoff()),
+                training=training,
+                kind=ReportJob.Kind.TRAINING_PDF,
+                revision=training.revision,
+            )
+            .order_by("-id")
+            .first()
+        )
+        if job is not None:
+            return job, False
+        job = ReportJob.objects.create(
+            training=training,
+            kind=ReportJob.Kind.TRAINING_PDF,
+            revision=training.revision,
+            requested_by=requested_by,
+        )
+    return job, True
+
+
+def claim_next_job():
+    """
+    Pega o job PENDING mais antigo (ou RUNNING com lease vencido, de um worker que
+    caiu) e marca como RUNNING. O UPDATE condicional, sobre o mesmo status/started_at
+    lido, garante que dois workers nunca processem o mesmo job. Retorna None se a
+    fila estiver vazia.
+    """
+    while True:
+        job = (
+            ReportJob.objects
+            .filter(
+                Q(status=ReportJob.Status.PENDING)
+                | Q(status=ReportJob.Status.RUNNING, started_at__lt=lease_cutoff())
+            )
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+        if job.status == ReportJob.Status.RUNNING:
+            logger.warning("Retomando relatório #%s (lease vencido)", job.pk)
+        claimed = (
+            ReportJob.objects
+            .filter(pk=job.pk, status=job.status, started_at=job.started_at)
+            .update(status=ReportJob.Status.RUNNING, started_at=timezone.now())
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def training_pdf_filename(training):
+    return f"treino_{training.id}_{training.date}_premium.pdf"
+
+
+def _artifact_name(job):
+    return f"treino_{job.training_id}_r{job.revision}_{job.pk}.pdf"
+
+
+# Renderizações tentadas enquanto o treino muda durante o render.
+RENDER_ATTEMPTS = 3
+
+
+class TrainingChangedDuringRender(Exception):
+    pass
+
+
+def _render_consistent(training_id, render):
+    """
+    (revisão, bytes) de um render cujos dados são todos da mesma revisão: a revisão
+    é relida depois do render e, se mudou (escrita no meio), renderiza de novo.
+    """
+    for _attempt in range(RENDER_ATTEMPTS):
+        training = TrainingSession.objects.get(pk=training_id)
+        content = render(training)
+        current = TrainingSession.objects.filter(pk=training_id).values_list("revision", flat=True).first()
+        if current == training.revision:
+            return training.revision, content
+    raise TrainingChangedDuringRender(
+        f"Treino alterado durante a renderização ({RENDER_ATTEMPTS} tentativas); peça o relatório de novo."
+    )
+
+
+def run_job(job):
+    """
+    Renderiza o job (já RUNNING) e grava o arquivo. Erros marcam o job como FAILED.
+    O arquivo fica com a revisão que os dados renderizados refletem, que pode ser
+    mais nova que a do pedido.
+    """
+    from .pdf import render_training_pdf
+
+    try:
+        job.revision, content = _render_consistent(job.training_id, render_training_pdf)
+        job.file.save(_artifact_name(job), ContentFile(content), save=False)
+        job.status = ReportJob.Status.DONE
+        job.error = None
+    except Exception as exc:  # o worker segue com os próximos jobs
+        logger.exception("Falha ao gerar relatório #%s", job.pk)
+        job.status = ReportJob.Status.FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    job.finished_at = timezone.now()
+    job.save(update_fields=["revision", "file", "status", "error", "finished_at"])
+
+    if job.status == ReportJob.Status.DONE:
+        discard_stale_artifacts(job)
+    return job
+
+
+def discard_stale_artifacts(job):
+    """Remove arquivos de revisões anteriores do mesmo treino (o job fica como histórico)."""
+    stale = (
+        ReportJob.objects
+        .filter(training_id=job.training_id, kind=job.kind, revision__lt=job.revision)
+        .exclude(file="")
+        .exclude(file__isnull=True)
+    )
+    for old in stale:
+        old.file.delete(save=False)
+        old.file = None
+        old.save(update_fields=["file"])
+
+
+def run_pending_jobs(limit=None):
+    """Processa a fila até esvaziar (ou `limit` jobs). Retorna quantos rodaram."""
+    done = 0
+    while limit is None or done < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_job(job)
+        done += 1
+    return done
@@ -0,0 +1,206 @@
+"""
+Rollups semanais/mensais (TeamRollup, AthleteRollup, DrillRollup) para tendências
+longas. Escritas num treino só marcam TrainingSession.rollups_stale (no mesmo UPDATE
+da revisão, ver changes._apply); o worker (run_report_worker) chama
+refresh_stale_rollups() a cada ciclo e recalcula apenas os períodos dos treinos
+marcados. As leituras não escrevem: a de N anos lê só as linhas dos períodos.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from . import stats
+from .models import (
+    AthleteRollup,
+    Attendance,
+    DrillRollup,
+    DrillScore,
+    RollupGrain,
+    TeamRollup,
+    TrainingSession,
+)
+from .ranking import build_rankings
+
+
+GRAINS = (RollupGrain.WEEK, RollupGrain.MONTH)
+ROLLUP_MODELS = (TeamRollup, AthleteRollup, DrillRollup)
+
+
+def period_start(day, grain):
+    if grain == RollupGrain.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def period_end(start, grain):
+    """Fim exclusivo do período iniciado em `start`."""
+    if grain == RollupGrain.WEEK:
+        return start + timedelta(days=7)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def period_label(start, grain):
+    if grain == RollupGrain.WEEK:
+        year, week, _ = start.isocalendar()
+        return f"{year}-S{week:02d}"
+    return start.strftime("%Y-%m")
+
+
+def refresh_period(grain, start):
+    """Recalcula as três tabelas de rollup de um período (apaga e regrava)."""
+    end = period_end(start, grain)
+    training_ids = list(
+        TrainingSession.objects.filter(date__gte=start, date__lt=end).values_list("id", flat=True)
+    )
+
+    with transaction.atomic():
+        for model in ROLLUP_MODELS:
+            model.objects.filter(grain=grain, period_start=start).delete()
+        if not training_ids:
+            return
+
+        team = TeamRollup(grain=grain, period_start=start, trainings_count=len(training_ids))
+        athletes = defaultdict(lambda: [0.0, 0])
+        for ranking in build_rankings(training_ids).values():
+            values = [it["weighted_average"] for it in ranking.scored]
+            if not values:
+                continue
+            team.team_avg_sum += stats.mean(values)
+            team.scored_trainings += 1
+            for it in ranking.scored:
+                acc = athletes[it["athlete_id"]]
+                acc[0] += it["weighted_average"]
+                acc[1] += 1
+
+        counts = (
+            Attendance.objects
+            .filter(training_id__in=training_ids)
+            .values("status")
+            .annotate(n=Count("id"))
+        )
+        for row in counts:
+            setattr(team, row["status"].lower(), int(row["n"]))
+        team.save()
+
+        AthleteRollup.objects.bulk_create([
+            AthleteRollup(
+                grain=grain,
+                period_start=start,
+                athlete_id=athlete_id,
+                wavg_sum=wavg_sum,
+                trainings_count=count,
+            )
+            for athlete_id, (wavg_sum, count) in athletes.items()
+        ])
+
+        drills = (
+            DrillScore.objects
+            .filter(training_drill__training_id__in=training_ids, training_drill__drill__isnull=False)
+            .values("training_drill__drill_id")
+            .annotate(score_sum=Sum("score"), scores_count=Count("id"))
+        )
+        DrillRollup.objects.bulk_create([
+            DrillRollup(
+                grain=grain,
+                period_start=start,
+                drill_id=row["training_drill__drill_id"],
+                score_sum=float(row["score_sum"] or 0.0),
+                scores_count=int(row["scores_count"]),
+            )
+            for row in drills
+        ])
+
+
+def refresh_rollups_for_dates(dates):
+    """Recalcula os períodos (semana e mês) que contêm as datas informadas."""
+    periods = {(grain, period_start(day, grain)) for day in dates if day for grain in GRAINS}
+    for grain, start in sorted(periods):
+        refresh_period(grain, start)
+
+
+def refresh_stale_rollups():
+    """Recalcula os períodos dos treinos com rollups_stale. Retorna quantos treinos."""
+    stale = list(TrainingSession.objects.filter(rollups_stale=True).values_list("id", "date"))
+    if not stale:
+        return 0
+    with transaction.atomic():
+        # Desmarca antes de ler: uma escrita concorrente volta a marcar e entra no próximo ciclo.
+        TrainingSession.objects.filter(pk__in=[pk for pk, _day in stale]).update(rollups_stale=False)
+        refresh_rollups_for_dates({day for _pk, day in stale})
+    return len(stale)
+
+
+def rebuild_rollups():
+    """Reconstrói todos os períodos com treinos. Retorna quantos períodos."""
+    for model in ROLLUP_MODELS:
+        model.objects.all().delete()
+    TrainingSession.objects.filter(rollups_stale=True).update(rollups_stale=False)
+    dates = TrainingSession.objects.values_list("date", flat=True).distinct()
+    periods = {(grain, period_start(day, grain)) for day in dates for grain in GRAINS}
+    for grain, start in sorted(periods):
+        refresh_period(grain, start)
+    return len(periods)
+
+
+# ----------------------------
+# Leitura
+# ----------------------------
+def _in_range(qs, grain, date_from=None, date_to=None):
+    qs = qs.filter(grain=grain)
+    if date_from:
+        qs = qs.filter(period_start__gte=period_start(date_from, grain))
+    if date_to:
+        qs = qs.filter(period_start__lte=date_to)
+    return qs.order_by("period_start")
+
+
+def team_series(grain, date_from=None, date_to=None):
+    """Uma linha por período: média do time, treinos e presença por status."""
+    items = []
+    for row in _in_range(TeamRollup.objects.all(), grain, date_from, date_to):
+        avg = row.team_average
+        items.append({
+            "period_start": row.period_start,
+            "label": period_label(row.period_start, grain),
+            "trainings_count": row.trainings_count,
+            "value": round(avg, 2) if avg is not None else None,
+            "present": row.present,
+            "late": row.late,
+            "justified": row.justified,
+            "absent": row.absent,
+        })
+    return items
+
+
+def athlete_series(grain, date_from=None, date_to=None, athlete_ids=None):
+    """{athlete_id: [{"period_start", "label", "value", "trainings_count"}]}"""
+    qs = _in_range(AthleteRollup.objects.all(), grain, date_from, date_to)
+    if athlete_ids is not None:
+        qs = qs.filter(athlete_id__in=list(athlete_ids))
+    series = defaultdict(list)
+    for row in qs:
+        series[row.athlete_id].append({
+            "period_start": row.period_start,
+            "label": period_label(row.period_start, grain),
+            "value": round(row.weighted_average, 2),
+            "trainings_count": row.trainings_count,
+        })
+    return dict(series)
+
+
+def drill_series(grain, date_from=None, date_to=None):
+    """[{"drill_id", "name", "trend": [...]}] por drill do catálogo, ordenado por nome."""
+    qs = _in_range(DrillRollup.objects.select_related("drill"), grain, date_from, date_to)
+    drills = {}
+    for row in qs:
+        entry = drills.setdefault(row.drill_id, {"drill_id": row.drill_id, "name": row.drill.name, "trend": []})
+        entry["trend"].append({
+            "period_start": row.period_start,
+            "label": period_label(row.period_start, grain),
+            "value": round(row.average, 2),
+            "scores_count": row.scores_count,
+        })
+    return sorted(drills.values(), key=lambda d: d["name"].lower())
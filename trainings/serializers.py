@@ -1,5 +1,17 @@
 from rest_framework import serializers
-from .models import TrainingSession, Attendance, DrillCatalog, TrainingDrill, DrillScore
+from rest_framework.reverse import reverse
+from django.db import transaction
+
+from .models import (
+    TrainingSession,
+    Attendance,
+    DrillCatalog,
+    TrainingDrill,
+    DrillScore,
+    TrainingTemplate,
+    TrainingTemplateDrill,
+    ReportJob,
+)
 
 class DrillCatalogSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,6 +26,19 @@ class AttendanceSerializer(serializers.ModelSerializer):
         model = Attendance
         fields = "__all__"
 
+class AttendanceBulkItemSerializer(serializers.Serializer):
+    """Item de attendance_bulk (validação sem tocar o banco; atletas são checados em lote)."""
+    athlete = serializers.IntegerField(min_value=1)
+    status = serializers.ChoiceField(choices=Attendance.Status.choices, default=Attendance.Status.PRESENT)
+    checkin_time = serializers.TimeField(required=False, allow_null=True, default=None)
+
+
+def validate_score_range(value):
+    if value < 0 or value > 10:
+        raise serializers.ValidationError("A nota deve estar entre 0 e 10.")
+    return value
+
+
 class DrillScoreSerializer(serializers.ModelSerializer):
     athlete_name = serializers.CharField(source="athlete.name", read_only=True)
 
@@ -22,9 +47,30 @@ class DrillScoreSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
     def validate_score(self, value):
-        if value < 0 or value > 10:
-            raise serializers.ValidationError("A nota deve estar entre 0 e 10.")
-        return value
+        return validate_score_range(value)
+
+
+class DrillScoreBulkItemSerializer(serializers.Serializer):
+    """Item de scores_bulk (drill e atleta são checados em lote contra o treino da URL)."""
+    training_drill = serializers.IntegerField(min_value=1)
+    athlete = serializers.IntegerField(min_value=1)
+    score = serializers.DecimalField(max_digits=4, decimal_places=1)
+    comment = serializers.CharField(required=False, allow_null=True, allow_blank=True, default=None)
+
+    def validate_score(self, value):
+        return validate_score_range(value)
+
+class TrainingDrillBulkItemSerializer(serializers.Serializer):
+    """Item de drills_bulk / push offline (o drill do catálogo é checado em lote)."""
+    drill = serializers.IntegerField(min_value=1, required=False, allow_null=True, default=None)
+    name_override = serializers.CharField(
+        max_length=120, required=False, allow_null=True, allow_blank=True, default=None
+    )
+    order = serializers.IntegerField(min_value=0, default=1)
+    description = serializers.CharField(required=False, allow_null=True, allow_blank=True, default=None)
+    max_score = serializers.IntegerField(min_value=1, default=10)
+    weight = serializers.DecimalField(max_digits=4, decimal_places=2, min_value=0, default=1)
+
 
 class TrainingDrillSerializer(serializers.ModelSerializer):
     name = serializers.CharField(read_only=True)
@@ -34,10 +80,127 @@ class TrainingDrillSerializer(serializers.ModelSerializer):
         model = TrainingDrill
         fields = "__all__"
 
+TRAINING_EXPANSIONS = ("drills", "scores", "attendances")
+
+
+def parse_expand(value):
+    """?expand=drills,scores,attendances -> set com as expansões conhecidas."""
+    return {part.strip() for part in (value or "").split(",")} & set(TRAINING_EXPANSIONS)
+
+
 class TrainingSessionSerializer(serializers.ModelSerializer):
+    """
+    Detalhe do treino. Drills, notas e presenças aninhados só entram quando pedidos
+    via context["expand"] (ver parse_expand); "scores" implica "drills".
+    """
     drills = TrainingDrillSerializer(many=True, read_only=True)
     attendances = AttendanceSerializer(many=True, read_only=True)
 
     class Meta:
         model = TrainingSession
-        fields = "__all__"
\ No newline at end of file
+        fields = "__all__"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        expand = self.context.get("expand", set())
+        if "attendances" not in expand:
+            self.fields.pop("attendances")
+        if not expand & {"drills", "scores"}:
+            self.fields.pop("drills")
+        elif "scores" not in expand:
+            self.fields["drills"].child.fields.pop("scores")
+
+
+class TrainingSessionListSerializer(serializers.ModelSerializer):
+    """
+    Linha leve da lista de treinos: contagens vêm anotadas no queryset e a média
+    ponderada do time vem de context["rankings"] (build_rankings da página).
+    """
+    drills_count = serializers.IntegerField(read_only=True)
+    attendance_count = serializers.IntegerField(read_only=True)
+    present_count = serializers.IntegerField(read_only=True)
+    weighted_average = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrainingSession
+        fields = (
+            "id",
+            "date",
+            "start_time",
+            "location",
+            "notes",
+            "created_at",
+            "revision",
+            "drills_count",
+            "attendance_count",
+            "present_count",
+            "weighted_average",
+        )
+
+    def get_weighted_average(self, obj):
+        ranking = self.context.get("rankings", {}).get(obj.pk)
+        return ranking.weighted_average if ranking else None
+
+
+class TrainingTemplateDrillSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = TrainingTemplateDrill
+        exclude = ("template",)
+
+
+class TrainingTemplateSerializer(serializers.ModelSerializer):
+    drills = TrainingTemplateDrillSerializer(many=True, required=False)
+
+    class Meta:
+        model = TrainingTemplate
+        fields = "__all__"
+        read_only_fields = ("created_by", "created_at")
+
+    def _replace_drills(self, template, drills):
+        template.drills.all().delete()
+        TrainingTemplateDrill.objects.bulk_create(
+            [TrainingTemplateDrill(template=template, **d) for d in drills]
+        )
+
+    @transaction.atomic
+    def create(self, validated_data):
+        drills = validated_data.pop("drills", [])
+        template = super().create(validated_data)
+        self._replace_drills(template, drills)
+        return template
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        drills = validated_data.pop("drills", None)
+        template = super().update(instance, validated_data)
+        if drills is not None:
+            self._replace_drills(template, drills)
+        return template
+
+
+class ApplyTemplateSerializer(serializers.Serializer):
+    """Origem do plano de drills: um template salvo ou outro treino."""
+    template = serializers.PrimaryKeyRelatedField(queryset=TrainingTemplate.objects.all(), required=False)
+    from_training = serializers.PrimaryKeyRelatedField(queryset=TrainingSession.objects.all(), required=False)
+    replace = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if bool(attrs.get("template")) == bool(attrs.get("from_training")):
+            raise serializers.ValidationError("Informe exatamente um entre template e from_training.")
+        return attrs
+
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    status_label = serializers.CharField(source="get_status_display", read_only=True)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ReportJob
+        exclude = ("file",)
+
+    def get_download_url(self, obj):
+        if obj.status != ReportJob.Status.DONE or not obj.file:
+            return None
+        return reverse("training-reports-download", args=[obj.pk], request=self.context.get("request"))
@@ -0,0 +1,246 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from athletes.models import Athlete
+from .changes import bump_revisions, touch_training, training_changed
+from .live import publish_attendances, publish_scores
+from .ratings import subtract_training
+from .rollups import refresh_rollups_for_dates
+from .models import Attendance, DrillCatalog, DrillScore, ReportJob, SyncTombstone, TrainingDrill, TrainingSession
+from .sync import record_tombstone
+
+
+def _deleted_by_cascade_from(origin, *models):
+    """True quando o delete partiu de um dos models (instância ou queryset)."""
+    origin_model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return origin_model in models
+
+
+def _score_training_id(instance):
+    if DrillScore.training_drill.is_cached(instance):
+        return instance.training_drill.training_id
+    return TrainingDrill.objects.filter(pk=instance.training_drill_id).values_list("training_id", flat=True).first()
+
+
+# ----------------------------
+# DrillScore
+# ----------------------------
+@receiver(pre_save, sender=DrillScore)
+def remember_score_target(sender, instance, raw=False, **kwargs):
+    instance._previous_target = None
+    if raw or not instance.pk:
+        return
+    instance._previous_target = (
+        DrillScore.objects
+        .filter(pk=instance.pk)
+        .values_list("training_drill__training_id", "athlete_id")
+        .first()
+    )
+
+
+@receiver(post_save, sender=DrillScore)
+def score_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    training_id = _score_training_id(instance)
+    previous = getattr(instance, "_previous_target", None)
+    if previous and previous != (training_id, instance.athlete_id):
+        training_changed(previous[0], [previous[1]])
+    if training_id is not None:
+        publish_scores(training_id, [instance])
+    training_changed(training_id, [instance.athlete_id])
+
+
+@receiver(post_delete, sender=DrillScore)
+def score_deleted(sender, instance, origin=None, **kwargs):
+    # Deletes em cascata de treino/drill são tratados na origem (inclusive o tombstone).
+    if _deleted_by_cascade_from(origin, TrainingSession, TrainingDrill):
+        return
+    training_id = _score_training_id(instance)
+    record_tombstone(SyncTombstone.Model.SCORE, instance.pk, training_id)
+    if _deleted_by_cascade_from(origin, Athlete):
+        return
+    if training_id is not None:
+        publish_scores(training_id, [instance], deleted=True)
+    training_changed(training_id, [instance.athlete_id])
+
+
+# ----------------------------
+# Attendance
+# ----------------------------
+@receiver(pre_save, sender=Attendance)
+def remember_attendance_target(sender, instance, raw=False, **kwargs):
+    instance._previous_target = None
+    if raw or not instance.pk:
+        return
+    instance._previous_target = (
+        Attendance.objects.filter(pk=instance.pk).values_list("training_id", "athlete_id").first()
+    )
+
+
+@receiver(post_save, sender=Attendance)
+def attendance_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_target", None)
+    if previous and previous != (instance.training_id, instance.athlete_id):
+        training_changed(previous[0], [previous[1]])
+    publish_attendances(instance.training_id, [instance])
+    training_changed(instance.training_id, [instance.athlete_id])
+
+
+@receiver(post_delete, sender=Attendance)
+def attendance_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_by_cascade_from(origin, TrainingSession):
+        return
+    record_tombstone(SyncTombstone.Model.ATTENDANCE, instance.pk, instance.training_id)
+    if _deleted_by_cascade_from(origin, Athlete):
+        return
+    publish_attendances(instance.training_id, [instance], deleted=True)
+    training_changed(instance.training_id, [instance.athlete_id])
+
+
+# ----------------------------
+# TrainingDrill (peso afeta todos os atletas do treino)
+# ----------------------------
+@receiver(pre_save, sender=TrainingDrill)
+def remember_drill_weight(sender, instance, raw=False, **kwargs):
+    instance._previous_weight = None
+    if raw or not instance.pk:
+        return
+    instance._previous_weight = (
+        TrainingDrill.objects.filter(pk=instance.pk).values_list("training_id", "weight", "drill_id").first()
+    )
+
+
+@receiver(post_save, sender=TrainingDrill)
+def drill_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_previous_weight", None)
+    if created or not previous:
+        touch_training(instance.training_id)  # drill novo ainda não tem notas
+        return
+    prev_training_id, prev_weight, prev_drill_id = previous
+    if prev_training_id != instance.training_id:
+        training_changed(prev_training_id)
+        training_changed(instance.training_id)
+    elif prev_weight != instance.weight or prev_drill_id != instance.drill_id:
+        # drill do catálogo trocado também muda os rollups por drill
+        training_changed(instance.training_id)
+    else:
+        touch_training(instance.training_id)
+
+
+@receiver(post_delete, sender=TrainingDrill)
+def drill_deleted(sender, instance, origin=None, **kwargs):
+    if _deleted_by_cascade_from(origin, TrainingSession):
+        return
+    record_tombstone(SyncTombstone.Model.DRILL, instance.pk, instance.training_id)
+    training_changed(instance.training_id)
+
+
+# ----------------------------
+# Revisão: mudanças fora de presença/drills/notas que aparecem nas respostas
+# ----------------------------
+@receiver(pre_save, sender=TrainingSession)
+def remember_training_date(sender, instance, raw=False, **kwargs):
+    instance._previous_date = None
+    if raw or not instance.pk:
+        return
+    instance._previous_date = TrainingSession.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+
+
+@receiver(post_save, sender=TrainingSession)
+def training_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    previous_date = getattr(instance, "_previous_date", None)
+    if previous_date and previous_date != instance.date:
+        # O período antigo não é alcançável pela marca do treino: recalcula já.
+        refresh_rollups_for_dates([previous_date])
+        bump_revisions([instance.pk], rollups_stale=True)
+        return
+    touch_training(instance.pk)
+
+
+@receiver(pre_delete, sender=TrainingSession)
+def training_ratings_removed(sender, instance, **kwargs):
+    # Resumos saem em cascata sem passar por refresh_summaries.
+    subtract_training(instance.pk)
+
+
+@receiver(post_delete, sender=TrainingSession)
+def training_deleted(sender, instance, **kwargs):
+    record_tombstone(SyncTombstone.Model.TRAINING, instance.pk, instance.pk)
+    refresh_rollups_for_dates([instance.date])
+
+
+# Campos do atleta que aparecem nas respostas cacheadas por revisão (ranking,
+# dashboards, exports).
+ATHLETE_TRAINING_FIELDS = ("name", "current_position", "jersey_number")
+
+
+@receiver(pre_save, sender=Athlete)
+def remember_athlete_fields(sender, instance, raw=False, **kwargs):
+    instance._previous_training_fields = None
+    if raw or not instance.pk:
+        return
+    instance._previous_training_fields = (
+        Athlete.objects.filter(pk=instance.pk).values_list(*ATHLETE_TRAINING_FIELDS).first()
+    )
+
+
+@receiver(post_save, sender=Athlete)
+def athlete_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    previous = getattr(instance, "_previous_training_fields", None)
+    current = tuple(getattr(instance, field) for field in ATHLETE_TRAINING_FIELDS)
+    if previous is not None and previous == current:
+        return  # ex.: PATCH de birth_city pelo próprio atleta
+    bump_revisions(
+        TrainingSession.objects
+        .filter(athlete_summaries__athlete_id=instance.pk)
+        .values_list("id", flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Athlete)
+def remember_athlete_trainings(sender, instance, **kwargs):
+    instance._training_ids = list(
+        TrainingSession.objects
+        .filter(athlete_summaries__athlete_id=instance.pk)
+        .values_list("id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Athlete)
+def athlete_deleted(sender, instance, **kwargs):
+    # Notas e presenças saem em cascata (sem propagar, ver score_deleted): ranking,
+    # respostas cacheadas por revisão e rollups dos treinos do atleta mudam.
+    for training_id in getattr(instance, "_training_ids", ()):
+        training_changed(training_id, [instance.pk])
+
+
+@receiver(post_save, sender=DrillCatalog)
+@receiver(pre_delete, sender=DrillCatalog)
+def catalog_drill_changed(sender, instance, raw=False, **kwargs):
+    if raw or not instance.pk:
+        return
+    bump_revisions(
+        TrainingDrill.objects
+        .filter(drill_id=instance.pk)
+        .values_list("training_id", flat=True)
+        .distinct()
+    )
+
+
+# ----------------------------
+# ReportJob: arquivo gerado sai junto com o job (inclusive em cascata do treino)
+# ----------------------------
+@receiver(post_delete, sender=ReportJob)
+def report_job_deleted(sender, instance, **kwargs):
+    if instance.file:
+        instance.file.delete(save=False)
@@ -0,0 +1,119 @@
+"""
+Dispersão das notas (média/variância/desvio padrão populacionais) por atleta × treino.
+
+Em bancos com VAR_POP/STDDEV_POP nativos o cálculo é um único GROUP BY; no SQLite
+as notas vêm de uma única query em streaming e são agregadas com trainings.stats.
+"""
+
+from math import sqrt
+
+from django.db import connection
+from django.db.models import Avg, Count, Variance
+
+from . import stats
+from .models import DrillScore
+
+
+GROUP_FIELDS = ("training_drill__training_id", "athlete_id", "athlete__name", "athlete__current_position")
+
+
+def sql_aggregates_supported():
+    """SQLite só tem VAR_POP via função Python registrada pelo Django: usamos o streaming."""
+    return connection.vendor != "sqlite"
+
+
+def _row(training_id, athlete_id, name, position, n, mean, variance):
+    return {
+        "training_id": training_id,
+        "athlete_id": athlete_id,
+        "athlete_name": name,
+        "position": position,
+        "n": int(n),
+        "mean": float(mean),
+        "variance": float(variance),
+        "stddev": sqrt(float(variance)),
+    }
+
+
+def _spreads_sql(training_ids):
+    rows = (
+        DrillScore.objects
+        .filter(training_drill__training_id__in=training_ids)
+        .values(*GROUP_FIELDS)
+        .annotate(n=Count("id"), mean=Avg("score"), variance=Variance("score"))
+        .order_by("training_drill__training_id", "athlete_id")
+    )
+    return [
+        _row(
+            r["training_drill__training_id"],
+            r["athlete_id"],
+            r["athlete__name"],
+            r["athlete__current_position"],
+            r["n"],
+            r["mean"],
+            r["variance"],
+        )
+        for r in rows
+    ]
+
+
+def _spreads_streamed(training_ids):
+    keys, values = [], []
+    labels = {}
+    rows = (
+        DrillScore.objects
+        .filter(training_drill__training_id__in=training_ids)
+        .order_by("training_drill__training_id", "athlete_id", "id")
+        .values_list(*GROUP_FIELDS, "score")
+    )
+    for training_id, athlete_id, name, position, score in rows.iterator():
+        keys.append((training_id, athlete_id))
+        values.append(score)
+        labels[(training_id, athlete_id)] = (name, position)
+
+    return [
+        _row(key[0], key[1], *labels[key], m["n"], m["mean"], m["variance"])
+        for key, m in stats.grouped_moments(keys, values).items()
+    ]
+
+
+def athlete_spreads(training_ids, use_sql=None):
+    """
+    Uma linha por (treino, atleta) com nota: n, mean, variance, stddev, nome e posição.
+    Ordenado por (training_id, athlete_id); sempre uma única query.
+    """
+    training_ids = list(training_ids)
+    if not training_ids:
+        return []
+    if use_sql is None:
+        use_sql = sql_aggregates_supported()
+    return _spreads_sql(training_ids) if use_sql else _spreads_streamed(training_ids)
+
+
+def pooled_spread(rows):
+    """Combina linhas de athlete_spreads (n/mean/variance) na dispersão do conjunto."""
+    total = sum(r["n"] for r in rows)
+    if not total:
+        return None
+    mean = sum(r["n"] * r["mean"] for r in rows) / total
+    m2 = sum(r["n"] * (r["variance"] + (r["mean"] - mean) ** 2) for r in rows)
+    variance = m2 / total
+    return {"n": total, "mean": mean, "variance": variance, "stddev": sqrt(variance)}
+
+
+def most_consistent_athlete(rows, min_scores=2):
+    """Atleta com menor variância (mínimo de `min_scores` notas), no formato do analytics."""
+    best = None
+    for r in rows:
+        if r["n"] < min_scores:
+            continue
+        item = {
+            "athlete_id": r["athlete_id"],
+            "athlete_name": r["athlete_name"],
+            "variance": round(r["variance"], 4),
+            "stddev": round(r["stddev"], 4),
+            "scored_drills": r["n"],
+        }
+        if best is None or item["variance"] < best["variance"]:
+            best = item
+    return best
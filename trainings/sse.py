@@ -0,0 +1,108 @@
+"""
+Stream SSE (text/event-stream) do dashboard ao vivo de um treino.
+
+View async: rode via ASGI (core/asgi.py, ex.: `uvicorn core.asgi:application`) para
+que cada conexão aberta não prenda um worker. Os eventos vêm de TrainingEvent
+(trainings/live.py) por polling curto do cursor; reconexões retomam pelo
+Last-Event-ID.
+
+EventSource não envia headers, e a query string acaba nos logs de acesso: em
+?token= vale só um token de stream (issue_stream_token), assinado, preso a um
+treino e válido por TRAININGS_SSE_TOKEN_SECONDS para abrir a conexão. O JWT de
+acesso continua aceito apenas no header Authorization.
+"""
+
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from accounts.permissions import is_admin_or_coach
+from .live import events_since, format_sse
+from .models import TrainingSession
+
+
+POLL_SECONDS = getattr(settings, "TRAININGS_SSE_POLL_SECONDS", 1.0)
+KEEPALIVE_SECONDS = getattr(settings, "TRAININGS_SSE_KEEPALIVE_SECONDS", 15)
+STREAM_TOKEN_SALT = "trainings.sse.stream"
+
+
+def stream_token_seconds():
+    return getattr(settings, "TRAININGS_SSE_TOKEN_SECONDS", 60)
+
+
+def issue_stream_token(user, training_id):
+    """Token de stream: só abre o SSE de `training_id` e expira em stream_token_seconds()."""
+    return signing.dumps({"user": user.pk, "training": training_id}, salt=STREAM_TOKEN_SALT)
+
+
+def _stream_token_user(raw, training_id):
+    try:
+        data = signing.loads(raw, salt=STREAM_TOKEN_SALT, max_age=stream_token_seconds())
+    except signing.BadSignature:
+        return None
+    if data.get("training") != training_id:
+        return None
+    return get_user_model().objects.filter(pk=data.get("user"), is_active=True).first()
+
+
+def _authenticate(request, training_id):
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        auth = JWTAuthentication()
+        try:
+            return auth.get_user(auth.get_validated_token(header[len("Bearer "):].strip()))
+        except (InvalidToken, AuthenticationFailed):
+            return None
+    raw = request.GET.get("token")
+    return _stream_token_user(raw, training_id) if raw else None
+
+
+def _cursor(request):
+    value = request.headers.get("Last-Event-ID") or request.GET.get("since") or 0
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+async def _stream(training_id, last_id):
+    max_seconds = getattr(settings, "TRAININGS_SSE_MAX_SECONDS", 300)
+    started = last_write = time.monotonic()
+    yield f"retry: {int(POLL_SECONDS * 1000)}\n\n"
+    while True:
+        events = await sync_to_async(events_since)(training_id, last_id)
+        for event in events:
+            last_id = event.id
+            yield format_sse(event)
+        now = time.monotonic()
+        if events:
+            last_write = now
+        elif now - last_write >= KEEPALIVE_SECONDS:
+            last_write = now
+            yield ": keepalive\n\n"
+        if now - started >= max_seconds:
+            # o cliente reconecta sozinho com Last-Event-ID
+            return
+        await asyncio.sleep(POLL_SECONDS)
+
+
+async def training_events(request, pk):
+    user = await sync_to_async(_authenticate)(request, pk)
+    if user is None:
+        return JsonResponse({"detail": "As credenciais de autenticação não foram fornecidas."}, status=401)
+    if not await sync_to_async(is_admin_or_coach)(user):
+        return JsonResponse({"detail": "Você não tem permissão para executar essa ação."}, status=403)
+    if not await TrainingSession.objects.filter(pk=pk).aexists():
+        return JsonResponse({"detail": "Não encontrado."}, status=404)
+
+    response = StreamingHttpResponse(_stream(pk, _cursor(request)), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,228 @@
+"""
+Estatísticas vetorizadas (NumPy) para os endpoints de analytics.
+
+As funções agrupadas recebem uma lista plana de chaves e outra de valores
+(par a par: um valor por linha, a chave é o grupo) e calculam o resultado de
+todos os grupos de uma vez. As versões de grupo único (mean, stddev, boxplot...)
+são atalhos sobre elas. Os resultados seguem as mesmas regras dos helpers que
+existiam em TrainingSessionViewSet (variância populacional, quartis por mediana
+das metades e cercas de Tukey em 1.5 * IQR).
+
+O NumPy é importado dentro das funções: trainings.views importa este módulo, e o
+boot (URLconf) não deve pagar o import quando nenhum analytics é pedido.
+"""
+
+
+def _group(keys, values, sort_values=True):
+    """
+    Ordena os pares por (grupo, valor). Retorna (grupos na ordem da primeira
+    aparição, valores ordenados, início e tamanho de cada grupo no array ordenado).
+    Com sort_values=False os valores mantêm a ordem de entrada dentro do grupo.
+    Valores None são ignorados.
+    """
+    import numpy as np
+
+    codes = {}
+    key_codes = []
+    vals = []
+    for key, value in zip(keys, values):
+        if value is None:
+            continue
+        key_codes.append(codes.setdefault(key, len(codes)))
+        vals.append(float(value))
+
+    groups = list(codes)
+    if not vals:
+        empty = np.empty(0, dtype=np.int64)
+        return groups, np.empty(0, dtype=float), empty, empty
+
+    key_codes = np.asarray(key_codes, dtype=np.int64)
+    vals = np.asarray(vals, dtype=float)
+    order = np.lexsort((vals, key_codes)) if sort_values else np.argsort(key_codes, kind="stable")
+    vals = vals[order]
+    counts = np.bincount(key_codes, minlength=len(groups))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return groups, vals, starts, counts
+
+
+def _median_at(vals, start, length):
+    """Mediana de vals[start:start+length] (ordenado) para vários segmentos."""
+    lo = vals[start + (length - 1) // 2]
+    hi = vals[start + length // 2]
+    return (lo + hi) / 2.0
+
+
+# Abaixo disso, os grupos que ainda têm valores são somados um a um com sum().
+_VECTOR_MIN_GROUPS = 8
+
+
+def _segment_sums(vals, starts, counts):
+    """
+    Soma de cada segmento acumulada na ordem do array (como um sum() sequencial), com
+    memória O(len(vals)): os grupos, do maior para o menor, são percorridos por posição
+    (na posição j entram os vals[start + j] de todos os grupos com mais de j valores,
+    vetorizado). Quando restam poucos grupos ativos, o resto de cada um vai por sum().
+    """
+    import numpy as np
+
+    order = np.argsort(-counts, kind="stable")
+    o_starts, o_counts = starts[order], counts[order]
+    totals = np.zeros(len(counts))
+    width = int(o_counts[0])
+    # active[j] = quantos grupos têm mais de j valores (o_counts é decrescente)
+    active = np.searchsorted(-o_counts, -np.arange(width), side="left")
+    for j in range(width):
+        k = int(active[j])
+        if k < _VECTOR_MIN_GROUPS:
+            flat = vals.tolist()
+            for i in range(k):
+                start, count = int(o_starts[i]), int(o_counts[i])
+                totals[i] = sum(flat[start + j:start + count], float(totals[i]))
+            break
+        totals[:k] += vals[o_starts[:k] + j]
+    result = np.empty(len(counts))
+    result[order] = totals
+    return result
+
+
+def grouped_moments(keys, values):
+    """
+    {grupo: {"n", "mean", "variance", "stddev"}} (variância populacional).
+    As somas são acumuladas na ordem de entrada, como o sum() de Python fazia, para
+    os valores arredondados do JSON não mudarem.
+    """
+    import numpy as np
+
+    groups, vals, starts, counts = _group(keys, values, sort_values=False)
+    if not groups:
+        return {}
+    means = _segment_sums(vals, starts, counts) / counts
+    deviations = (vals - np.repeat(means, counts)) ** 2
+    variances = _segment_sums(deviations, starts, counts) / counts
+    stddevs = np.sqrt(variances)
+    return {
+        key: {
+            "n": int(counts[i]),
+            "mean": float(means[i]),
+            "variance": float(variances[i]),
+            "stddev": float(stddevs[i]),
+        }
+        for i, key in enumerate(groups)
+    }
+
+
+def grouped_boxplots(keys, values):
+    """
+    {grupo: {"min", "q1", "median", "q3", "max", "outliers", "n"}} no formato do
+    JSON de boxplots: min/max são os whiskers (valores dentro das cercas de Tukey).
+    """
+    import numpy as np
+
+    groups, vals, starts, counts = _group(keys, values)
+    if not groups:
+        return {}
+
+    half = counts // 2
+    median = _median_at(vals, starts, counts)
+
+    # Quartis pela mediana das metades (a mediana fica de fora quando n é ímpar).
+    # Com n == 1 as metades são vazias e os quartis caem no próprio valor.
+    upper_start = starts + (counts + 1) // 2
+    safe_half = np.maximum(half, 1)
+    q1 = np.where(half > 0, _median_at(vals, starts, safe_half), vals[starts])
+    q3 = np.where(
+        half > 0,
+        _median_at(vals, np.minimum(upper_start, starts + counts - 1), safe_half),
+        vals[starts + counts - 1],
+    )
+    iqr = q3 - q1
+    low_fence = np.repeat(q1 - 1.5 * iqr, counts)
+    high_fence = np.repeat(q3 + 1.5 * iqr, counts)
+
+    whisker_min = np.minimum.reduceat(np.where(vals >= low_fence, vals, np.inf), starts)
+    whisker_max = np.maximum.reduceat(np.where(vals <= high_fence, vals, -np.inf), starts)
+
+    is_outlier = (vals < np.repeat(whisker_min, counts)) | (vals > np.repeat(whisker_max, counts))
+    outliers = np.split(np.where(is_outlier, vals, np.nan), starts[1:])
+
+    return {
+        key: {
+            "min": float(whisker_min[i]),
+            "q1": float(q1[i]),
+            "median": float(median[i]),
+            "q3": float(q3[i]),
+            "max": float(whisker_max[i]),
+            "outliers": [float(v) for v in outliers[i] if not np.isnan(v)],
+            "n": int(counts[i]),
+        }
+        for i, key in enumerate(groups)
+    }
+
+
+def grouped_percentiles(keys, values, percentiles):
+    """{grupo: [p1, p2, ...]} com interpolação linear (mesma regra de numpy.percentile)."""
+    import numpy as np
+
+    groups, vals, starts, counts = _group(keys, values)
+    if not groups:
+        return {}
+    q = np.asarray(percentiles, dtype=float) / 100.0
+    pos = (counts[:, None] - 1) * q[None, :]
+    lower = np.floor(pos).astype(np.int64)
+    upper = np.minimum(lower + 1, counts[:, None] - 1)
+    frac = pos - lower
+    base = starts[:, None]
+    result = vals[base + lower] + (vals[base + upper] - vals[base + lower]) * frac
+    return {key: [float(v) for v in result[i]] for i, key in enumerate(groups)}
+
+
+def grouped_histograms(keys, values, edges):
+    """
+    {grupo: [contagens]} com len(edges) + 1 bins: (-inf, e0), [e0, e1), ..., [eN, +inf).
+    """
+    import numpy as np
+
+    groups, vals, starts, counts = _group(keys, values)
+    nbins = len(edges) + 1
+    if not groups:
+        return {}
+    bins = np.searchsorted(np.asarray(edges, dtype=float), vals, side="right")
+    group_index = np.repeat(np.arange(len(groups)), counts)
+    table = np.bincount(group_index * nbins + bins, minlength=len(groups) * nbins).reshape(len(groups), nbins)
+    return {key: [int(c) for c in table[i]] for i, key in enumerate(groups)}
+
+
+# ----------------------------
+# Atalhos para um único grupo
+# ----------------------------
+def _single(grouped, values, *args):
+    values = list(values)
+    return grouped([0] * len(values), values, *args).get(0)
+
+
+def mean(values):
+    result = _single(grouped_moments, values)
+    return result["mean"] if result else None
+
+
+def variance(values):
+    result = _single(grouped_moments, values)
+    return result["variance"] if result else None
+
+
+def stddev(values):
+    result = _single(grouped_moments, values)
+    return result["stddev"] if result else None
+
+
+def boxplot(values):
+    return _single(grouped_boxplots, values)
+
+
+def percentiles(values, percentiles):
+    return _single(grouped_percentiles, values, percentiles)
+
+
+def histogram(values, edges):
+    result = _single(grouped_histograms, values, edges)
+    return result if result else [0] * (len(edges) + 1)
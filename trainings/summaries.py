@@ -0,0 +1,145 @@
+from django.db import transaction
+from django.db.models import Count, F, FloatField, ExpressionWrapper, Sum
+from django.db.models.functions import Coalesce
+
+from .models import Attendance, DrillScore, TrainingAthleteSummary, TrainingSession
+from .ratings import apply_rating_deltas, reconcile_ratings, summary_deltas
+
+
+SUMMARY_FIELDS = ("attendance_status", "weighted_points", "weight_sum", "scored_drills_count", "updated_at")
+
+
+def refresh_summaries(training_id, athlete_ids=None):
+    """
+    Recalcula TrainingAthleteSummary de um treino a partir de DrillScore/Attendance.
+
+    Com athlete_ids, só as linhas desses atletas são recalculadas (escrita de uma
+    nota ou presença); sem, o treino inteiro (ex.: mudança de TrainingDrill.weight).
+    Linhas sem nota nem presença são removidas. A diferença de pontos/peso de cada
+    atleta é repassada ao rating acumulado (Athlete.rating).
+    """
+    if athlete_ids is not None:
+        athlete_ids = list(athlete_ids)
+        if not athlete_ids:
+            return
+
+    scores = DrillScore.objects.filter(training_drill__training_id=training_id)
+    attendances = Attendance.objects.filter(training_id=training_id)
+    existing = TrainingAthleteSummary.objects.filter(training_id=training_id)
+    if athlete_ids is not None:
+        scores = scores.filter(athlete_id__in=athlete_ids)
+        attendances = attendances.filter(athlete_id__in=athlete_ids)
+        existing = existing.filter(athlete_id__in=athlete_ids)
+
+    with transaction.atomic():
+        _refresh(training_id, scores, attendances, existing)
+
+
+def _score_totals(scores, *group_by):
+    """Pontos ponderados, soma dos pesos e nº de drills com nota, agrupados por group_by."""
+    numerator_expr = ExpressionWrapper(
+        F("score") * F("training_drill__weight"),
+        output_field=FloatField(),
+    )
+    return (
+        scores
+        .values(*group_by)
+        .annotate(
+            weighted_points=Coalesce(Sum(numerator_expr), 0.0),
+            weight_sum=Coalesce(Sum(F("training_drill__weight"), output_field=FloatField()), 0.0),
+            scored_drills_count=Count("training_drill_id"),
+        )
+    )
+
+
+def _fill_totals(summary, row):
+    summary.weighted_points = float(row["weighted_points"] or 0.0)
+    summary.weight_sum = float(row["weight_sum"] or 0.0)
+    summary.scored_drills_count = int(row["scored_drills_count"] or 0)
+
+
+def _refresh(training_id, scores, attendances, existing):
+    # Travadas até o fim da transação: dois recálculos simultâneos não aplicam o mesmo delta.
+    previous = {
+        athlete_id: (points, weight)
+        for athlete_id, points, weight in existing.select_for_update().values_list(
+            "athlete_id", "weighted_points", "weight_sum",
+        )
+    }
+
+    rows = {}
+    for athlete_id, status in attendances.values_list("athlete_id", "status"):
+        rows[athlete_id] = TrainingAthleteSummary(
+            training_id=training_id,
+            athlete_id=athlete_id,
+            attendance_status=status,
+        )
+
+    for row in _score_totals(scores, "athlete_id"):
+        summary = rows.get(row["athlete_id"])
+        if summary is None:
+            summary = rows[row["athlete_id"]] = TrainingAthleteSummary(
+                training_id=training_id,
+                athlete_id=row["athlete_id"],
+            )
+        _fill_totals(summary, row)
+
+    existing.exclude(athlete_id__in=list(rows)).delete()
+    if rows:
+        TrainingAthleteSummary.objects.bulk_create(
+            list(rows.values()),
+            update_conflicts=True,
+            unique_fields=("training", "athlete"),
+            update_fields=SUMMARY_FIELDS,
+        )
+
+    current = {athlete_id: (s.weighted_points, s.weight_sum) for athlete_id, s in rows.items()}
+    apply_rating_deltas(summary_deltas(previous, current))
+
+
+def rebuild_summaries(training_ids=None):
+    """Reconstrói as linhas de todos os treinos (ou dos informados). Retorna quantos treinos."""
+    qs = TrainingSession.objects.all()
+    if training_ids is not None:
+        qs = qs.filter(id__in=list(training_ids))
+
+    total = 0
+    for training_id in qs.values_list("id", flat=True).iterator():
+        refresh_summaries(training_id)
+        total += 1
+
+    if training_ids is None:
+        TrainingAthleteSummary.objects.exclude(training_id__in=TrainingSession.objects.values("id")).delete()
+    return total
+
+
+def build_summaries(training_ids, batch_size=1000):
+    """
+    Recria de uma vez as linhas dos treinos informados (ex.: gravados com bulk_create,
+    que não dispara signals): uma agregação agrupada por (treino, atleta) sobre todos
+    eles e bulk_create, em vez de refresh_summaries() treino a treino. Os ratings são
+    acertados uma única vez no fim por reconcile_ratings(). Retorna quantas linhas.
+    """
+    training_ids = list(training_ids)
+    rows = {}
+    attendances = Attendance.objects.filter(training_id__in=training_ids)
+    for training_id, athlete_id, status in attendances.values_list("training_id", "athlete_id", "status").iterator():
+        rows[training_id, athlete_id] = TrainingAthleteSummary(
+            training_id=training_id,
+            athlete_id=athlete_id,
+            attendance_status=status,
+        )
+
+    scores = DrillScore.objects.filter(training_drill__training_id__in=training_ids)
+    for row in _score_totals(scores, "training_drill__training_id", "athlete_id").iterator():
+        key = (row["training_drill__training_id"], row["athlete_id"])
+        summary = rows.get(key)
+        if summary is None:
+            summary = rows[key] = TrainingAthleteSummary(training_id=key[0], athlete_id=key[1])
+        _fill_totals(summary, row)
+
+    with transaction.atomic():
+        TrainingAthleteSummary.objects.filter(training_id__in=training_ids).delete()
+        TrainingAthleteSummary.objects.bulk_create(list(rows.values()), batch_size=batch_size)
+        reconcile_ratings()
+    return len(rows)
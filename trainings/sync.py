@@ -0,0 +1,225 @@
+"""
+Sincronização incremental para clientes de avaliação offline (tablets na lateral).
+
+Pull: changes_since() devolve as linhas de treinos, drills, presenças e notas com
+updated_at a partir do cursor, os tombstones das remoções e um cursor novo. O filtro
+volta SYNC_OVERLAP antes do cursor para não perder transações que gravaram antes de
+o cursor ser emitido mas só comitaram depois; as linhas repetidas são idempotentes
+no cliente (upsert por id).
+
+Horizonte: tombstones e recibos mais antigos que TRAININGS_SYNC_HORIZON_DAYS são
+removidos por prune_sync_history() (run_report_worker ou o comando de mesmo nome). Um
+cursor mais antigo que o horizonte recebe o snapshot completo com reset=true (o
+cliente substitui o estado local), e um reenvio de operação depois do horizonte
+seria aplicado de novo.
+
+Push: apply_push() aplica uma lista de operações enfileiradas offline pelos mesmos
+caminhos dos endpoints bulk. Cada operação tem uma chave de idempotência (por
+usuário): reenvios devolvem o resultado gravado em SyncReceipt sem escrever de novo.
+"""
+
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bulk import create_drills, upsert_attendances, upsert_scores
+from .changes import collect_training_changes
+from .models import Attendance, DrillScore, SyncReceipt, SyncTombstone, TrainingDrill, TrainingSession
+from .serializers import AttendanceSerializer
+
+
+SYNC_OVERLAP = timedelta(seconds=5)
+MAX_PUSH_OPS = 100
+
+# nome no feed -> (model, lookup do treino, campos; *_id sai com o nome da API)
+FEED = {
+    SyncTombstone.Model.TRAINING: (
+        TrainingSession,
+        "id",
+        ("id", "date", "start_time", "location", "notes", "revision", "updated_at"),
+    ),
+    SyncTombstone.Model.DRILL: (
+        TrainingDrill,
+        "training_id",
+        ("id", "training_id", "drill_id", "name_override", "order", "description", "max_score", "weight", "updated_at"),
+    ),
+    SyncTombstone.Model.ATTENDANCE: (
+        Attendance,
+        "training_id",
+        ("id", "training_id", "athlete_id", "status", "checkin_time", "updated_at"),
+    ),
+    SyncTombstone.Model.SCORE: (
+        DrillScore,
+        "training_drill__training_id",
+        ("id", "training_drill_id", "athlete_id", "score", "comment", "updated_at"),
+    ),
+}
+
+
+def sync_horizon():
+    return timedelta(days=getattr(settings, "TRAININGS_SYNC_HORIZON_DAYS", 30))
+
+
+def prune_sync_history(now=None):
+    """Remove tombstones e recibos além do horizonte. Retorna (tombstones, recibos)."""
+    cutoff = (now or timezone.now()) - sync_horizon()
+    tombstones, _ = SyncTombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    receipts, _ = SyncReceipt.objects.filter(created_at__lt=cutoff).delete()
+    return tombstones, receipts
+
+
+def parse_cursor(value):
+    """Cursor do feed (ISO 8601). Vazio = snapshot completo. ValueError se inválido."""
+    if not value:
+        return None
+    cursor = parse_datetime(value)
+    if cursor is None:
+        raise ValueError(value)
+    if timezone.is_naive(cursor):
+        cursor = timezone.make_aware(cursor)
+    return cursor
+
+
+def _api_row(row):
+    return {(k[:-3] if k.endswith("_id") and k != "id" else k): v for k, v in row.items()}
+
+
+def record_tombstone(model, object_id, training_id):
+    SyncTombstone.objects.create(model=model, object_id=object_id, training_id=training_id)
+
+
+def changes_since(cursor=None, training_id=None):
+    """
+    {"cursor", "reset", "trainings", "drills", "attendances", "scores", "deleted": {...}}.
+    Uma query por model + uma para os tombstones. Cursor além do horizonte vira
+    snapshot completo com reset=true.
+    """
+    issued = timezone.now()
+    reset = bool(cursor and cursor < issued - sync_horizon())
+    since = cursor - SYNC_OVERLAP if cursor and not reset else None
+
+    feed = {"cursor": issued.isoformat(), "reset": reset}
+    for name, (model, training_lookup, fields) in FEED.items():
+        qs = model.objects.all()
+        if since:
+            qs = qs.filter(updated_at__gte=since)
+        if training_id is not None:
+            qs = qs.filter(**{training_lookup: training_id})
+        feed[name] = [_api_row(row) for row in qs.order_by("id").values(*fields)]
+
+    deleted = {name: [] for name in FEED}
+    if since:
+        tombstones = SyncTombstone.objects.filter(deleted_at__gte=since)
+        if training_id is not None:
+            tombstones = tombstones.filter(training_id=training_id)
+        for model, object_id in tombstones.order_by("id").values_list("model", "object_id"):
+            deleted[model].append(object_id)
+    feed["deleted"] = deleted
+    return feed
+
+
+# ----------------------------
+# Push
+# ----------------------------
+def _push_attendance(training, items, user):
+    results, errors = upsert_attendances(training, items)
+    return (
+        400 if errors and not results else 200,
+        {"items": AttendanceSerializer(results, many=True).data, "errors": errors},
+    )
+
+
+def _push_scores(training, items, user):
+    rows, errors = upsert_scores(training, items, rated_by=user)
+    return (
+        400 if errors and not rows else 200,
+        {"ids": [r["id"] for r in rows], "errors": errors},
+    )
+
+
+def _push_drills(training, items, user):
+    drills, errors = create_drills(training, items)
+    if errors:
+        return 400, {"errors": errors}
+    return 201, {"ids": [d.id for d in drills]}
+
+
+PUSH_HANDLERS = {
+    "attendance": _push_attendance,
+    "scores": _push_scores,
+    "drills": _push_drills,
+}
+
+
+def _json_safe(value):
+    return json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+
+
+def _result(key, status, response, duplicate=False):
+    return {"key": key, "status": status, "duplicate": duplicate, "response": response}
+
+
+def _stored(receipt):
+    return _result(receipt.key, receipt.status_code, receipt.response, duplicate=True)
+
+
+def _validate_op(op):
+    if not isinstance(op, dict):
+        return {"detail": "Operação inválida."}
+    errors = {}
+    key = op.get("key")
+    if not isinstance(key, str) or not 0 < len(key) <= 64:
+        errors["key"] = ["Informe uma chave de idempotência (até 64 caracteres)."]
+    if op.get("type") not in PUSH_HANDLERS:
+        errors["type"] = [f"Use um de: {', '.join(PUSH_HANDLERS)}."]
+    if not isinstance(op.get("training"), int):
+        errors["training"] = ["Informe o id do treino."]
+    if not isinstance(op.get("items"), list):
+        errors["items"] = ["Envie uma lista."]
+    return errors
+
+
+def _apply_op(user, op):
+    errors = _validate_op(op)
+    key = op.get("key") if isinstance(op, dict) else None
+    if errors:
+        return _result(key, 400, errors)
+
+    receipt = SyncReceipt.objects.filter(user=user, key=key).first()
+    if receipt is not None:
+        return _stored(receipt)
+
+    training = TrainingSession.objects.filter(pk=op["training"]).first()
+    if training is None:
+        return _result(key, 404, {"detail": "Treino não encontrado."})
+
+    try:
+        with transaction.atomic():
+            status, response = PUSH_HANDLERS[op["type"]](training, op["items"], user)
+            # a resposta é gravada já no formato JSON para ser devolvida igual nos reenvios
+            receipt = SyncReceipt.objects.create(
+                user=user,
+                key=key,
+                training=training,
+                kind=op["type"],
+                status_code=status,
+                response=_json_safe(response),
+            )
+    except IntegrityError:
+        # mesma chave aplicada por uma requisição concorrente
+        receipt = SyncReceipt.objects.filter(user=user, key=key).first()
+        if receipt is None:
+            raise
+        return _stored(receipt)
+    return _result(key, status, receipt.response)
+
+
+def apply_push(user, ops):
+    """Aplica as operações em ordem; a propagação para os derivados é agrupada por treino."""
+    with collect_training_changes():
+        return [_apply_op(user, op) for op in ops]
@@ -1,10 +1,36 @@
-from datetime import date
+import csv
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import date, timedelta
+from io import StringIO
 
+from asgiref.sync import async_to_sync
 from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import Avg, Count
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from unittest import skipUnless
+from unittest.mock import patch
 from rest_framework.test import APITestCase, APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
 
 from athletes.models import Athlete
-from trainings.models import TrainingSession, Attendance, TrainingDrill, DrillScore
+from trainings import stats
+from trainings.benchmarks import PROFILES, run_benchmark, seed_profile
+from trainings.changes import collect_training_changes
+from trainings.live import publish
+from trainings.ranking import RANKABLE_STATUSES
+from trainings.reports import claim_next_job, enqueue_training_pdf, run_job
+from trainings.ratings import reconcile_ratings
+from trainings.summaries import rebuild_summaries
+from trainings.spread import athlete_spreads, most_consistent_athlete
+from trainings.models import TrainingSession, Attendance, DrillCatalog, TrainingDrill, DrillScore, TrainingAthleteSummary, ReportJob, TrainingEvent, SyncReceipt, SyncTombstone
 
 
 class CoachAnalyticsTests(APITestCase):
@@ -67,6 +93,23 @@ class CoachAnalyticsTests(APITestCase):
 		by_pos = {p["position"]: p for p in payload["by_position"]}
 		self.assertIn("QB", by_pos)
 		self.assertIn("WR", by_pos)
+		self.assertEqual(by_pos["QB"]["score_stddev"], 2.5495)
+		self.assertEqual(by_pos["WR"]["score_stddev"], 1.0897)
+
+	def test_score_spreads_sql_and_streamed_paths_agree_in_one_query(self):
+		results = []
+		for use_sql in (True, False):
+			with self.assertNumQueries(1):
+				results.append(athlete_spreads([self.t1.id], use_sql=use_sql))
+		sql_rows, streamed_rows = results
+
+		self.assertEqual(len(sql_rows), 4)
+		for a, b in zip(sql_rows, streamed_rows):
+			self.assertEqual((a["athlete_id"], a["n"], a["position"]), (b["athlete_id"], b["n"], b["position"]))
+			self.assertAlmostEqual(a["mean"], b["mean"])
+			self.assertAlmostEqual(a["variance"], b["variance"])
+		self.assertEqual(sql_rows[0]["variance"], 9.0)
+		self.assertEqual(most_consistent_athlete(streamed_rows)["athlete_name"], "A3")
 
 	def test_evolution_endpoint_biggest_improvement_and_regression(self):
 		t2 = TrainingSession.objects.create(date=date(2026, 1, 8), created_by=self.coach)
@@ -98,3 +141,994 @@ class CoachAnalyticsTests(APITestCase):
 		self.assertIsNotNone(cmp_)
 		self.assertEqual(cmp_["biggest_improvement"]["athlete_name"], "A2")
 		self.assertEqual(cmp_["biggest_regression"]["athlete_name"], "A1")
+
+	def test_coach_dashboard_ranking_by_position_matches_position_filter(self):
+		res = self.client.get(f"/api/trainings/{self.t1.id}/coach_dashboard/")
+		self.assertEqual(res.status_code, 200)
+		payload = res.json()
+
+		self.assertEqual([x["athlete_name"] for x in payload["ranking"]], ["A1", "A2", "A3", "A4"])
+		self.assertEqual(sorted(payload["ranking_by_position"].keys()), ["QB", "WR"])
+
+		for pos in ("QB", "WR"):
+			res_pos = self.client.get(f"/api/trainings/{self.t1.id}/ranking/?position={pos}")
+			self.assertEqual(res_pos.status_code, 200)
+			self.assertEqual(payload["ranking_by_position"][pos], res_pos.json()["items"])
+
+		wr = payload["ranking_by_position"]["WR"]
+		self.assertEqual([(x["athlete_name"], x["rank"]) for x in wr], [("A3", 1), ("A4", 2)])
+
+	def test_multi_training_endpoints_query_count_is_constant(self):
+		for day in range(2, 8):
+			t = TrainingSession.objects.create(date=date(2026, 1, day), created_by=self.coach)
+			d = TrainingDrill.objects.create(training=t, name_override="D1", order=1, weight=1)
+			for a in (self.a1, self.a2, self.a3):
+				Attendance.objects.create(training=t, athlete=a, status="PRESENT")
+				DrillScore.objects.create(training_drill=d, athlete=a, score=day, rated_by=self.coach)
+
+		for endpoint in ("coach_overview", "evolution", "boxplots"):
+			counts = []
+			for limit in (2, 7):
+				with CaptureQueriesContext(connection) as ctx:
+					res = self.client.get(f"/api/trainings/{endpoint}/?limit={limit}")
+				self.assertEqual(res.status_code, 200)
+				counts.append(len(ctx.captured_queries))
+			self.assertEqual(counts[0], counts[1], endpoint)
+
+
+class TrainingFixtureTestCase(APITestCase):
+	"""Treino com dois drills (pesos 2 e 1), duas notas de A1 e a presença de A1."""
+
+	def setUp(self):
+		self.client = APIClient()
+		self.coach = User.objects.create_user(username="coach", password="pw")
+		self.coach.profile.role = "COACH"
+		self.coach.profile.save()
+		self.client.force_authenticate(user=self.coach)
+
+		self.a1 = Athlete.objects.create(name="A1", current_position="QB")
+		self.a2 = Athlete.objects.create(name="A2", current_position="WR")
+		self.t1 = TrainingSession.objects.create(date=date(2026, 1, 1), created_by=self.coach)
+		Attendance.objects.create(training=self.t1, athlete=self.a1, status="PRESENT")
+		self.d1 = TrainingDrill.objects.create(training=self.t1, name_override="D1", order=1, weight=2)
+		self.d2 = TrainingDrill.objects.create(training=self.t1, name_override="D2", order=2, weight=1)
+		self.s1 = DrillScore.objects.create(training_drill=self.d1, athlete=self.a1, score=9)
+		DrillScore.objects.create(training_drill=self.d2, athlete=self.a1, score=3)
+
+	def summary(self, athlete):
+		return TrainingAthleteSummary.objects.filter(training=self.t1, athlete=athlete).first()
+
+
+class TrainingAthleteSummaryTests(TrainingFixtureTestCase):
+	def test_summary_tracks_scores_weights_and_attendance(self):
+		s = self.summary(self.a1)
+		self.assertEqual(s.attendance_status, "PRESENT")
+		self.assertEqual(s.scored_drills_count, 2)
+		self.assertEqual(s.weighted_average, 7.0)
+
+		self.s1.score = 6
+		self.s1.save()
+		self.assertEqual(self.summary(self.a1).weighted_average, 5.0)
+
+		self.d1.weight = 1
+		self.d1.save()
+		self.assertEqual(self.summary(self.a1).weighted_average, 4.5)
+
+		Attendance.objects.filter(training=self.t1, athlete=self.a1).delete()
+		self.assertIsNone(self.summary(self.a1).attendance_status)
+
+		self.d2.delete()
+		s = self.summary(self.a1)
+		self.assertEqual((s.scored_drills_count, s.weighted_average), (1, 6.0))
+
+		self.s1.delete()
+		self.assertIsNone(self.summary(self.a1))
+
+	def test_cascading_deletes_drop_summaries(self):
+		self.a1.delete()
+		self.assertFalse(TrainingAthleteSummary.objects.exists())
+
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a2, score=5)
+		self.assertTrue(TrainingAthleteSummary.objects.exists())
+		self.t1.delete()
+		self.assertFalse(TrainingAthleteSummary.objects.exists())
+
+	def test_bulk_endpoints_refresh_summaries(self):
+		res = self.client.post(
+			f"/api/trainings/{self.t1.id}/attendance_bulk/",
+			[{"athlete": self.a2.id, "status": "LATE"}],
+			format="json",
+		)
+		self.assertEqual(res.status_code, 200)
+		res = self.client.post(
+			f"/api/trainings/{self.t1.id}/scores_bulk/",
+			[
+				{"training_drill": self.d1.id, "athlete": self.a2.id, "score": 8},
+				{"training_drill": self.d2.id, "athlete": self.a2.id, "score": 5},
+			],
+			format="json",
+		)
+		self.assertEqual(res.status_code, 200)
+
+		s = self.summary(self.a2)
+		self.assertEqual(s.attendance_status, "LATE")
+		self.assertEqual(s.weighted_average, 7.0)
+
+		ranking = self.client.get(f"/api/trainings/{self.t1.id}/ranking/").json()["items"]
+		self.assertEqual([x["athlete_name"] for x in ranking], ["A1", "A2"])
+
+	def test_rebuild_command_restores_summaries(self):
+		TrainingAthleteSummary.objects.all().delete()
+		call_command("rebuild_training_summaries", stdout=StringIO())
+		self.assertEqual(self.summary(self.a1).weighted_average, 7.0)
+
+
+class TrainingResponseCacheTests(TrainingFixtureTestCase):
+	def test_analytics_responses_are_cached_per_revision(self):
+		url = f"/api/trainings/{self.t1.id}/ranking/"
+		first = self.client.get(url).json()["items"]
+
+		with CaptureQueriesContext(connection) as ctx:
+			cached = self.client.get(url).json()["items"]
+		self.assertEqual(cached, first)
+		self.assertFalse(any("trainings_trainingathletesummary" in q["sql"] for q in ctx.captured_queries))
+
+		revision = TrainingSession.objects.get(pk=self.t1.pk).revision
+		self.s1.score = 1
+		self.s1.save()
+		self.t1.refresh_from_db()
+		self.assertGreater(self.t1.revision, revision)
+
+		# Um save comum do treino não reescreve a revisão carregada em memória.
+		stale = TrainingSession.objects.get(pk=self.t1.pk)
+		DrillScore.objects.filter(pk=self.s1.pk).first().save()
+		stale.location = "Campo 2"
+		stale.save()
+		self.assertGreater(TrainingSession.objects.get(pk=self.t1.pk).revision, self.t1.revision)
+
+		updated = self.client.get(url).json()["items"]
+		self.assertEqual(updated[0]["weighted_average"], 1.67)
+
+	def test_deleting_an_athlete_invalidates_cached_rankings(self):
+		Attendance.objects.create(training=self.t1, athlete=self.a2, status="PRESENT")
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a2, score=10)
+		url = f"/api/trainings/{self.t1.id}/ranking/"
+		self.assertEqual([x["athlete_name"] for x in self.client.get(url).json()["items"]], ["A2", "A1"])
+		revision = TrainingSession.objects.get(pk=self.t1.pk).revision
+
+		self.a2.delete()
+		self.t1.refresh_from_db()
+		self.assertGreater(self.t1.revision, revision)
+		self.assertTrue(self.t1.rollups_stale)
+		items = self.client.get(url).json()["items"]
+		self.assertEqual([(x["athlete_name"], x["rank"]) for x in items], [("A1", 1)])
+
+
+class BulkEndpointTests(TrainingFixtureTestCase):
+	def test_attendance_bulk_upserts_valid_rows_and_reports_errors(self):
+		a3 = Athlete.objects.create(name="A3", current_position="WR")
+		payload = [
+			{"athlete": self.a1.id, "status": "ABSENT"},
+			{"athlete": self.a2.id, "status": "NOPE"},
+			{"athlete": 999999},
+			{"athlete": a3.id},
+		]
+		with CaptureQueriesContext(connection) as ctx:
+			res = self.client.post(f"/api/trainings/{self.t1.id}/attendance_bulk/", payload, format="json")
+		self.assertEqual(res.status_code, 200)
+		self.assertLess(len(ctx.captured_queries), 20)
+
+		body = res.json()
+		self.assertEqual([e["index"] for e in body["errors"]], [1, 2])
+		self.assertEqual({i["athlete"]: i["status"] for i in body["items"]}, {self.a1.id: "ABSENT", a3.id: "PRESENT"})
+		self.assertEqual(Attendance.objects.filter(training=self.t1).count(), 2)
+		self.assertEqual(self.summary(self.a1).attendance_status, "ABSENT")
+
+		res = self.client.post(f"/api/trainings/{self.t1.id}/attendance_bulk/", [{"status": "LATE"}], format="json")
+		self.assertEqual(res.status_code, 400)
+
+	def test_scores_bulk_validates_rows_and_returns_compact_ack(self):
+		other = TrainingSession.objects.create(date=date(2026, 1, 2), created_by=self.coach)
+		foreign_drill = TrainingDrill.objects.create(training=other, name_override="X", order=1)
+		payload = [
+			{"training_drill": self.d1.id, "athlete": self.a2.id, "score": 8},
+			{"training_drill": self.d2.id, "athlete": self.a2.id, "score": 11},
+			{"training_drill": foreign_drill.id, "athlete": self.a2.id, "score": 5},
+			{"training_drill": self.d2.id, "athlete": self.a1.id, "score": 10, "comment": "ok"},
+		]
+		res = self.client.post(f"/api/trainings/{self.t1.id}/scores_bulk/", payload, format="json")
+		self.assertEqual(res.status_code, 200)
+
+		body = res.json()
+		self.assertEqual(body["count"], 2)
+		self.assertEqual(len(body["ids"]), len(body["updated_at"]))
+		self.assertEqual([e["index"] for e in body["errors"]], [1, 2])
+		self.assertIn("score", body["errors"][0]["errors"])
+		self.assertIn("training_drill", body["errors"][1]["errors"])
+
+		updated = DrillScore.objects.get(training_drill=self.d2, athlete=self.a1)
+		self.assertEqual((float(updated.score), updated.comment, updated.rated_by_id), (10.0, "ok", self.coach.id))
+		self.assertEqual(self.summary(self.a1).weighted_average, 9.33)
+		self.assertFalse(DrillScore.objects.filter(training_drill=foreign_drill).exists())
+
+		res = self.client.post(
+			f"/api/trainings/{self.t1.id}/scores_bulk/?full=1",
+			[{"training_drill": self.d2.id, "athlete": self.a2.id, "score": 4}],
+			format="json",
+		)
+		self.assertEqual(res.json()["items"][0]["athlete_name"], "A2")
+
+
+class TrainingTemplateTests(TrainingFixtureTestCase):
+	def test_templates_clone_drill_plan_with_single_insert(self):
+		res = self.client.post(f"/api/trainings/{self.t1.id}/save_as_template/", {"name": "Base"}, format="json")
+		self.assertEqual(res.status_code, 201)
+		template_id = res.json()["id"]
+		self.assertEqual([d["name"] for d in res.json()["drills"]], ["D1", "D2"])
+
+		t2 = TrainingSession.objects.create(date=date(2026, 1, 8), created_by=self.coach)
+		revision = t2.revision
+		with CaptureQueriesContext(connection) as ctx:
+			res = self.client.post(f"/api/trainings/{t2.id}/apply_template/", {"template": template_id}, format="json")
+		self.assertEqual(res.status_code, 200)
+		self.assertEqual([(d["name"], d["weight"]) for d in res.json()], [("D1", "2.00"), ("D2", "1.00")])
+		inserts = [q for q in ctx.captured_queries if q["sql"].startswith('INSERT INTO "trainings_trainingdrill"')]
+		self.assertEqual(len(inserts), 1)
+		t2.refresh_from_db()
+		self.assertGreater(t2.revision, revision)
+
+		res = self.client.post(
+			f"/api/trainings/{t2.id}/apply_template/",
+			{"from_training": self.t1.id, "replace": True},
+			format="json",
+		)
+		self.assertEqual(res.status_code, 200)
+		self.assertEqual(TrainingDrill.objects.filter(training=t2).count(), 2)
+
+		res = self.client.post(f"/api/trainings/{t2.id}/apply_template/", {}, format="json")
+		self.assertEqual(res.status_code, 400)
+
+
+class TrainingListTests(TrainingFixtureTestCase):
+	def test_list_is_paginated_summary_and_detail_expands_on_demand(self):
+		def list_queries():
+			with CaptureQueriesContext(connection) as ctx:
+				res = self.client.get("/api/trainings/")
+			self.assertEqual(res.status_code, 200)
+			return res.json(), len(ctx.captured_queries)
+
+		body, baseline = list_queries()
+		row = body["results"][0]
+		self.assertNotIn("drills", row)
+		self.assertEqual(
+			(row["drills_count"], row["attendance_count"], row["present_count"], row["weighted_average"]),
+			(2, 1, 1, 7.0),
+		)
+
+		for day in range(2, 6):
+			t = TrainingSession.objects.create(date=date(2026, 1, day), created_by=self.coach)
+			d = TrainingDrill.objects.create(training=t, name_override="D", order=1)
+			Attendance.objects.create(training=t, athlete=self.a2, status="PRESENT")
+			DrillScore.objects.create(training_drill=d, athlete=self.a2, score=5)
+		body, queries = list_queries()
+		self.assertEqual(queries, baseline)
+		self.assertEqual(body["results"][0]["date"], "2026-01-05")
+
+		res = self.client.get("/api/trainings/?page_size=2")
+		self.assertEqual(len(res.json()["results"]), 2)
+		self.assertTrue(res.json()["next"])
+
+		res = self.client.get(f"/api/trainings/{self.t1.id}/")
+		self.assertNotIn("drills", res.json())
+		self.assertNotIn("attendances", res.json())
+
+		res = self.client.get(f"/api/trainings/{self.t1.id}/?expand=drills")
+		self.assertNotIn("scores", res.json()["drills"][0])
+
+		with CaptureQueriesContext(connection) as ctx:
+			res = self.client.get(f"/api/trainings/{self.t1.id}/?expand=scores,attendances")
+		body = res.json()
+		self.assertEqual([len(d["scores"]) for d in body["drills"]], [1, 1])
+		self.assertEqual(body["drills"][0]["scores"][0]["athlete_name"], "A1")
+		self.assertEqual(body["attendances"][0]["athlete_name"], "A1")
+		self.assertLessEqual(len(ctx.captured_queries), 5)
+
+
+class SeasonCsvTests(TrainingFixtureTestCase):
+	def test_season_csv_streams_one_row_per_athlete_and_training(self):
+		catalog = DrillCatalog.objects.create(name="Route Tree")
+		self.d1.drill = catalog
+		self.d1.name_override = None
+		self.d1.save()
+		t2 = TrainingSession.objects.create(date=date(2026, 2, 1), location="CT", created_by=self.coach)
+		d3 = TrainingDrill.objects.create(training=t2, drill=catalog, order=1)
+		Attendance.objects.create(training=t2, athlete=self.a2, status="LATE")
+		DrillScore.objects.create(training_drill=d3, athlete=self.a2, score=6, comment="bom")
+		TrainingSession.objects.create(date=date(2026, 3, 1), created_by=self.coach)
+
+		res = self.client.get("/api/trainings/export/season_csv/?from=2026-01-01&to=2026-02-28")
+		self.assertEqual(res.status_code, 200)
+		self.assertTrue(res.streaming)
+		rows = list(csv.reader(StringIO(b"".join(res).decode("utf-8"))))
+
+		header = rows[0]
+		self.assertEqual(header[9:], ["Drill: Route Tree", "Drill: D2", "Comment: Route Tree", "Comment: D2"])
+		self.assertEqual(len(rows), 3)
+		self.assertEqual(rows[1][3:9], ["A1", "", "QB", "Presente", "7.0", "1"])
+		self.assertEqual(rows[1][9:11], ["9.0", "3.0"])
+		self.assertEqual(rows[2][0:4], [str(t2.id), "2026-02-01", "CT", "A2"])
+		self.assertEqual(rows[2][9:], ["6.0", "", "bom", ""])
+
+		res = self.client.get("/api/trainings/export/season_csv/?from=2026-02-30")
+		self.assertEqual(res.status_code, 400)
+
+
+class PdfReportJobTests(TrainingFixtureTestCase):
+	def test_pdf_report_job_renders_in_worker_and_reuses_artifact_per_revision(self):
+		media = tempfile.mkdtemp(prefix="mamutes_media_")
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		with override_settings(MEDIA_ROOT=media):
+			url = f"/api/trainings/{self.t1.id}/reports/pdf/"
+			res = self.client.post(url)
+			self.assertEqual(res.status_code, 202)
+			job_id = res.json()["id"]
+			self.assertEqual(res.json()["status"], "PENDING")
+			self.assertEqual(self.client.post(url).json()["id"], job_id)
+			self.assertEqual(self.client.get(f"/api/trainings/reports/{job_id}/download/").status_code, 409)
+
+			call_command("run_report_worker", "--once", stdout=StringIO())
+			res = self.client.get(f"/api/trainings/reports/{job_id}/")
+			self.assertEqual(res.json()["status"], "DONE")
+			self.assertTrue(res.json()["download_url"].endswith(f"/api/trainings/reports/{job_id}/download/"))
+
+			res = self.client.get(f"/api/trainings/reports/{job_id}/download/")
+			self.assertEqual(res.status_code, 200)
+			self.assertTrue(b"".join(res).startswith(b"%PDF"))
+			res.close()
+
+			res = self.client.post(url)
+			self.assertEqual((res.status_code, res.json()["id"]), (200, job_id))
+
+			# Nova revisão: novo job; o arquivo antigo é descartado quando o novo fica pronto.
+			old_path = ReportJob.objects.get(pk=job_id).file.path
+			self.s1.score = 5
+			self.s1.save()
+			res = self.client.post(url)
+			self.assertEqual(res.status_code, 202)
+			self.assertNotEqual(res.json()["id"], job_id)
+			call_command("run_report_worker", "--once", stdout=StringIO())
+			self.assertFalse(os.path.exists(old_path))
+
+			new_path = ReportJob.objects.get(pk=res.json()["id"]).file.path
+			self.t1.delete()
+			self.assertFalse(os.path.exists(new_path))
+
+	def test_render_is_repeated_when_the_training_changes_meanwhile(self):
+		media = tempfile.mkdtemp(prefix="mamutes_media_")
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		rendered = []
+
+		def render(training, writes):
+			rendered.append(training.revision)
+			if len(rendered) <= writes:
+				self.s1.score = len(rendered)
+				self.s1.save()
+			return b"%PDF-fake"
+
+		with override_settings(MEDIA_ROOT=media):
+			enqueue_training_pdf(self.t1)
+			with patch("trainings.pdf.render_training_pdf", lambda t: render(t, writes=1)):
+				job = run_job(claim_next_job())
+			self.assertEqual(job.status, ReportJob.Status.DONE)
+			self.assertEqual(job.revision, TrainingSession.objects.get(pk=self.t1.pk).revision)
+			self.assertEqual(rendered[1], job.revision)
+
+			rendered.clear()
+			self.s1.score = 9
+			self.s1.save()
+			self.t1.refresh_from_db()
+			enqueue_training_pdf(self.t1)
+			with patch("trainings.pdf.render_training_pdf", lambda t: render(t, writes=3)), self.assertLogs("trainings.reports", "ERROR"):
+				job = run_job(claim_next_job())
+			self.assertEqual((job.status, len(rendered)), (ReportJob.Status.FAILED, 3))
+			self.assertFalse(job.file)
+
+
+class PeriodRollupTests(TrainingFixtureTestCase):
+	def run_worker(self):
+		call_command("run_report_worker", "--once", stdout=StringIO())
+
+	def test_period_rollups_follow_writes_and_serve_long_ranges(self):
+		t2 = TrainingSession.objects.create(date=date(2026, 1, 20), created_by=self.coach)
+		d = TrainingDrill.objects.create(training=t2, name_override="D", order=1)
+		Attendance.objects.create(training=t2, athlete=self.a2, status="LATE")
+		DrillScore.objects.create(training_drill=d, athlete=self.a2, score=5)
+		self.run_worker()
+
+		url = "/api/trainings/evolution/?grain=month&from=2026-01-01&to=2026-12-31"
+		body = self.client.get(url).json()
+		self.assertEqual(body["team_trend"], [{"period_start": "2026-01-01", "label": "2026-01", "value": 6.0}])
+		self.assertEqual(body["periods"][0]["trainings_count"], 2)
+
+		# Escrita só marca o treino; a leitura não recalcula, o worker sim (só os períodos dele).
+		self.s1.score = 3
+		self.s1.save()
+		self.t1.refresh_from_db()
+		self.assertTrue(self.t1.rollups_stale)
+		self.assertEqual(self.client.get(url).json()["team_trend"][0]["value"], 6.0)
+		self.run_worker()
+		self.t1.refresh_from_db()
+		self.assertFalse(self.t1.rollups_stale)
+		self.assertEqual(self.client.get(url).json()["team_trend"][0]["value"], 4.0)
+
+		t2.date = date(2026, 3, 2)
+		t2.save()
+		self.run_worker()
+		res = self.client.get("/api/trainings/attendance_trends/?grain=month")
+		items = {i["label"]: i for i in res.json()["items"]}
+		self.assertEqual((items["2026-01"]["present"], items["2026-03"]["late"]), (1, 1))
+
+		res = self.client.get(f"/api/trainings/evolution/?grain=week&athlete_id={self.a2.id}")
+		self.assertEqual(res.json()["individual"]["trend"][0]["label"], "2026-S10")
+
+		def queries():
+			with CaptureQueriesContext(connection) as ctx:
+				self.client.get("/api/trainings/evolution/?grain=week")
+			return [q["sql"] for q in ctx.captured_queries]
+
+		baseline = len(queries())
+		for week in range(1, 9):
+			t = TrainingSession.objects.create(date=date(2024, 1, 1 + 7 * (week % 4)), created_by=self.coach)
+			DrillScore.objects.create(
+				training_drill=TrainingDrill.objects.create(training=t, name_override="X", order=1),
+				athlete=self.a1,
+				score=week,
+			)
+		# com treinos marcados a leitura continua só lendo
+		sql = queries()
+		self.assertTrue(all(q.lstrip().upper().startswith("SELECT") for q in sql))
+		self.run_worker()
+		self.assertEqual(len(queries()), baseline)
+
+		self.assertEqual(self.client.get("/api/trainings/evolution/?grain=year").status_code, 400)
+
+
+class LiveEventsTests(TrainingFixtureTestCase):
+	def stream(self, url, data=None, **extra):
+		"""(resposta, corpo) de uma view SSE async, lida com AsyncClient."""
+		async def fetch():
+			res = await AsyncClient().get(url, data, **extra)
+			if not res.streaming:
+				return res, res.content
+			return res, b"".join([chunk async for chunk in res.streaming_content])
+
+		return async_to_sync(fetch)()
+
+	@override_settings(TRAININGS_SSE_MAX_SECONDS=0)
+	def test_live_events_stream_scores_attendance_and_rank_deltas(self):
+		self.assertEqual(self.summary(self.a1).rank, 1)
+		cursor = TrainingEvent.objects.filter(training=self.t1).latest("id").id
+
+		self.client.post(
+			f"/api/trainings/{self.t1.id}/attendance_bulk/",
+			[{"athlete": self.a2.id, "status": "PRESENT"}],
+			format="json",
+		)
+		self.client.post(
+			f"/api/trainings/{self.t1.id}/scores_bulk/",
+			[
+				{"training_drill": self.d1.id, "athlete": self.a2.id, "score": 10},
+				{"training_drill": self.d2.id, "athlete": self.a2.id, "score": 10},
+			],
+			format="json",
+		)
+		self.assertEqual(self.summary(self.a1).rank, 2)
+		self.assertEqual(self.summary(self.a2).rank, 1)
+
+		url = f"/api/trainings/{self.t1.id}/events/"
+		self.assertEqual(self.stream(url)[0].status_code, 401)
+		token = self.client.post(f"{url}token/").json()["token"]
+		res, body = self.stream(url, {"token": token}, headers={"Last-Event-ID": str(cursor)})
+		self.assertEqual(res.status_code, 200)
+		self.assertEqual(res["Content-Type"], "text/event-stream")
+
+		frames = []
+		for block in body.decode().split("\n\n"):
+			fields = dict(line.split(": ", 1) for line in block.splitlines() if not line.startswith(("retry", ":")))
+			if fields:
+				frames.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+
+		# cada escrita publica o que mudou e, em seguida, o delta de ranking dos afetados
+		self.assertEqual([kind for _id, kind, _data in frames], ["attendance", "ranking", "scores", "ranking"])
+		self.assertTrue(all(event_id > cursor for event_id, _kind, _data in frames))
+		self.assertEqual(frames[0][2]["attendances"], [{"athlete": self.a2.id, "status": "PRESENT", "checkin_time": None}])
+		self.assertEqual([c["rank"] for c in frames[1][2]["changes"]], [None])
+		self.assertEqual(len(frames[2][2]["scores"]), 2)
+		changes = {c["athlete_id"]: (c["previous_rank"], c["rank"]) for c in frames[3][2]["changes"]}
+		self.assertEqual(changes, {self.a1.id: (1, 2), self.a2.id: (None, 1)})
+		self.assertEqual(frames[3][2]["team_weighted_average"], 8.5)
+
+		# reconexão a partir do último id não repete eventos
+		_res, body = self.stream(url, {"token": token, "since": frames[-1][0]})
+		self.assertNotIn(b"event:", body)
+
+	def test_query_token_is_a_short_lived_stream_token_for_one_training(self):
+		url = f"/api/trainings/{self.t1.id}/events/"
+		access = str(RefreshToken.for_user(self.coach).access_token)
+		self.assertEqual(self.stream(url, {"token": access})[0].status_code, 401)
+		with override_settings(TRAININGS_SSE_MAX_SECONDS=0):
+			self.assertEqual(self.stream(url, headers={"Authorization": f"Bearer {access}"})[0].status_code, 200)
+
+		other = TrainingSession.objects.create(date=date(2026, 1, 2), created_by=self.coach)
+		token = self.client.post(f"/api/trainings/{other.id}/events/token/").json()["token"]
+		self.assertEqual(self.stream(url, {"token": token})[0].status_code, 401)
+
+		res = self.client.post(f"{url}token/").json()
+		self.assertEqual(res["expires_in"], 60)
+		with override_settings(TRAININGS_SSE_TOKEN_SECONDS=-1):
+			self.assertEqual(self.stream(url, {"token": res["token"]})[0].status_code, 401)
+
+		# o papel é conferido ao abrir o stream
+		player = User.objects.create_user(username="player", password="pw")
+		self.client.force_authenticate(user=player)
+		token = self.client.post(f"{url}token/").json()["token"]
+		self.assertEqual(self.stream(url, {"token": token})[0].status_code, 403)
+
+	def test_prune_removes_events_past_the_retention(self):
+		TrainingEvent.objects.update(created_at=timezone.now() - timedelta(seconds=300 + 3600 + 1))
+		publish(self.t1.id, TrainingEvent.Kind.RANKING, {"changes": []})
+		call_command("prune_training_events", stdout=StringIO())
+		self.assertEqual(list(TrainingEvent.objects.values_list("kind", flat=True)), ["ranking"])
+
+		TrainingEvent.objects.update(created_at=timezone.now() - timedelta(hours=2))
+		call_command("run_report_worker", "--once", stdout=StringIO())
+		self.assertFalse(TrainingEvent.objects.exists())
+
+
+class SyncTests(TrainingFixtureTestCase):
+	def test_sync_feed_returns_changes_tombstones_and_dedupes_pushes(self):
+		hour_ago = timezone.now() - timedelta(hours=1)
+		for model in (TrainingSession, TrainingDrill, Attendance, DrillScore):
+			model.objects.update(updated_at=hour_ago)
+
+		snapshot = self.client.get("/api/trainings/sync/").json()
+		self.assertEqual([t["id"] for t in snapshot["trainings"]], [self.t1.id])
+		self.assertEqual(len(snapshot["drills"]), 2)
+		self.assertEqual(snapshot["attendances"][0]["athlete"], self.a1.id)
+		self.assertEqual(len(snapshot["scores"]), 2)
+
+		op = {
+			"key": "tablet-1:0001",
+			"type": "scores",
+			"training": self.t1.id,
+			"items": [{"training_drill": self.d1.id, "athlete": self.a2.id, "score": 8}],
+		}
+		first = self.client.post("/api/trainings/sync/", {"ops": [op]}, format="json").json()["results"][0]
+		self.assertEqual((first["status"], first["duplicate"]), (200, False))
+		deleted_id = self.s1.id
+		self.s1.delete()
+
+		feed = self.client.get("/api/trainings/sync/", {"since": snapshot["cursor"]}).json()
+		self.assertEqual(feed["trainings"], [])
+		self.assertEqual(feed["drills"], [])
+		self.assertEqual([(s["athlete"], s["score"]) for s in feed["scores"]], [(self.a2.id, 8.0)])
+		self.assertEqual(feed["deleted"]["scores"], [deleted_id])
+
+		res = self.client.post(
+			"/api/trainings/sync/",
+			{"ops": [op, {"key": "tablet-1:0002", "type": "unknown", "training": self.t1.id, "items": []}]},
+			format="json",
+		).json()["results"]
+		self.assertEqual(res[0], {**first, "duplicate": True})
+		self.assertEqual(res[1]["status"], 400)
+		self.assertEqual(DrillScore.objects.filter(athlete=self.a2).count(), 1)
+
+		self.assertEqual(self.client.get("/api/trainings/sync/", {"since": "ontem"}).status_code, 400)
+
+	def test_drill_push_is_validated_and_rejected_per_op(self):
+		catalog = DrillCatalog.objects.create(name="Route Tree")
+		ops = [
+			{"key": "k1", "type": "drills", "training": self.t1.id, "items": [{"drill": catalog.id, "order": 3}, "x"]},
+			{"key": "k2", "type": "drills", "training": self.t1.id, "items": [{"weight": "pesado"}, {"drill": 999999}]},
+			{"key": "k3", "type": "drills", "training": self.t1.id, "items": [{"drill": catalog.id, "weight": 1.5}]},
+		]
+		res = self.client.post("/api/trainings/sync/", {"ops": ops}, format="json").json()["results"]
+
+		self.assertEqual([r["status"] for r in res], [400, 400, 201])
+		self.assertEqual([e["index"] for e in res[0]["response"]["errors"]], [1])
+		self.assertEqual([sorted(e["errors"]) for e in res[1]["response"]["errors"]], [["weight"], ["drill"]])
+		drill = TrainingDrill.objects.get(pk=res[2]["response"]["ids"][0])
+		self.assertEqual((drill.drill_id, float(drill.weight)), (catalog.id, 1.5))
+		self.assertEqual(TrainingDrill.objects.filter(training=self.t1).count(), 3)
+
+		res = self.client.post(f"/api/trainings/{self.t1.id}/drills_bulk/", [{"max_score": 0}], format="json")
+		self.assertEqual(res.status_code, 400)
+
+	def test_history_past_the_horizon_is_pruned_and_old_cursors_reset(self):
+		op = {"key": "k1", "type": "attendance", "training": self.t1.id, "items": [{"athlete": self.a2.id}]}
+		self.client.post("/api/trainings/sync/", {"ops": [op]}, format="json")
+		self.s1.delete()
+		old = timezone.now() - timedelta(days=31)
+		SyncTombstone.objects.update(deleted_at=old)
+		SyncReceipt.objects.update(created_at=old)
+
+		feed = self.client.get("/api/trainings/sync/", {"since": (old + timedelta(hours=1)).isoformat()}).json()
+		self.assertTrue(feed["reset"])
+		self.assertEqual(len(feed["scores"]), 1)
+		self.assertEqual(feed["deleted"]["scores"], [])
+
+		call_command("prune_sync_history", stdout=StringIO())
+		self.assertFalse(SyncTombstone.objects.exists())
+		self.assertFalse(SyncReceipt.objects.exists())
+		feed = self.client.get("/api/trainings/sync/", {"since": feed["cursor"]}).json()
+		self.assertFalse(feed["reset"])
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN do SQLite")
+class QueryPlanTests(TestCase):
+	"""
+	Planos das queries quentes de trainings/views.py e dashboard/views.py num dataset
+	semeado (com ANALYZE): nenhuma pode voltar a varrer a tabela inteira.
+	"""
+
+	@classmethod
+	def setUpTestData(cls):
+		athletes = Athlete.objects.bulk_create([Athlete(name=f"Atleta {i}", current_position="WR") for i in range(25)])
+		trainings = TrainingSession.objects.bulk_create([
+			TrainingSession(date=date(2025, 1, 1) + timedelta(days=3 * i)) for i in range(40)
+		])
+		drills = TrainingDrill.objects.bulk_create([
+			TrainingDrill(training=t, name_override=f"D{k}", order=k) for t in trainings for k in range(4)
+		])
+		Attendance.objects.bulk_create([
+			Attendance(training=t, athlete=a, status=("PRESENT", "LATE", "ABSENT")[(t.id + a.id) % 3])
+			for t in trainings for a in athletes
+		])
+		DrillScore.objects.bulk_create([
+			DrillScore(training_drill=d, athlete=a, score=(d.id + a.id) % 11) for d in drills for a in athletes
+		])
+		rebuild_summaries()
+		with connection.cursor() as cursor:
+			cursor.execute("ANALYZE")
+		cls.athlete = athletes[0]
+		cls.training = trainings[-1]
+		cls.recent_ids = [t.id for t in trainings[-8:]]
+
+	def assert_indexed(self, qs, ordered=False):
+		plan = qs.explain()
+		scans = [line for line in plan.splitlines() if re.search(r"\bSCAN \w+$", line.strip())]
+		self.assertEqual(scans, [], plan)
+		if ordered:
+			self.assertNotIn("TEMP B-TREE", plan, plan)
+
+	def test_latest_trainings(self):
+		self.assert_indexed(TrainingSession.objects.order_by("-date", "-id")[:8], ordered=True)
+
+	def test_training_drills_in_plan_order(self):
+		self.assert_indexed(TrainingDrill.objects.filter(training=self.training).order_by("order", "id"), ordered=True)
+
+	def test_attendance_counts_by_training_and_status(self):
+		self.assert_indexed(
+			Attendance.objects
+			.filter(training_id__in=self.recent_ids)
+			.values("training_id", "status")
+			.annotate(count=Count("id"))
+		)
+
+	def test_athlete_attended_trainings(self):
+		self.assert_indexed(
+			Attendance.objects
+			.filter(athlete=self.athlete, status__in=["PRESENT", "LATE"])
+			.order_by("-training__date", "-training__id")
+			.values_list("training_id", flat=True)[:8]
+		)
+
+	def test_training_scores(self):
+		self.assert_indexed(
+			DrillScore.objects
+			.filter(training_drill__training=self.training)
+			.values("training_drill_id")
+			.annotate(avg_score=Avg("score"))
+		)
+
+	def test_athlete_scores_in_recent_trainings(self):
+		self.assert_indexed(
+			DrillScore.objects.filter(athlete=self.athlete, training_drill__training_id__in=self.recent_ids)
+		)
+
+	def test_athlete_drill_trend(self):
+		self.assert_indexed(
+			DrillScore.objects
+			.filter(athlete=self.athlete, training_drill__name_override__iexact="D1")
+			.order_by("-training_drill__training__date", "-id")[:20]
+		)
+
+	def test_rankings_from_summaries(self):
+		self.assert_indexed(
+			TrainingAthleteSummary.objects
+			.filter(training_id__in=self.recent_ids, attendance_status__in=RANKABLE_STATUSES)
+			.select_related("athlete")
+		)
+
+
+class BenchmarkTests(TestCase):
+	def setUp(self):
+		self._tmp_media = tempfile.mkdtemp(prefix="mamutes_media_")
+
+	def tearDown(self):
+		shutil.rmtree(self._tmp_media, ignore_errors=True)
+
+	def test_run_benchmark_reports_latency_queries_and_memory(self):
+		profile = {"athletes": 4, "trainings": 2, "catalog": 3, "drills_min": 2, "drills_max": 2}
+		with override_settings(MEDIA_ROOT=self._tmp_media):
+			report = run_benchmark("tiny", profile, repeat=2, only=["trainings.ranking", "dashboard.latest"])
+
+		self.assertEqual(report["dataset"]["trainings"], 2)
+		self.assertEqual([e["name"] for e in report["endpoints"]], ["trainings.ranking", "dashboard.latest_training"])
+		for endpoint in report["endpoints"]:
+			self.assertEqual(endpoint["status"], 200)
+			self.assertGreater(endpoint["queries"], 0)
+			self.assertLessEqual(endpoint["p50_ms"], endpoint["p95_ms"])
+			self.assertGreater(endpoint["peak_kib"], 0)
+
+	def test_seed_profile_uses_the_bulk_seed_without_photos(self):
+		profile = dict(PROFILES["club"], athletes=8, trainings=4)
+		with patch("trainings.summaries.apply_rating_deltas") as deltas:
+			seed_profile(profile, seed=3)
+		deltas.assert_not_called()
+		self.assertEqual(TrainingSession.objects.count(), 4)
+		self.assertEqual(Athlete.objects.count(), 8)
+		self.assertFalse(Athlete.objects.exclude(photo="").exists())
+		self.assertTrue(TrainingAthleteSummary.objects.exists())
+		self.assertFalse(TrainingSession.objects.filter(rollups_stale=True).exists())
+		self.assertEqual(reconcile_ratings(fix=False), [])
+
+
+class BulkSeedTests(TestCase):
+	def _seed(self):
+		call_command(
+			"seed_random_data", reset=True, seed=7, bulk=True, photos="none", batch_size=50,
+			athletes=6, trainings=5, catalog=4, drills_min=2, drills_max=3, stdout=StringIO(),
+		)
+		return sorted(DrillScore.objects.values_list(
+			"training_drill__training__date", "training_drill__order", "athlete__name", "score",
+		))
+
+	def _summaries(self):
+		return sorted(TrainingAthleteSummary.objects.values_list("training_id", "athlete_id", "attendance_status", "weighted_points", "scored_drills_count"))
+
+	def test_bulk_is_deterministic_and_keeps_summaries_in_sync(self):
+		first = self._seed()
+		self.assertTrue(first)
+		self.assertEqual(self._seed(), first)
+		self.assertFalse(Athlete.objects.exclude(photo="").exists())
+		self.assertFalse(TrainingSession.objects.filter(rollups_stale=True).exists())
+
+		bulk_summaries = self._summaries()
+		self.assertTrue(bulk_summaries)
+		rebuild_summaries()
+		self.assertEqual(self._summaries(), bulk_summaries)
+
+	def test_bulk_builds_summaries_and_ratings_in_one_pass(self):
+		with patch("trainings.summaries.apply_rating_deltas") as deltas:
+			self._seed()
+		deltas.assert_not_called()  # nada de refresh_summaries() treino a treino
+		self.assertEqual(reconcile_ratings(fix=False), [])
+		self.assertTrue(Athlete.objects.filter(rating__gt=0).exists())
+
+
+class StartupProfileTests(SimpleTestCase):
+	def test_boot_does_not_load_report_imaging_or_numeric_libraries(self):
+		out = StringIO()
+		call_command("startup_profile", json=True, forbid=["reportlab", "PIL", "numpy"], stdout=out)
+		report = json.loads(out.getvalue())
+		self.assertFalse(report["heavy_loaded"]["reportlab"])
+		self.assertFalse(report["heavy_loaded"]["PIL"])
+		self.assertFalse(report["heavy_loaded"]["numpy"])
+		self.assertIn("trainings.views", [m["module"] for m in report["modules"]])
+		self.assertGreater(report["seconds"], 0)
+
+
+class AthleteRatingTests(TestCase):
+	def setUp(self):
+		self.a1 = Athlete.objects.create(name="A1")
+		self.a2 = Athlete.objects.create(name="A2")
+		self.t1 = TrainingSession.objects.create(date=date(2026, 3, 1))
+		self.t2 = TrainingSession.objects.create(date=date(2026, 3, 2))
+		self.d1 = TrainingDrill.objects.create(training=self.t1, name_override="D1", weight=1)
+		self.d2 = TrainingDrill.objects.create(training=self.t1, name_override="D2", weight=3)
+		self.d3 = TrainingDrill.objects.create(training=self.t2, name_override="D3", weight=2)
+
+	def _rating(self, athlete):
+		athlete.refresh_from_db()
+		return round(athlete.rating, 6)
+
+	def test_rating_follows_scores_weights_and_deletes(self):
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a1, score=8)
+		s2 = DrillScore.objects.create(training_drill=self.d2, athlete=self.a1, score=4)
+		DrillScore.objects.create(training_drill=self.d3, athlete=self.a1, score=10)
+		self.assertEqual(self._rating(self.a1), round((8 + 12 + 20) / 6, 6))
+
+		s2.score = 6
+		s2.save()
+		self.assertEqual(self._rating(self.a1), round((8 + 18 + 20) / 6, 6))
+
+		self.d2.weight = 1
+		self.d2.save()
+		self.assertEqual(self._rating(self.a1), round((8 + 6 + 20) / 4, 6))
+
+		s2.delete()
+		self.assertEqual(self._rating(self.a1), round((8 + 20) / 3, 6))
+
+		self.t2.delete()
+		self.assertEqual(self._rating(self.a1), 8.0)
+
+		self.d1.delete()
+		self.assertEqual(self._rating(self.a1), 0.0)
+		self.assertEqual(reconcile_ratings(fix=False), [])
+
+	def test_one_score_write_is_a_constant_number_of_rating_updates(self):
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a2, score=5)
+		with CaptureQueriesContext(connection) as ctx:
+			DrillScore.objects.create(training_drill=self.d2, athlete=self.a1, score=7)
+		rating_updates = [q for q in ctx.captured_queries if q["sql"].startswith('UPDATE "athletes_athlete"')]
+		self.assertEqual(len(rating_updates), 2)
+
+	def test_profile_save_does_not_clobber_rating(self):
+		stale = Athlete.objects.get(pk=self.a1.pk)
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a1, score=9)
+		stale.birth_city = "Santos"
+		stale.save()
+		self.a1.refresh_from_db()
+		self.assertEqual(self.a1.rating, 9.0)
+		self.assertEqual(self.a1.birth_city, "Santos")
+
+	def test_reconcile_command_fixes_drift(self):
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a1, score=6)
+		Athlete.objects.filter(pk=self.a1.pk).update(rating_points=1, rating=1)
+		out = StringIO()
+		call_command("reconcile_athlete_ratings", stdout=out)
+		self.assertIn("1 atleta(s)", out.getvalue())
+		self.assertEqual(self._rating(self.a1), 6.0)
+		self.assertEqual(reconcile_ratings(fix=False), [])
+
+	def test_list_orders_and_filters_by_stored_rating(self):
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a1, score=4)
+		DrillScore.objects.create(training_drill=self.d1, athlete=self.a2, score=9)
+		coach = User.objects.create_user(username="coach", password="pw")
+		coach.profile.role = "COACH"
+		coach.profile.save()
+		client = APIClient()
+		client.force_authenticate(user=coach)
+
+		res = client.get("/api/athletes/?ordering=-rating")
+		self.assertEqual([a["name"] for a in res.json()], ["A2", "A1"])
+		res = client.get("/api/athletes/?rating__gte=5")
+		self.assertEqual([a["name"] for a in res.json()], ["A2"])
+
+
+class CollectTrainingChangesTests(TestCase):
+	def setUp(self):
+		self.athlete = Athlete.objects.create(name="A1")
+		self.training = TrainingSession.objects.create(date=date(2026, 3, 1))
+		self.drill = TrainingDrill.objects.create(training=self.training, name_override="D1")
+
+	def test_failed_block_inside_atomic_is_discarded_on_rollback(self):
+		with self.captureOnCommitCallbacks(execute=True) as callbacks:
+			with self.assertRaises(RuntimeError):
+				with transaction.atomic(), collect_training_changes():
+					DrillScore.objects.create(training_drill=self.drill, athlete=self.athlete, score=7)
+					raise RuntimeError("boom")
+		self.assertEqual(callbacks, [])
+		self.assertFalse(TrainingAthleteSummary.objects.exists())
+
+	def test_failed_block_defers_committed_writes_to_on_commit(self):
+		with self.captureOnCommitCallbacks(execute=True) as callbacks:
+			with self.assertRaises(RuntimeError):
+				with collect_training_changes():
+					DrillScore.objects.create(training_drill=self.drill, athlete=self.athlete, score=7)
+					self.assertFalse(TrainingAthleteSummary.objects.exists())
+					raise RuntimeError("boom")
+		self.assertEqual(len(callbacks), 1)
+		summary = TrainingAthleteSummary.objects.get(training=self.training, athlete=self.athlete)
+		self.assertEqual(summary.weighted_points, 7.0)
+
+
+class AthleteRevisionTests(TestCase):
+	def setUp(self):
+		self.athlete = Athlete.objects.create(name="A1", current_position="QB")
+		self.training = TrainingSession.objects.create(date=date(2026, 3, 1))
+		Attendance.objects.create(training=self.training, athlete=self.athlete, status="PRESENT")
+
+	def _revision(self):
+		return TrainingSession.objects.get(pk=self.training.pk).revision
+
+	def test_only_fields_shown_in_training_responses_bump_revision(self):
+		revision = self._revision()
+		self.athlete.birth_city = "Santos"
+		self.athlete.career_notes = "Rookie"
+		self.athlete.save()
+		self.assertEqual(self._revision(), revision)
+
+		for field, value in (("name", "A1 Silva"), ("current_position", "WR"), ("jersey_number", 12)):
+			with self.subTest(field=field):
+				setattr(self.athlete, field, value)
+				self.athlete.save()
+				self.assertGreater(self._revision(), revision)
+				revision = self._revision()
+
+
+class ReportJobLeaseTests(TestCase):
+	def setUp(self):
+		self.training = TrainingSession.objects.create(date=date(2026, 3, 1))
+
+	def _running_job(self, started_seconds_ago):
+		return ReportJob.objects.create(
+			training=self.training,
+			kind=ReportJob.Kind.TRAINING_PDF,
+			revision=self.training.revision,
+			status=ReportJob.Status.RUNNING,
+			started_at=timezone.now() - timedelta(seconds=started_seconds_ago),
+		)
+
+	@override_settings(REPORT_JOB_LEASE_SECONDS=60)
+	def test_running_job_within_lease_is_reused_and_not_reclaimed(self):
+		job = self._running_job(10)
+		self.assertEqual(enqueue_training_pdf(self.training), (job, False))
+		self.assertIsNone(claim_next_job())
+
+	@override_settings(REPORT_JOB_LEASE_SECONDS=60)
+	def test_job_of_dead_worker_is_reclaimed_and_skipped_by_dedupe(self):
+		stale = self._running_job(120)
+		job, created = enqueue_training_pdf(self.training)
+		self.assertTrue(created)
+		self.assertNotEqual(job.pk, stale.pk)
+
+		with self.assertLogs("trainings.reports", "WARNING"):
+			claimed = claim_next_job()
+		self.assertEqual(claimed.pk, stale.pk)
+		self.assertEqual(claimed.status, ReportJob.Status.RUNNING)
+		self.assertGreater(claimed.started_at, timezone.now() - timedelta(seconds=5))
+		self.assertEqual(claim_next_job().pk, job.pk)
+		self.assertIsNone(claim_next_job())
+
+
+class StatsTests(SimpleTestCase):
+	def test_grouped_boxplots_match_tukey_rules_per_group(self):
+		keys = ["a"] * 8 + ["b"] * 3 + ["c"] + ["d"]
+		values = [100, 7, 6, 5, 4, 3, 2, 1] + [3, 1, 2] + [5] + [None]
+		result = stats.grouped_boxplots(keys, values)
+
+		self.assertEqual(list(result), ["a", "b", "c"])
+		self.assertEqual(
+			result["a"],
+			{"min": 1.0, "q1": 2.5, "median": 4.5, "q3": 6.5, "max": 7.0, "outliers": [100.0], "n": 8},
+		)
+		self.assertEqual(
+			result["b"],
+			{"min": 1.0, "q1": 1.0, "median": 2.0, "q3": 3.0, "max": 3.0, "outliers": [], "n": 3},
+		)
+		self.assertEqual(result["c"], stats.boxplot([5]))
+		self.assertEqual((result["c"]["q1"], result["c"]["q3"]), (5.0, 5.0))
+		self.assertIsNone(stats.boxplot([]))
+
+	def test_moments_histograms_and_percentiles(self):
+		m = stats.grouped_moments([1] * 8 + [2], [2, 4, 4, 4, 5, 5, 7, 9, 3])
+		self.assertEqual((m[1]["mean"], m[1]["variance"], m[1]["stddev"]), (5.0, 4.0, 2.0))
+		self.assertEqual((m[2]["n"], m[2]["variance"]), (1, 0.0))
+		self.assertIsNone(stats.mean([]))
+
+	def test_moments_keep_sequential_sums_for_skewed_groups(self):
+		# um grupo enorme e muitos de um valor só: uma matriz grupos × max(n) não caberia
+		keys = [0] * 200_000 + list(range(1, 50_001))
+		values = [(i % 97) / 7 for i in range(len(keys))]
+		m = stats.grouped_moments(keys, values)
+
+		self.assertEqual(len(m), 50_001)
+		self.assertEqual(m[0]["n"], 200_000)
+		self.assertEqual(m[0]["mean"], sum(values[:200_000]) / 200_000)
+		self.assertEqual((m[7]["mean"], m[7]["variance"]), (values[200_006], 0.0))
+
+		self.assertEqual(stats.histogram([4.9, 5, 6.9, 7, 9, 10], (5, 7, 9)), [1, 2, 1, 2])
+		self.assertEqual(stats.histogram([], (5, 7, 9)), [0, 0, 0, 0])
+		self.assertEqual(stats.percentiles([4, 1, 3, 2], (0, 50, 100)), [1.0, 2.5, 4.0])
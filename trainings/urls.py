@@ -1,10 +1,17 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
-from .views import TrainingSessionViewSet, DrillCatalogViewSet, TrainingDrillViewSet, DrillScoreViewSet
+
+from .sse import training_events
+from .views import TrainingSessionViewSet, DrillCatalogViewSet, TrainingDrillViewSet, DrillScoreViewSet, TrainingTemplateViewSet, ReportJobViewSet
 
 router = DefaultRouter()
 router.register(r"catalog", DrillCatalogViewSet, basename="drill-catalog")
 router.register(r"drills", TrainingDrillViewSet, basename="training-drills")
 router.register(r"scores", DrillScoreViewSet, basename="drill-scores")
+router.register(r"templates", TrainingTemplateViewSet, basename="training-templates")
+router.register(r"reports", ReportJobViewSet, basename="training-reports")
 router.register(r"", TrainingSessionViewSet, basename="trainings")
 
-urlpatterns = router.urls
\ No newline at end of file
+urlpatterns = [
+    path("<int:pk>/events/", training_events, name="training-events"),
+] + router.urls
@@ -1,36 +1,51 @@
 import csv
-from django.http import HttpResponse
-from django.db.models import Avg, Sum, Count, F, FloatField, ExpressionWrapper
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.db.models import Avg, Count, IntegerField, OuterRef, Prefetch, Subquery, Value, prefetch_related_objects
 from django.db.models.functions import Coalesce
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.exceptions import ValidationError
 
-from math import ceil, sqrt
+from math import ceil
 from collections import defaultdict
-from django.conf import settings
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image, KeepTogether
-)
-from reportlab.graphics.shapes import Drawing, String
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-
-from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import cm
-from xml.sax.saxutils import escape
 
 from accounts.permissions import IsAdminOrCoach
-from .models import TrainingSession, Attendance, DrillCatalog, TrainingDrill, DrillScore
+from athletes.models import Athlete
+from .bulk import copy_drill_plan, create_drills, save_drill_plan_as_template, upsert_attendances, upsert_scores
+from .cache import cached_training_response
+from .exports import load_drills_and_scores, stream_season_csv
+from .models import (
+    TrainingSession,
+    Attendance,
+    DrillCatalog,
+    TrainingDrill,
+    DrillScore,
+    TrainingTemplate,
+    ReportJob,
+    RollupGrain,
+)
+from .pagination import TrainingCursorPagination
+from .reports import enqueue_training_pdf, training_pdf_filename
+from .rollups import athlete_series, drill_series, team_series
+from .ranking import RANKABLE_STATUSES, build_ranking, build_rankings
+from . import stats
+from .spread import athlete_spreads, most_consistent_athlete, pooled_spread
+from .sse import issue_stream_token, stream_token_seconds
+from .sync import MAX_PUSH_OPS, apply_push, changes_since, parse_cursor
 from .serializers import (
+    parse_expand,
     TrainingSessionSerializer,
+    TrainingSessionListSerializer,
     AttendanceSerializer,
     DrillCatalogSerializer,
     TrainingDrillSerializer,
     DrillScoreSerializer,
+    TrainingTemplateSerializer,
+    ApplyTemplateSerializer,
+    ReportJobSerializer,
 )
 
 
@@ -47,9 +62,43 @@ class DrillCatalogViewSet(ModelViewSet):
         return [IsAuthenticated()]
 
 
+class TrainingTemplateViewSet(ModelViewSet):
+    queryset = TrainingTemplate.objects.all().prefetch_related("drills__drill")
+    serializer_class = TrainingTemplateSerializer
+    search_fields = ("name", "notes")
+    ordering_fields = ("name", "created_at")
+
+    def get_permissions(self):
+        if self.action in ("create", "update", "partial_update", "destroy"):
+            return [IsAuthenticated(), IsAdminOrCoach()]
+        return [IsAuthenticated()]
+
+    def perform_create(self, serializer):
+        serializer.save(created_by=self.request.user)
+
+
+# Faixas da distribuição de notas: 0–4, 5–6, 7–8, 9–10 (bordas inferiores inclusivas).
+SCORE_BINS = (("0-4", "0–4"), ("5-6", "5–6"), ("7-8", "7–8"), ("9-10", "9–10"))
+SCORE_BIN_EDGES = (5, 7, 9)
+
+
+def _count_subquery(model, **filters):
+    """COUNT correlacionado por treino (avaliado só para as linhas da página)."""
+    counts = (
+        model.objects
+        .filter(training=OuterRef("pk"), **filters)
+        .order_by()
+        .values("training")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
 class TrainingSessionViewSet(ModelViewSet):
-    queryset = TrainingSession.objects.all().order_by("-date")
+    queryset = TrainingSession.objects.all().order_by("-date", "-id")
     serializer_class = TrainingSessionSerializer
+    pagination_class = TrainingCursorPagination
     filterset_fields = ("date", "location")
     search_fields = ("location", "notes")
     ordering_fields = ("date", "created_at")
@@ -59,6 +108,60 @@ class TrainingSessionViewSet(ModelViewSet):
             return [IsAuthenticated(), IsAdminOrCoach()]
         return [IsAuthenticated()]
 
+    def get_expand(self):
+        if self.action != "retrieve":
+            return set()
+        return parse_expand(self.request.query_params.get("expand"))
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.action == "list":
+            return qs.annotate(
+                drills_count=_count_subquery(TrainingDrill),
+                attendance_count=_count_subquery(Attendance),
+                present_count=_count_subquery(Attendance, status__in=RANKABLE_STATUSES),
+            )
+
+        expand = self.get_expand()
+        if expand & {"drills", "scores"}:
+            qs = qs.prefetch_related(Prefetch("drills", queryset=TrainingDrill.objects.select_related("drill")))
+        if "scores" in expand:
+            qs = qs.prefetch_related(
+                Prefetch("drills__scores", queryset=DrillScore.objects.select_related("athlete"))
+            )
+        if "attendances" in expand:
+            qs = qs.prefetch_related(
+                Prefetch("attendances", queryset=Attendance.objects.select_related("athlete"))
+            )
+        return qs
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return TrainingSessionListSerializer
+        return TrainingSessionSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        rows = list(page if page is not None else queryset)
+
+        serializer = self.get_serializer(rows, many=True)
+        serializer.context["rankings"] = build_rankings([t.pk for t in rows])
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
+    def get_object(self):
+        # Memoizado por request: o cache por revisão e a action usam o mesmo objeto.
+        if not hasattr(self, "_training"):
+            self._training = super().get_object()
+        return self._training
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
@@ -68,246 +171,173 @@ class TrainingSessionViewSet(ModelViewSet):
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
     def attendance_bulk(self, request, pk=None):
         training = self.get_object()
-        results = []
-
-        for item in request.data:
-            obj, _created = Attendance.objects.update_or_create(
-                training=training,
-                athlete_id=item["athlete"],
-                defaults={
-                    "status": item.get("status", "PRESENT"),
-                    "checkin_time": item.get("checkin_time"),
-                },
-            )
-            results.append(obj)
+        if not isinstance(request.data, list):
+            return Response({"detail": "Envie uma lista de presenças."}, status=400)
+
+        results, errors = upsert_attendances(training, request.data)
 
-        return Response(AttendanceSerializer(results, many=True).data)
+        return Response(
+            {"items": AttendanceSerializer(results, many=True).data, "errors": errors},
+            status=400 if errors and not results else 200,
+        )
+
+    def _drills_response(self, drills):
+        prefetch_related_objects(drills, "drill", "scores")
+        return Response(TrainingDrillSerializer(drills, many=True).data)
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
     def drills_bulk(self, request, pk=None):
         training = self.get_object()
-        created = []
-        for item in request.data:
-            created.append(TrainingDrill.objects.create(
-                training=training,
-                drill_id=item.get("drill"),
-                name_override=item.get("name_override"),
-                order=item.get("order", 1),
-                description=item.get("description"),
-                max_score=item.get("max_score", 10),
-                weight=item.get("weight", 1.0),
-            ))
-        return Response(TrainingDrillSerializer(created, many=True).data)
+        if not isinstance(request.data, list):
+            return Response({"detail": "Envie uma lista de drills."}, status=400)
+        drills, errors = create_drills(training, request.data)
+        if errors:
+            return Response({"errors": errors}, status=400)
+        return self._drills_response(drills)
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
-    def scores_bulk(self, request, pk=None):
-        saved = []
-        for item in request.data:
-            obj, _created = DrillScore.objects.update_or_create(
-                training_drill_id=item["training_drill"],
-                athlete_id=item["athlete"],
-                defaults={
-                    "score": item["score"],
-                    "comment": item.get("comment"),
-                    "rated_by": request.user,
-                },
-            )
-            saved.append(obj)
-        return Response(DrillScoreSerializer(saved, many=True).data)
-
-    # ==========================================================
-    # Helpers (ranking/dashboard)
-    # ==========================================================
-    def _get_rankable_attendances(self, training, position_code=None):
-        qs = Attendance.objects.filter(
-            training=training,
-            status__in=["PRESENT", "LATE"],
-        ).select_related("athlete")
-        if position_code:
-            qs = qs.filter(athlete__current_position=position_code)
-        return qs
-
-    def _compute_ranking_items(self, training, position_code=None):
+    def apply_template(self, request, pk=None):
         """
-        Retorna items de ranking com tie-break:
-            1) weighted_average desc
-            2) scored_drills_count desc
-            3) weighted_points (numerator) desc
-            4) athlete_name asc
+        Copia o plano de drills de um template ({"template": id}) ou de outro treino
+        ({"from_training": id}) para este treino. {"replace": true} remove os drills atuais.
         """
-        attendances = self._get_rankable_attendances(training, position_code=position_code)
-        athlete_ids = list(attendances.values_list("athlete_id", flat=True))
+        training = self.get_object()
+        ser = ApplyTemplateSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
 
-        if not athlete_ids:
-            return []
+        template = ser.validated_data.get("template")
+        if template is not None:
+            source = template.drills.all()
+        else:
+            source = TrainingDrill.objects.filter(training=ser.validated_data["from_training"])
 
-        status_map = {a.athlete_id: a.status for a in attendances}
+        created = copy_drill_plan(training, source, replace=ser.validated_data["replace"])
+        return self._drills_response(created)
 
-        numerator_expr = ExpressionWrapper(
-            F("score") * F("training_drill__weight"),
-            output_field=FloatField(),
-        )
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
+    def save_as_template(self, request, pk=None):
+        training = self.get_object()
+        name = (request.data.get("name") or "").strip()
+        if not name:
+            return Response({"name": ["Este campo é obrigatório."]}, status=400)
 
-        agg = (
-            DrillScore.objects
-            .filter(training_drill__training=training, athlete_id__in=athlete_ids)
-            .values(
-                "athlete_id",
-                "athlete__name",
-                "athlete__jersey_number",
-                "athlete__current_position",
-            )
-            .annotate(
-                weighted_points=Coalesce(Sum(numerator_expr), 0.0),
-                weight_sum=Coalesce(Sum(F("training_drill__weight"), output_field=FloatField()), 0.0),
-                scored_drills_count=Count("training_drill_id"),
-            )
+        template = save_drill_plan_as_template(
+            training, name, created_by=request.user, notes=request.data.get("notes")
         )
+        template = TrainingTemplate.objects.prefetch_related("drills__drill").get(pk=template.pk)
+        return Response(TrainingTemplateSerializer(template).data, status=201)
 
-        items = []
-        for row in agg:
-            denom = float(row["weight_sum"] or 0.0)
-            wavg = round(float(row["weighted_points"]) / denom, 2) if denom > 0 else None
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
+    def scores_bulk(self, request, pk=None):
+        """
+        Upsert em lote de notas do treino. Resposta padrão é um ack colunar compacto
+        (ids + updated_at); ?full=1 devolve os objetos completos.
+        """
+        training = self.get_object()
+        if not isinstance(request.data, list):
+            return Response({"detail": "Envie uma lista de notas."}, status=400)
 
-            items.append({
-                "athlete_id": row["athlete_id"],
-                "athlete_name": row["athlete__name"],
-                "jersey_number": row["athlete__jersey_number"],
-                "position": row["athlete__current_position"],
-                "attendance_status": status_map.get(row["athlete_id"]),
-                "weighted_average": wavg,
-                "scored_drills_count": int(row["scored_drills_count"] or 0),
-                "weighted_points": round(float(row["weighted_points"] or 0.0), 3),
-            })
+        rows, errors = upsert_scores(training, request.data, rated_by=request.user)
+        status_code = 400 if errors and not rows else 200
 
-        items.sort(
-            key=lambda x: (
-                x["weighted_average"] is None,
-                -(x["weighted_average"] or -9999),
-                -x["scored_drills_count"],
-                -x["weighted_points"],
-                x["athlete_name"].lower() if x["athlete_name"] else "",
+        if request.query_params.get("full") in ("1", "true"):
+            saved = (
+                DrillScore.objects
+                .filter(id__in=[r["id"] for r in rows])
+                .select_related("athlete")
+                .order_by("id")
+            )
+            return Response(
+                {"items": DrillScoreSerializer(saved, many=True).data, "errors": errors},
+                status=status_code,
             )
-        )
-
-        for i, it in enumerate(items, start=1):
-            it["rank"] = i
-
-        return items
-
-    def _get_drills_and_scores(self, training):
-        drills = list(TrainingDrill.objects.filter(training=training).order_by("order", "id"))
-        drill_ids = [d.id for d in drills]
-        scores = list(
-            DrillScore.objects
-            .filter(training_drill_id__in=drill_ids)
-            .select_related("athlete", "training_drill", "training_drill__drill")
-        )
-        return drills, scores
-
-    def _mean(self, values):
-        if not values:
-            return None
-        return float(sum(values) / len(values))
-
-    def _variance(self, values):
-        if not values:
-            return None
-        mu = self._mean(values)
-        if mu is None:
-            return None
-        return float(sum((x - mu) ** 2 for x in values) / len(values))
-
-    def _stddev(self, values):
-        var = self._variance(values)
-        return float(sqrt(var)) if var is not None else None
-
-    def _median_sorted(self, values_sorted):
-        n = len(values_sorted)
-        if n == 0:
-            return None
-        mid = n // 2
-        if n % 2 == 1:
-            return float(values_sorted[mid])
-        return float(values_sorted[mid - 1] + values_sorted[mid]) / 2.0
 
-    def _boxplot_stats(self, values):
-        """Return Tukey boxplot stats for numeric values.
+        return Response({
+            "count": len(rows),
+            "ids": [r["id"] for r in rows],
+            "training_drill": [r["training_drill_id"] for r in rows],
+            "athlete": [r["athlete_id"] for r in rows],
+            "updated_at": [r["updated_at"] for r in rows],
+            "errors": errors,
+        }, status=status_code)
 
-        Uses median-of-halves quartiles and 1.5*IQR fences for whiskers/outliers.
+    # ----------------------------
+    # Sincronização offline
+    # ----------------------------
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
+    def sync(self, request):
         """
-        vals = [float(v) for v in values if v is not None]
-        vals.sort()
-        n = len(vals)
-        if n == 0:
-            return None
+        Feed de mudanças desde ?since=<cursor> (opcional ?training=<id>): linhas de
+        treinos, drills, presenças e notas alteradas, ids removidos e o cursor novo.
+        Sem since, devolve o snapshot completo.
+        """
+        try:
+            cursor = parse_cursor(request.query_params.get("since"))
+        except ValueError:
+            return Response({"since": ["Cursor inválido."]}, status=400)
+        training_id = request.query_params.get("training")
+        if training_id is not None and not training_id.isdigit():
+            return Response({"training": ["Informe o id do treino."]}, status=400)
+        return Response(changes_since(cursor, int(training_id) if training_id else None))
+
+    @sync.mapping.post
+    def sync_push(self, request):
+        """
+        Aplica escritas enfileiradas offline: {"ops": [{"key", "type": "attendance" |
+        "scores" | "drills", "training", "items"}]}. Chaves já aplicadas devolvem o
+        resultado original (duplicate=true) sem escrever de novo.
+        """
+        ops = request.data.get("ops") if isinstance(request.data, dict) else None
+        if not isinstance(ops, list):
+            return Response({"ops": ["Envie uma lista de operações."]}, status=400)
+        if len(ops) > MAX_PUSH_OPS:
+            return Response({"ops": [f"Máximo de {MAX_PUSH_OPS} operações por envio."]}, status=400)
+        results = apply_push(request.user, ops)
+        return Response({"results": results})
 
-        median = self._median_sorted(vals)
-        mid = n // 2
-        if n % 2 == 0:
-            lower = vals[:mid]
-            upper = vals[mid:]
-        else:
-            lower = vals[:mid]
-            upper = vals[mid + 1 :]
-
-        q1 = self._median_sorted(lower) if lower else float(vals[0])
-        q3 = self._median_sorted(upper) if upper else float(vals[-1])
-        iqr = float(q3 - q1)
-
-        low_fence = float(q1 - 1.5 * iqr)
-        high_fence = float(q3 + 1.5 * iqr)
-
-        inliers_low = [v for v in vals if v >= low_fence]
-        inliers_high = [v for v in vals if v <= high_fence]
-        whisker_min = float(min(inliers_low)) if inliers_low else float(vals[0])
-        whisker_max = float(max(inliers_high)) if inliers_high else float(vals[-1])
-
-        outliers = [float(v) for v in vals if v < whisker_min or v > whisker_max]
-
-        return {
-            "min": whisker_min,
-            "q1": float(q1),
-            "median": float(median),
-            "q3": float(q3),
-            "max": whisker_max,
-            "outliers": outliers,
-            "n": int(n),
-        }
+    # ----------------------------
+    # Dashboard ao vivo
+    # ----------------------------
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="events/token",
+        permission_classes=[IsAuthenticated, IsAdminOrCoach],
+    )
+    def events_token(self, request, pk=None):
+        """
+        Token de stream para ?token= de GET .../events/ (EventSource não envia headers):
+        só abre o stream deste treino e expira em expires_in segundos.
+        """
+        training = self.get_object()
+        return Response({
+            "token": issue_stream_token(request.user, training.id),
+            "expires_in": stream_token_seconds(),
+        })
 
-    def _weighted_averages(self, training, position_code=None):
-        items = self._compute_ranking_items(training, position_code=position_code)
-        return [x for x in items if x.get("weighted_average") is not None]
+    # ==========================================================
+    # Helpers (ranking/dashboard)
+    # ==========================================================
+    def _get_drills_and_scores(self, training):
+        return load_drills_and_scores(training)
 
     def _score_distribution(self, training):
-        scores = list(
+        values = list(
             DrillScore.objects
             .filter(training_drill__training=training)
             .values_list("score", flat=True)
         )
-
-        values = [float(s) for s in scores if s is not None]
-        total = len(values)
+        counts = stats.histogram(values, SCORE_BIN_EDGES)
+        total = sum(counts)
         bins = [
-            {"key": "0-4", "label": "0–4", "count": 0},
-            {"key": "5-6", "label": "5–6", "count": 0},
-            {"key": "7-8", "label": "7–8", "count": 0},
-            {"key": "9-10", "label": "9–10", "count": 0},
+            {
+                "key": key,
+                "label": label,
+                "count": count,
+                "percent": round((count / total) * 100.0, 2) if total else 0.0,
+            }
+            for (key, label), count in zip(SCORE_BINS, counts)
         ]
-
-        for v in values:
-            if v < 5:
-                bins[0]["count"] += 1
-            elif v < 7:
-                bins[1]["count"] += 1
-            elif v < 9:
-                bins[2]["count"] += 1
-            else:
-                bins[3]["count"] += 1
-
-        for b in bins:
-            b["percent"] = round((b["count"] / total) * 100.0, 2) if total else 0.0
-
         return {"total_scores": total, "bins": bins}
 
     def _drill_averages(self, training):
@@ -342,51 +372,40 @@ class TrainingSessionViewSet(ModelViewSet):
 
         return items, hardest
 
-    def _most_consistent_athlete(self, training):
-        qs = (
-            DrillScore.objects
-            .filter(training_drill__training=training)
-            .select_related("athlete")
-            .values("athlete_id", "athlete__name")
-        )
-
-        bucket = defaultdict(list)
-        athlete_name = {}
-        for row in qs:
-            athlete_name[row["athlete_id"]] = row["athlete__name"]
-
-        for s in DrillScore.objects.filter(training_drill__training=training).values("athlete_id", "score"):
-            if s["score"] is None:
-                continue
-            bucket[s["athlete_id"]].append(float(s["score"]))
-
-        best = None
-        for athlete_id, values in bucket.items():
-            if len(values) < 2:
-                continue
-            var = self._variance(values)
-            if var is None:
-                continue
-            item = {
-                "athlete_id": athlete_id,
-                "athlete_name": athlete_name.get(athlete_id),
-                "variance": round(float(var), 4),
-                "stddev": round(float(sqrt(var)), 4),
-                "scored_drills": len(values),
-            }
-            if best is None or item["variance"] < best["variance"]:
-                best = item
-
-        return best
+    def _period_params(self, request):
+        """
+        ?grain=week|month[&from=AAAA-MM-DD][&to=AAAA-MM-DD] -> (grain, from, to) ou None
+        sem grain. Com grain as tendências leem os rollups (recalculados pelo worker).
+        """
+        raw = (request.query_params.get("grain") or "").strip().upper()
+        if not raw:
+            return None
+        grain = {"WEEK": RollupGrain.WEEK, "MONTH": RollupGrain.MONTH}.get(raw)
+        if grain is None:
+            raise ValidationError({"grain": ["Use week ou month."]})
+
+        bounds = []
+        for param in ("from", "to"):
+            value = request.query_params.get(param)
+            try:
+                day = parse_date(value) if value else None
+            except ValueError:
+                day = None
+            if value and day is None:
+                raise ValidationError({param: ["Data inválida (use AAAA-MM-DD)."]})
+            bounds.append(day)
+
+        return (grain, *bounds)
 
     # ==========================================================
     # Endpoints
     # ==========================================================
     @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
+    @cached_training_response("ranking")
     def ranking(self, request, pk=None):
         training = self.get_object()
         position = request.query_params.get("position")  # ex: WR, DB, QB...
-        items = self._compute_ranking_items(training, position_code=position)
+        items = build_ranking(training).for_position(position)
 
         return Response({
             "training": {
@@ -400,6 +419,7 @@ class TrainingSessionViewSet(ModelViewSet):
         })
 
     @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
+    @cached_training_response("coach_dashboard")
     def coach_dashboard(self, request, pk=None):
         training = self.get_object()
 
@@ -458,19 +478,10 @@ class TrainingSessionViewSet(ModelViewSet):
                 "rated_by": s.rated_by_id,
             }
 
-        ranking_items = self._compute_ranking_items(training)
-        valid_avgs = [x["weighted_average"] for x in ranking_items if x["weighted_average"] is not None]
-        training_weighted_avg = round(sum(valid_avgs) / len(valid_avgs), 2) if valid_avgs else None
-
-        rankable_positions = list(
-            Attendance.objects
-            .filter(training=training, status__in=["PRESENT", "LATE"])
-            .exclude(athlete__current_position__isnull=True)
-            .exclude(athlete__current_position__exact="")
-            .values_list("athlete__current_position", flat=True)
-            .distinct()
-        )
-        ranking_by_position = {pos: self._compute_ranking_items(training, position_code=pos) for pos in rankable_positions}
+        ranking = build_ranking(training)
+        ranking_items = ranking.items
+        training_weighted_avg = ranking.weighted_average
+        ranking_by_position = ranking.by_position
 
         return Response({
             "training": {
@@ -494,24 +505,32 @@ class TrainingSessionViewSet(ModelViewSet):
 
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
     def coach_overview(self, request):
-        """Resumo para gráficos do Coach Dashboard (tendência + último treino)."""
+        """
+        Resumo para gráficos do Coach Dashboard (tendência + último treino).
+        Com ?grain=week|month&from=&to= a tendência vem dos rollups por período.
+        """
         try:
             limit = int(request.query_params.get("limit", "8"))
         except ValueError:
             limit = 8
         limit = max(1, min(limit, 30))
+        period = self._period_params(request)
 
         latest_qs = TrainingSession.objects.all().order_by("-date", "-id")
-        latest = latest_qs.first()
-
-        trend_trainings = list(latest_qs[:limit])
+        trend_trainings = list(latest_qs[:1] if period else latest_qs[:limit])
+        latest = trend_trainings[0] if trend_trainings else None
         trend_trainings.reverse()  # chronological
 
+        rankings = build_rankings([t.id for t in trend_trainings])
+
         trend_items = []
-        for t in trend_trainings:
-            ranking_items = self._compute_ranking_items(t)
-            valid_avgs = [x["weighted_average"] for x in ranking_items if x["weighted_average"] is not None]
-            training_weighted_avg = round(sum(valid_avgs) / len(valid_avgs), 2) if valid_avgs else 0
+        if period:
+            trend_items = [
+                {"label": row["label"], "value": float(row["value"] or 0)}
+                for row in team_series(*period)
+            ]
+        for t in ([] if period else trend_trainings):
+            training_weighted_avg = rankings[t.id].weighted_average or 0
             trend_items.append({
                 "label": str(t.date),
                 "value": float(training_weighted_avg),
@@ -540,9 +559,7 @@ class TrainingSessionViewSet(ModelViewSet):
                     "value": float(drill_avg_map.get(d.id, 0)),
                 })
 
-            ranking_items = self._compute_ranking_items(latest)
-            valid_avgs = [x["weighted_average"] for x in ranking_items if x["weighted_average"] is not None]
-            latest_training_weighted_avg = round(sum(valid_avgs) / len(valid_avgs), 2) if valid_avgs else None
+            latest_training_weighted_avg = rankings[latest.id].weighted_average
 
             latest_training_payload = {
                 "id": latest.id,
@@ -558,23 +575,32 @@ class TrainingSessionViewSet(ModelViewSet):
         })
 
     @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
+    @cached_training_response("analytics")
     def analytics(self, request, pk=None):
         """Métricas analíticas avançadas por treino (visão coach)."""
         training = self.get_object()
 
         # Weighted averages (ranking)
-        ranked = self._weighted_averages(training)
+        ranked = build_ranking(training).scored
         wavg_values = [float(x["weighted_average"]) for x in ranked]
-        wavg_mean = self._mean(wavg_values)
-        wavg_std = self._stddev(wavg_values)
+        wavg_mean = stats.mean(wavg_values)
+        wavg_std = stats.stddev(wavg_values)
 
         # Top3 vs Bottom3 gap
         top = wavg_values[:3]
         bottom = wavg_values[-3:] if len(wavg_values) >= 3 else wavg_values
-        top_mean = self._mean(top)
-        bottom_mean = self._mean(bottom)
+        top_mean = stats.mean(top)
+        bottom_mean = stats.mean(bottom)
         top_bottom_gap = (top_mean - bottom_mean) if (top_mean is not None and bottom_mean is not None) else None
 
+        # Dispersão das notas por atleta (uma query): atleta mais consistente e spread por posição
+        spreads = athlete_spreads([training.id])
+        ranked_ids = {it["athlete_id"] for it in ranked}
+        spread_by_pos = defaultdict(list)
+        for row in spreads:
+            if row["athlete_id"] in ranked_ids:
+                spread_by_pos[row["position"] or ""].append(row)
+
         # Position stats
         by_pos = defaultdict(list)
         for it in ranked:
@@ -584,13 +610,15 @@ class TrainingSessionViewSet(ModelViewSet):
         for pos, vals in by_pos.items():
             if not vals:
                 continue
-            avg = self._mean(vals)
+            avg = stats.mean(vals)
             gap_internal = (max(vals) - min(vals)) if len(vals) >= 2 else 0.0
+            pooled = pooled_spread(spread_by_pos.get(pos, []))
             pos_items.append({
                 "position": pos or None,
                 "athletes_count": len(vals),
                 "avg_weighted": round(avg, 2) if avg is not None else None,
                 "internal_gap": round(float(gap_internal), 2),
+                "score_stddev": round(pooled["stddev"], 4) if pooled else None,
             })
         pos_items.sort(key=lambda x: (x["position"] is None, x["position"] or ""))
 
@@ -601,7 +629,7 @@ class TrainingSessionViewSet(ModelViewSet):
         distribution = self._score_distribution(training)
 
         # Most consistent athlete (lowest variance across drills)
-        most_consistent = self._most_consistent_athlete(training)
+        most_consistent = most_consistent_athlete(spreads)
 
         return Response({
             "training": {"id": training.id, "date": training.date},
@@ -624,7 +652,10 @@ class TrainingSessionViewSet(ModelViewSet):
 
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
     def evolution(self, request):
-        """Métricas evolutivas (time e atletas) para o Coach Dashboard."""
+        """
+        Métricas evolutivas (time e atletas) para o Coach Dashboard. Com
+        ?grain=week|month&from=&to= devolve as séries por período (rollups).
+        """
         try:
             limit = int(request.query_params.get("limit", "8"))
         except ValueError:
@@ -634,16 +665,46 @@ class TrainingSessionViewSet(ModelViewSet):
         athlete_id = request.query_params.get("athlete_id")
         athlete_id = int(athlete_id) if athlete_id and athlete_id.isdigit() else None
 
+        period = self._period_params(request)
+        if period:
+            grain, date_from, date_to = period
+            team = team_series(*period)
+            individual = None
+            if athlete_id:
+                individual = {
+                    "athlete_id": athlete_id,
+                    "trend": athlete_series(*period, athlete_ids=[athlete_id]).get(athlete_id, []),
+                }
+            return Response({
+                "grain": grain.lower(),
+                "from": date_from,
+                "to": date_to,
+                "periods": [
+                    {"period_start": r["period_start"], "label": r["label"], "trainings_count": r["trainings_count"]}
+                    for r in team
+                ],
+                "team_trend": [
+                    {"period_start": r["period_start"], "label": r["label"], "value": r["value"]}
+                    for r in team
+                ],
+                "drill_trends": drill_series(*period),
+                "individual": individual,
+            })
+
         latest_qs = TrainingSession.objects.all().order_by("-date", "-id")
         trainings = list(latest_qs[:limit])
         trainings.reverse()  # chronological
 
+        rankings = build_rankings([t.id for t in trainings])
+
         team_trend = []
         per_training_athlete_avg = []  # list of dict athlete_id -> wavg
+        per_training_ranked = []
         for t in trainings:
-            ranked = self._weighted_averages(t)
+            ranked = rankings[t.id].scored
+            per_training_ranked.append(ranked)
             values = [float(x["weighted_average"]) for x in ranked]
-            team_avg = self._mean(values)
+            team_avg = stats.mean(values)
             team_trend.append({
                 "training_id": t.id,
                 "label": str(t.date),
@@ -662,8 +723,8 @@ class TrainingSessionViewSet(ModelViewSet):
             to_map = per_training_athlete_avg[-1]
             common_ids = set(from_map.keys()) & set(to_map.keys())
 
-            name_map = {x["athlete_id"]: x.get("athlete_name") for x in self._weighted_averages(to_t)}
-            name_map.update({x["athlete_id"]: x.get("athlete_name") for x in self._weighted_averages(from_t)})
+            name_map = {x["athlete_id"]: x.get("athlete_name") for x in per_training_ranked[-1]}
+            name_map.update({x["athlete_id"]: x.get("athlete_name") for x in per_training_ranked[-2]})
 
             for aid in common_ids:
                 delta = float(to_map[aid] - from_map[aid])
@@ -707,13 +768,25 @@ class TrainingSessionViewSet(ModelViewSet):
 
     @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach], url_path="attendance_trends")
     def attendance_trends(self, request):
-        """Assiduidade por treino (contagem por status) para o Coach Dashboard."""
+        """
+        Assiduidade por treino (contagem por status) para o Coach Dashboard. Com
+        ?grain=week|month&from=&to= as contagens vêm somadas por período (rollups).
+        """
         try:
             limit = int(request.query_params.get("limit", "8"))
         except ValueError:
             limit = 8
         limit = max(2, min(limit, 30))
 
+        period = self._period_params(request)
+        if period:
+            grain, date_from, date_to = period
+            items = [
+                {key: row[key] for key in ("period_start", "label", "trainings_count", "present", "late", "justified", "absent")}
+                for row in team_series(*period)
+            ]
+            return Response({"grain": grain.lower(), "from": date_from, "to": date_to, "items": items})
+
         latest_qs = TrainingSession.objects.all().order_by("-date", "-id")
         trainings = list(latest_qs[:limit])
         trainings.reverse()  # chronological
@@ -769,76 +842,98 @@ class TrainingSessionViewSet(ModelViewSet):
         if not selected:
             selected = trainings[-1] if trainings else latest_qs.first()
 
+        rankings = build_rankings([t.id for t in trainings] + ([selected.id] if selected else []))
+
         by_drill = []
         by_position = []
 
         if selected:
             drills = list(TrainingDrill.objects.filter(training=selected).order_by("order", "id"))
-            scores_qs = (
+            scores = list(
                 DrillScore.objects.filter(training_drill__training=selected)
-                .values("training_drill_id")
                 .values_list("training_drill_id", "score")
             )
-            drill_bucket = defaultdict(list)
-            for td_id, score in scores_qs:
-                drill_bucket[int(td_id)].append(float(score))
-
+            drill_stats = stats.grouped_boxplots([td_id for td_id, _ in scores], [score for _, score in scores])
             for d in drills:
-                stats = self._boxplot_stats(drill_bucket.get(d.id, []))
-                if not stats:
+                if d.id not in drill_stats:
                     continue
                 by_drill.append({
                     "training_drill_id": d.id,
                     "label": d.name,
-                    "stats": stats,
+                    "stats": drill_stats[d.id],
                 })
 
-            ranked = self._weighted_averages(selected)
-            pos_bucket = defaultdict(list)
-            for it in ranked:
-                pos = (it.get("position") or "SEM_POS").strip() or "SEM_POS"
-                pos_bucket[pos].append(float(it["weighted_average"]))
-
-            for pos, vals in pos_bucket.items():
-                stats = self._boxplot_stats(vals)
-                if not stats:
-                    continue
+            ranked = rankings[selected.id].scored
+            position_stats = stats.grouped_boxplots(
+                [(it.get("position") or "SEM_POS").strip() or "SEM_POS" for it in ranked],
+                [it["weighted_average"] for it in ranked],
+            )
+            for pos, pos_stats in position_stats.items():
                 by_position.append({
                     "label": None if pos == "SEM_POS" else pos,
-                    "stats": stats,
+                    "stats": pos_stats,
                 })
             by_position.sort(key=lambda x: (x["label"] is None, x["label"] or ""))
 
-        by_training = []
-        athlete_bucket = defaultdict(lambda: {"label": None, "values": []})
-        for t in trainings:
-            ranked = self._weighted_averages(t)
-            values = [float(x["weighted_average"]) for x in ranked]
-
-            stats = self._boxplot_stats(values)
-            if stats:
-                by_training.append({
-                    "training_id": t.id,
-                    "label": str(t.date),
-                    "stats": stats,
-                })
+        period = self._period_params(request)
+        if period:
+            # Por período: distribuição das médias dos atletas em cada período e,
+            # por atleta, das suas médias ao longo dos períodos.
+            series = athlete_series(*period)
+            labels = dict(Athlete.objects.filter(pk__in=list(series)).values_list("id", "name"))
+            period_keys, athlete_keys, values = [], [], []
+            period_labels = {}
+            for aid, trend in series.items():
+                for point in trend:
+                    period_keys.append(point["period_start"])
+                    period_labels[point["period_start"]] = point["label"]
+                    athlete_keys.append(aid)
+                    values.append(point["value"])
+
+            by_period = [
+                {"period_start": start, "label": period_labels[start], "stats": period_stats}
+                for start, period_stats in sorted(stats.grouped_boxplots(period_keys, values).items())
+            ]
+            by_athlete = [
+                {"athlete_id": aid, "label": labels.get(aid) or str(aid), "stats": athlete_stats}
+                for aid, athlete_stats in stats.grouped_boxplots(athlete_keys, values).items()
+            ]
+            by_athlete.sort(key=lambda x: str(x.get("label") or ""))
+            return Response({
+                "selected_training": {"id": selected.id, "date": selected.date} if selected else None,
+                "grain": period[0].lower(),
+                "from": period[1],
+                "to": period[2],
+                "scale": {"min": 0, "max": 10},
+                "by_drill": by_drill,
+                "by_position": by_position,
+                "by_period": by_period,
+                "by_athlete": by_athlete,
+            })
 
-            for it in ranked:
+        # Todos os treinos e atletas numa passada: (chave, média ponderada) por atleta rankeado.
+        training_keys, athlete_keys, wavgs = [], [], []
+        athlete_label = {}
+        for t in trainings:
+            for it in rankings[t.id].scored:
                 aid = int(it["athlete_id"])
-                if not athlete_bucket[aid]["label"]:
-                    athlete_bucket[aid]["label"] = it.get("athlete_name")
-                athlete_bucket[aid]["values"].append(float(it["weighted_average"]))
-
-        by_athlete = []
-        for aid, payload in athlete_bucket.items():
-            stats = self._boxplot_stats(payload.get("values", []))
-            if not stats:
-                continue
-            by_athlete.append({
-                "athlete_id": aid,
-                "label": payload.get("label") or str(aid),
-                "stats": stats,
-            })
+                training_keys.append(t.id)
+                athlete_keys.append(aid)
+                wavgs.append(it["weighted_average"])
+                if not athlete_label.get(aid):
+                    athlete_label[aid] = it.get("athlete_name")
+
+        training_stats = stats.grouped_boxplots(training_keys, wavgs)
+        by_training = [
+            {"training_id": t.id, "label": str(t.date), "stats": training_stats[t.id]}
+            for t in trainings
+            if t.id in training_stats
+        ]
+
+        by_athlete = [
+            {"athlete_id": aid, "label": athlete_label.get(aid) or str(aid), "stats": athlete_stats}
+            for aid, athlete_stats in stats.grouped_boxplots(athlete_keys, wavgs).items()
+        ]
         by_athlete.sort(key=lambda x: str(x.get("label") or ""))
 
         return Response({
@@ -855,611 +950,57 @@ class TrainingSessionViewSet(ModelViewSet):
         })
 
     @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach], url_path="export/pdf")
+    @cached_training_response("export_pdf")
     def export_pdf(self, request, pk=None):
-        return _export_pdf_impl(self, request, pk)
+        from .pdf import render_training_pdf  # ReportLab só é carregado quando alguém exporta
+
+        training = self.get_object()
+        response = HttpResponse(render_training_pdf(training), content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{training_pdf_filename(training)}"'
+        return response
+
+    @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdminOrCoach], url_path="reports/pdf")
+    def request_pdf_report(self, request, pk=None):
+        """
+        Enfileira o PDF do treino para o worker (run_report_worker). 202 com o job
+        para acompanhar em /api/trainings/reports/<id>/; 200 se o arquivo desta
+        revisão já está pronto.
+        """
+        job, _created = enqueue_training_pdf(self.get_object(), requested_by=request.user)
+        data = ReportJobSerializer(job, context={"request": request}).data
+        return Response(data, status=200 if job.status == ReportJob.Status.DONE else 202)
 
     @action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach], url_path="export/csv")
+    @cached_training_response("export_csv")
     def export_csv(self, request, pk=None):
         return _export_csv_impl(self, request, pk)
-    
-def _export_pdf_impl(self, request, pk=None):
-    training = self.get_object()
-
-    # =============================
-    # Coleta dados (reuso helpers)
-    # =============================
-    drills, scores = self._get_drills_and_scores(training)
-    drills_sorted = sorted(drills, key=lambda d: (d.order, d.id))
-
-    attendances = (
-        Attendance.objects
-        .filter(training=training)
-        .select_related("athlete")
-        .order_by("athlete__name")
-    )
-
-    # Ranking geral + por posição (já com tie-break + ponderada)
-    ranking_items = self._compute_ranking_items(training)
-
-    # ranking_by_position (apenas posições presentes/atraso)
-    rankable_positions = list(
-        Attendance.objects
-        .filter(training=training, status__in=["PRESENT", "LATE"])
-        .exclude(athlete__current_position__isnull=True)
-        .exclude(athlete__current_position__exact="")
-        .values_list("athlete__current_position", flat=True)
-        .distinct()
-    )
-    ranking_by_position = {pos: self._compute_ranking_items(training, position_code=pos) for pos in rankable_positions}
-
-    # score_map: (athlete_id, drill_id) -> (score, comment)
-    score_map = {}
-    for s in scores:
-        score_map[(s.athlete_id, s.training_drill_id)] = (float(s.score), s.comment or "")
-
-    ranking_map = {r["athlete_id"]: r for r in ranking_items}
-
-    # Resumo
-    total_athletes = attendances.count()
-    present_count = attendances.filter(status__in=["PRESENT", "LATE"]).count()
-    absent_count = attendances.filter(status="ABSENT").count()
-    justified_count = attendances.filter(status="JUSTIFIED").count()
-    drills_total = len(drills_sorted)
-
-    valid_avgs = [x["weighted_average"] for x in ranking_items if x["weighted_average"] is not None]
-    training_weighted_avg = round(sum(valid_avgs) / len(valid_avgs), 2) if valid_avgs else None
-
-    # =============================
-    # PDF setup
-    # =============================
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=landscape(A4),
-        leftMargin=1.2 * cm,
-        rightMargin=1.2 * cm,
-        topMargin=1.0 * cm,
-        bottomMargin=1.0 * cm,
-        title=f"Relatório de Treino {training.date}",
-    )
 
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name="TitleX", fontSize=20, leading=22, spaceAfter=10))
-    styles.add(ParagraphStyle(name="H1X", fontSize=14, leading=16, spaceBefore=10, spaceAfter=6))
-    styles.add(ParagraphStyle(name="H2X", fontSize=11, leading=13, spaceBefore=8, spaceAfter=5))
-    styles.add(ParagraphStyle(name="SmallX", fontSize=9, leading=11))
-    styles.add(ParagraphStyle(name="TinyX", fontSize=8, leading=10))
-    styles.add(ParagraphStyle(name="HdrTinyX", fontName="Helvetica-Bold", fontSize=7, leading=8, alignment=1, wordWrap="CJK"))
-    styles.add(ParagraphStyle(name="CellTinyX", fontSize=7, leading=8, wordWrap="CJK"))
-
-    brand_name = getattr(settings, "BRAND_NAME", "Mamutes F.A.")
-    logo_path = getattr(settings, "BRAND_LOGO_PATH", None)
-
-    def tstyle(header_bg="#F0F0F0"):
-        return TableStyle([
-            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-            ("FONTSIZE", (0, 0), (-1, -1), 9),
-            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(header_bg)),
-            ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#C9C9C9")),
-            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-            ("VALIGN", (0, 0), (-1, 0), "TOP"),
-            ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#FAFAFA")]),
-            ("LEFTPADDING", (0, 0), (-1, -1), 4),
-            ("RIGHTPADDING", (0, 0), (-1, -1), 4),
-            ("TOPPADDING", (0, 0), (-1, -1), 3),
-            ("BOTTOMPADDING", (0, 0), (-1, -1), 3),
-        ])
-
-    def page_footer(canvas, doc_):
-        canvas.saveState()
-        canvas.setFont("Helvetica", 9)
-        canvas.drawRightString(landscape(A4)[0] - doc_.rightMargin, 0.75*cm, f"Página {doc_.page}")
-        canvas.restoreState()
-
-    def safe_logo():
-        if not logo_path:
-            return None
-        try:
-            img = Image(str(logo_path))
-            img.drawHeight = 2.2 * cm
-            img.drawWidth = 2.2 * cm
-            return img
-        except Exception:
-            return None
-
-    # =============================
-    # Charts (Top N bar chart)
-    # =============================
-    def build_top_bar_chart(items, top_n=10):
+    @action(detail=False, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach], url_path="export/season_csv")
+    def export_season_csv(self, request):
         """
-        Bar chart Top N (weighted_average). Itens já ordenados.
+        CSV da temporada (?from=AAAA-MM-DD&to=AAAA-MM-DD): uma linha por atleta × treino,
+        colunas de drill unidas por drill do catálogo. Enviado em streaming.
         """
-        top = [x for x in items if x["weighted_average"] is not None][:top_n]
-        if not top:
-            return None
-
-        labels = [x["athlete_name"][:12] for x in top]  # curta pra caber
-        values = [x["weighted_average"] for x in top]
-
-        d = Drawing(26*cm, 7.2*cm)
-
-        title = String(0, 6.8*cm, f"Top {len(top)} - Média Ponderada (0–10)", fontName="Helvetica-Bold", fontSize=10)
-        d.add(title)
-
-        chart = VerticalBarChart()
-        chart.x = 0.5*cm
-        chart.y = 0.8*cm
-        chart.height = 5.6*cm
-        chart.width = 25*cm
-        chart.data = [values]
-        chart.valueAxis.valueMin = 0
-        chart.valueAxis.valueMax = 10
-        chart.valueAxis.valueStep = 1
-
-        chart.categoryAxis.categoryNames = labels
-        chart.categoryAxis.labels.fontName = "Helvetica"
-        chart.categoryAxis.labels.fontSize = 7
-        chart.categoryAxis.labels.angle = 30
-        chart.categoryAxis.labels.dy = -10
-
-        # estilo neutro
-        chart.bars[0].fillColor = colors.HexColor("#4F81BD")
-        chart.valueAxis.labels.fontSize = 8
-        chart.valueAxis.labels.fontName = "Helvetica"
-
-        d.add(chart)
-        return d
-
-    # =============================
-    # Drill columns chunking (smart split)
-    # =============================
-    # Larguras por drill
-    NOTE_COL_W = 1.2 * cm
-    COMMENT_COL_W = 2.8 * cm
-    # Larguras base (fixas) para a tabela de notas
-    NOTES_BASE_WIDTHS = [7.0 * cm, 1.6 * cm, 1.8 * cm, 2.4 * cm, 2.0 * cm, 1.2 * cm]  # atleta, camisa, pos, status, média, rank
-
-    def calc_max_drills_per_page():
-        page_width = landscape(A4)[0] - (doc.leftMargin + doc.rightMargin)
-
-        # Cada drill vira 2 colunas (nota + coment) → coment é maior
-        # Mas no nosso layout por página, vamos mostrar:
-        #   - colunas fixas
-        #   - N drills (nota)
-        #   - N drills (coment)
-        # Para caber, limitamos N por página
-        remaining_width = max(page_width - sum(NOTES_BASE_WIDTHS), 10 * cm)
-
-        # “custo” por drill = (nota_col + comment_col)
-        # nota pequena, comment média
-        per_drill = (NOTE_COL_W + COMMENT_COL_W)
-        max_n = int(remaining_width // per_drill)
-        return max(1, min(max_n, 10))  # no máximo 10 drills por página pra manter legível
-
-    max_drills_page = calc_max_drills_per_page()
-
-    def chunk_list(lst, size):
-        for i in range(0, len(lst), size):
-            yield lst[i:i+size]
-
-    # =============================
-    # Build PDF story
-    # =============================
-    story = []
-
-    # -------- Capa --------
-    logo = safe_logo()
-    cover_bits = []
-    if logo:
-        cover_bits.append(logo)
-        cover_bits.append(Spacer(1, 8))
-
-    cover_bits.append(Paragraph(f"{brand_name}", styles["TitleX"]))
-    cover_bits.append(Paragraph("Relatório Premium de Treino", styles["H1X"]))
-    cover_bits.append(Spacer(1, 6))
-    cover_bits.append(Paragraph(
-        f"<b>Data:</b> {training.date} &nbsp;&nbsp; "
-        f"<b>Horário:</b> {training.start_time or '-'} &nbsp;&nbsp; "
-        f"<b>Local:</b> {training.location or '-'}",
-        styles["Normal"]
-    ))
-    if training.notes:
-        cover_bits.append(Spacer(1, 6))
-        cover_bits.append(Paragraph(f"<b>Observações:</b> {training.notes}", styles["SmallX"]))
-
-    cover_bits.append(Spacer(1, 14))
-    cover_bits.append(Paragraph(
-        f"<b>Resumo rápido:</b> "
-        f"Atletas={total_athletes} | Presentes/Atraso={present_count} | "
-        f"Ausentes={absent_count} | Justificados={justified_count} | "
-        f"Drills={drills_total} | "
-        f"Média ponderada do treino={training_weighted_avg if training_weighted_avg is not None else '-'}",
-        styles["Normal"]
-    ))
-
-    story.append(KeepTogether(cover_bits))
-    story.append(PageBreak())
-
-    # -------- Sumário executivo + Top 3 --------
-    story.append(Paragraph("Sumário Executivo", styles["H1X"]))
-
-    sum_table = Table([[
-        "Atletas", "Presentes/Atraso", "Ausentes", "Justificados", "Drills", "Média Ponderada"
-    ], [
-        str(total_athletes),
-        str(present_count),
-        str(absent_count),
-        str(justified_count),
-        str(drills_total),
-        str(training_weighted_avg) if training_weighted_avg is not None else "-"
-    ]], repeatRows=1)
-    sum_table.setStyle(tstyle(header_bg="#E8F0FE"))
-    story.append(sum_table)
-    story.append(Spacer(1, 10))
-
-    # Top 3 geral
-    story.append(Paragraph("Top 3 Geral (média ponderada + desempate)", styles["H2X"]))
-    top3 = ranking_items[:3]
-    top3_data = [["Rank", "Atleta", "Camisa", "Posição", "Média", "Drills", "Pontos"]]
-    for r in top3:
-        top3_data.append([
-            r.get("rank", ""), r.get("athlete_name", ""),
-            r.get("jersey_number", "") or "",
-            r.get("position", "") or "",
-            r.get("weighted_average", "") if r.get("weighted_average") is not None else "",
-            r.get("scored_drills_count", ""),
-            r.get("weighted_points", ""),
-        ])
-    ttop = Table(top3_data, repeatRows=1)
-    ttop.setStyle(tstyle(header_bg="#E6FFE6"))
-    story.append(ttop)
-    story.append(Spacer(1, 10))
-
-    # Top 3 por posição
-    story.append(Paragraph("Top 3 por Posição", styles["H2X"]))
-    pos_rows = [["Posição", "1º", "2º", "3º"]]
-    for pos, items in sorted(ranking_by_position.items(), key=lambda x: x[0]):
-        names = [f'{x["athlete_name"]} ({x["weighted_average"]})' if x["weighted_average"] is not None else x["athlete_name"] for x in items[:3]]
-        while len(names) < 3:
-            names.append("-")
-        pos_rows.append([pos, names[0], names[1], names[2]])
-
-    tpos = Table(pos_rows, repeatRows=1)
-    tpos.setStyle(tstyle(header_bg="#FFF2CC"))
-    story.append(tpos)
-    story.append(Spacer(1, 12))
-
-    # Gráfico Top N
-    chart = build_top_bar_chart(ranking_items, top_n=10)
-    if chart:
-        story.append(Paragraph("Gráfico", styles["H2X"]))
-        story.append(chart)
-        story.append(Spacer(1, 8))
-
-    story.append(PageBreak())
-
-    # -------- Presença --------
-    story.append(Paragraph("Presença", styles["H1X"]))
-    attendance_data = [["Atleta", "Camisa", "Posição", "Status", "Check-in"]]
-    for a in attendances:
-        attendance_data.append([
-            a.athlete.name,
-            a.athlete.jersey_number or "",
-            a.athlete.current_position or "",
-            a.get_status_display(),
-            a.checkin_time or "",
-        ])
-    t_att = Table(attendance_data, repeatRows=1)
-    t_att.setStyle(tstyle())
-    story.append(t_att)
-    story.append(PageBreak())
-
-    # -------- Ranking completo --------
-    story.append(Paragraph("Ranking Completo (ponderado + desempate)", styles["H1X"]))
-    ranking_data = [["Rank", "Atleta", "Camisa", "Posição", "Média ponderada", "Drills avaliados", "Pontos ponderados"]]
-    for r in ranking_items:
-        ranking_data.append([
-            r.get("rank", ""),
-            r.get("athlete_name", ""),
-            r.get("jersey_number", "") or "",
-            r.get("position", "") or "",
-            r.get("weighted_average", "") if r.get("weighted_average") is not None else "",
-            r.get("scored_drills_count", ""),
-            r.get("weighted_points", ""),
-        ])
-    t_rank = Table(ranking_data, repeatRows=1)
-    t_rank.setStyle(tstyle())
-    story.append(t_rank)
-    story.append(PageBreak())
-
-    # -------- Notas por Drill (smart split por colunas) --------
-    story.append(Paragraph("Notas por Drill (com comentários)", styles["H1X"]))
-    story.append(Paragraph(
-        f"Quando há muitos drills, o relatório divide em {max_drills_page} drills por página (nota + comentário).",
-        styles["SmallX"]
-    ))
-    story.append(Spacer(1, 8))
-
-    # Para cada “chunk” de drills, gera uma tabela
-    drill_chunks = list(chunk_list(drills_sorted, max_drills_page))
-    total_chunks = len(drill_chunks)
-
-    for idx, chunk in enumerate(drill_chunks, start=1):
-        story.append(Paragraph(f"Bloco {idx}/{total_chunks}", styles["H2X"]))
-
-        hdr = styles["HdrTinyX"]
-        headers = [
-            Paragraph("Atleta", hdr),
-            Paragraph("Camisa", hdr),
-            Paragraph("Posição", hdr),
-            Paragraph("Status", hdr),
-            Paragraph("Média", hdr),
-            Paragraph("Rank", hdr),
-        ]
-        for d in chunk:
-            headers.append(Paragraph(f"{escape(str(d.name))}<br/>(nota)", hdr))
-        for d in chunk:
-            headers.append(Paragraph(f"{escape(str(d.name))}<br/>(coment.)", hdr))
-
-        rows = [headers]
-
-        for a in attendances:
-            athlete = a.athlete
-            r = ranking_map.get(athlete.id, {})
-            base = [
-                Paragraph(escape(str(athlete.name or "")), styles["SmallX"]),
-                str(athlete.jersey_number or ""),
-                str(athlete.current_position or ""),
-                str(a.get_status_display()),
-                str(r.get("weighted_average", "") if r.get("weighted_average") is not None else ""),
-                str(r.get("rank", "")),
-            ]
-
-            scores_row = []
-            comments_row = []
-            for d in chunk:
-                sc, comment = score_map.get((athlete.id, d.id), ("", ""))
-                scores_row.append(sc)
-
-                # comentário “legível”
-                if isinstance(comment, str):
-                    comment_txt = comment.strip()
-                    comment_txt = (comment_txt[:120] + "...") if len(comment_txt) > 123 else comment_txt
-                else:
-                    comment_txt = ""
-                comments_row.append(Paragraph(escape(comment_txt), styles["CellTinyX"]))
-
-            rows.append(base + scores_row + comments_row)
-
-        # Larguras (fixas por drill: nota menor, comentário maior)
-        col_widths = NOTES_BASE_WIDTHS + ([NOTE_COL_W] * len(chunk)) + ([COMMENT_COL_W] * len(chunk))
-        page_width = landscape(A4)[0] - (doc.leftMargin + doc.rightMargin)
-        total_w = sum(col_widths)
-        if total_w > page_width:
-            ratio = page_width / total_w
-            col_widths = [w * ratio for w in col_widths]
-
-        t_notes = Table(rows, colWidths=col_widths, repeatRows=1)
-        t_notes.setStyle(tstyle())
-        story.append(t_notes)
-
-        if idx < total_chunks:
-            story.append(PageBreak())
-
-    # Build
-    doc.build(story, onFirstPage=page_footer, onLaterPages=page_footer)
-
-    pdf = buffer.getvalue()
-    buffer.close()
-
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = f'attachment; filename="treino_{training.id}_{training.date}_premium.pdf"'
-    response.write(pdf)
-    return response
-
-    # ==========================================================
-    # Helpers
-    # ==========================================================
-def _get_rankable_attendances(self, training, position_code=None):
-    qs = Attendance.objects.filter(training=training, status__in=["PRESENT", "LATE"]).select_related("athlete")
-    if position_code:
-        qs = qs.filter(athlete__current_position=position_code)
-    return qs
-
-def _compute_ranking_items(self, training, position_code=None):
-    """
-    Retorna items de ranking com tie-break:
-        1) weighted_average desc
-        2) scored_drills_count desc
-        3) weighted_points (numerator) desc
-        4) athlete_name asc
-    """
-    attendances = self._get_rankable_attendances(training, position_code=position_code)
-    athlete_ids = list(attendances.values_list("athlete_id", flat=True))
-
-    if not athlete_ids:
-        return []
-
-    status_map = {a.athlete_id: a.status for a in attendances}
-
-    numerator_expr = ExpressionWrapper(
-        F("score") * F("training_drill__weight"),
-        output_field=FloatField()
-    )
-
-    agg = (
-        DrillScore.objects
-        .filter(training_drill__training=training, athlete_id__in=athlete_ids)
-        .values(
-            "athlete_id",
-            "athlete__name",
-            "athlete__jersey_number",
-            "athlete__current_position",
-        )
-        .annotate(
-            weighted_points=Coalesce(Sum(numerator_expr), 0.0),
-            weight_sum=Coalesce(Sum(F("training_drill__weight"), output_field=FloatField()), 0.0),
-            scored_drills_count=Coalesce(Sum(1, output_field=FloatField()), 0.0),
+        bounds = {}
+        for param in ("from", "to"):
+            raw = request.query_params.get(param)
+            if not raw:
+                continue
+            try:
+                bounds[param] = parse_date(raw)
+            except ValueError:
+                bounds[param] = None
+            if bounds[param] is None:
+                return Response({param: ["Data inválida (use AAAA-MM-DD)."]}, status=400)
+
+        response = StreamingHttpResponse(
+            stream_season_csv(bounds.get("from"), bounds.get("to")),
+            content_type="text/csv; charset=utf-8",
         )
-    )
-
-    items = []
-    for row in agg:
-        denom = float(row["weight_sum"] or 0.0)
-        wavg = round(float(row["weighted_points"]) / denom, 2) if denom > 0 else None
-
-        items.append({
-            "athlete_id": row["athlete_id"],
-            "athlete_name": row["athlete__name"],
-            "jersey_number": row["athlete__jersey_number"],
-            "position": row["athlete__current_position"],
-            "attendance_status": status_map.get(row["athlete_id"]),
-            "weighted_average": wavg,
-            "scored_drills_count": int(row["scored_drills_count"] or 0),
-            "weighted_points": round(float(row["weighted_points"] or 0.0), 3),
-        })
-
-    # Tie-break sorting
-    # None average goes last
-    items.sort(key=lambda x: (
-        x["weighted_average"] is None,
-        -(x["weighted_average"] or -9999),
-        -x["scored_drills_count"],
-        -x["weighted_points"],
-        x["athlete_name"].lower() if x["athlete_name"] else "",
-    ))
-
-    for i, it in enumerate(items, start=1):
-        it["rank"] = i
-
-    return items
-
-def _get_drills_and_scores(self, training):
-    drills = list(TrainingDrill.objects.filter(training=training).order_by("order", "id"))
-    drill_ids = [d.id for d in drills]
-    scores = list(
-        DrillScore.objects
-        .filter(training_drill_id__in=drill_ids)
-        .select_related("athlete", "training_drill", "training_drill__drill")
-    )
-    return drills, scores
-
-# ==========================================================
-# NOVO: Ranking (com tie-break) + filtro por posição
-# ==========================================================
-@action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
-def ranking(self, request, pk=None):
-    training = self.get_object()
-    position = request.query_params.get("position")  # ex: WR, DB, QB...
-
-    items = self._compute_ranking_items(training, position_code=position)
-
-    return Response({
-        "training": {
-            "id": training.id,
-            "date": training.date,
-            "start_time": training.start_time,
-            "location": training.location,
-        },
-        "filters": {"position": position},
-        "items": items,
-    })
-
-    # ==========================================================
-    # NOVO: Dashboard do Coach (inclui ranking por posição)
-    # ==========================================================
-@action(detail=True, methods=["get"], permission_classes=[IsAuthenticated, IsAdminOrCoach])
-def coach_dashboard(self, request, pk=None):
-    training = self.get_object()
-
-    # Presença completa (todos, inclusive ausentes)
-    attendances = (
-        Attendance.objects
-        .filter(training=training)
-        .select_related("athlete")
-        .order_by("athlete__name")
-    )
-    attendance_payload = [{
-        "athlete_id": a.athlete_id,
-        "athlete_name": a.athlete.name,
-        "jersey_number": a.athlete.jersey_number,
-        "position": a.athlete.current_position,
-        "status": a.status,
-        "checkin_time": a.checkin_time,
-    } for a in attendances]
-
-    drills, scores = self._get_drills_and_scores(training)
-
-    drills_payload = [{
-        "training_drill_id": d.id,
-        "name": d.name,
-        "order": d.order,
-        "max_score": d.max_score,
-        "weight": float(d.weight),
-        "description": d.description,
-    } for d in drills]
-
-    # Média por drill
-    drill_avg_qs = (
-        DrillScore.objects
-        .filter(training_drill__training=training)
-        .values("training_drill_id")
-        .annotate(avg_score=Avg("score"))
-    )
-    drill_avg_map = {row["training_drill_id"]: (round(float(row["avg_score"]), 2) if row["avg_score"] is not None else None) for row in drill_avg_qs}
-    for d in drills_payload:
-        d["average_score"] = drill_avg_map.get(d["training_drill_id"])
-
-    # score_map (athlete_id, drill_id) => score/comment
-    score_map = {}
-    for s in scores:
-        score_map[(s.athlete_id, s.training_drill_id)] = {
-            "score": float(s.score),
-            "comment": s.comment,
-            "rated_by": s.rated_by_id,
-        }
-
-    # Ranking geral (tie-break + ponderada)
-    ranking_items = self._compute_ranking_items(training)
-
-    # Média ponderada geral do treino (média das médias dos atletas rankeados)
-    valid_avgs = [x["weighted_average"] for x in ranking_items if x["weighted_average"] is not None]
-    training_weighted_avg = round(sum(valid_avgs) / len(valid_avgs), 2) if valid_avgs else None
-
-    # Ranking por posição
-    # Pegamos as posições presentes no treino (rankáveis) e montamos um dict
-    rankable_positions = list(
-        Attendance.objects
-        .filter(training=training, status__in=["PRESENT", "LATE"])
-        .exclude(athlete__current_position__isnull=True)
-        .exclude(athlete__current_position__exact="")
-        .values_list("athlete__current_position", flat=True)
-        .distinct()
-    )
-    ranking_by_position = {}
-    for pos in rankable_positions:
-        ranking_by_position[pos] = self._compute_ranking_items(training, position_code=pos)
-
-    return Response({
-        "training": {
-            "id": training.id,
-            "date": training.date,
-            "start_time": training.start_time,
-            "location": training.location,
-            "notes": training.notes,
-        },
-        "summary": {
-            "athletes_total": len(attendance_payload),
-            "drills_total": len(drills_payload),
-            "training_weighted_average": training_weighted_avg,
-        },
-        "attendance": attendance_payload,
-        "drills": drills_payload,
-        "ranking": ranking_items,
-        "ranking_by_position": ranking_by_position,
-        "score_map": score_map,
-    })
-
+        suffix = "_".join(str(bounds[p]) for p in ("from", "to") if p in bounds) or "completa"
+        response["Content-Disposition"] = f'attachment; filename="temporada_{suffix}.csv"'
+        return response
+    
 # ==========================================================
 # NOVO: Export CSV (abre no Excel)
 # ==========================================================
@@ -1470,7 +1011,7 @@ def _export_csv_impl(self, request, pk=None):
         drills_sorted = sorted(drills, key=lambda d: (d.order, d.id))
 
         # Ranking geral (para rank e weighted_average)
-        ranking_items = self._compute_ranking_items(training)
+        ranking_items = build_ranking(training).items
         ranking_map = {r["athlete_id"]: r for r in ranking_items}
 
         # Presença (todos)
@@ -1536,8 +1077,29 @@ def _export_csv_impl(self, request, pk=None):
         return response
 
 
+class ReportJobViewSet(ReadOnlyModelViewSet):
+    queryset = ReportJob.objects.all()
+    serializer_class = ReportJobSerializer
+    permission_classes = [IsAuthenticated, IsAdminOrCoach]
+    filterset_fields = ("training", "kind", "status")
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != ReportJob.Status.DONE or not job.file:
+            return Response({"detail": "Relatório ainda não está pronto."}, status=409)
+        return FileResponse(
+            job.file.open("rb"),
+            as_attachment=True,
+            filename=training_pdf_filename(job.training),
+            content_type="application/pdf",
+        )
+
+
 class TrainingDrillViewSet(ModelViewSet):
-    queryset = TrainingDrill.objects.all()
+    queryset = TrainingDrill.objects.select_related("drill").prefetch_related(
+        Prefetch("scores", queryset=DrillScore.objects.select_related("athlete"))
+    )
     serializer_class = TrainingDrillSerializer
     filterset_fields = ("training",)
     ordering_fields = ("order",)
@@ -1549,7 +1111,7 @@ class TrainingDrillViewSet(ModelViewSet):
 
 
 class DrillScoreViewSet(ModelViewSet):
-    queryset = DrillScore.objects.all()
+    queryset = DrillScore.objects.select_related("athlete")
     serializer_class = DrillScoreSerializer
     filterset_fields = ("athlete", "training_drill")
     ordering_fields = ("created_at",)